@@ -1,8 +1,11 @@
 from flask import Flask, Blueprint, jsonify, request, abort
 from app.services.country_service import CountryService
 from app.models.country import CountryModel
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 country_bp = Blueprint("country", __name__, url_prefix="/countries")
 
 def create_app():
@@ -12,6 +15,11 @@ def create_app():
     db_name = os.environ.get("MONGODB_DB", "testdb")
     collection_name = os.environ.get("MONGODB_COLLECTION", "countries")
     country_model = CountryModel(mongodb_url, db_name, collection_name)
+    try:
+        # Backfill name_norm and create its index, as the FastAPI lifespan does
+        country_model.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Could not prepare country collection: {str(e)}")
     country_service = CountryService(country_model)
     bp = init_routes(country_service)
     app.register_blueprint(bp)
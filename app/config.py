@@ -0,0 +1,119 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables before any setting is read
+load_dotenv()
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    try:
+        return float(value) if value not in (None, "") else default
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    try:
+        return int(value) if value not in (None, "") else default
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Outbound HTTP client pool
+HTTP_CONNECT_TIMEOUT = _env_float("HTTP_CONNECT_TIMEOUT", 5.0)
+HTTP_READ_TIMEOUT = _env_float("HTTP_READ_TIMEOUT", 15.0)
+HTTP_WRITE_TIMEOUT = _env_float("HTTP_WRITE_TIMEOUT", 10.0)
+HTTP_POOL_TIMEOUT = _env_float("HTTP_POOL_TIMEOUT", 5.0)
+HTTP_MAX_CONNECTIONS = _env_int("HTTP_MAX_CONNECTIONS", 20)
+HTTP_MAX_KEEPALIVE = _env_int("HTTP_MAX_KEEPALIVE", 10)
+HTTP_KEEPALIVE_EXPIRY = _env_float("HTTP_KEEPALIVE_EXPIRY", 30.0)
+HTTP2_ENABLED = _env_bool("HTTP2_ENABLED", True)
+HTTP_USER_AGENT = os.getenv("HTTP_USER_AGENT", "saneles-country-api/1.0")
+
+# Country catalogue cache
+CATALOGUE_CHANGE_STREAM = _env_bool("CATALOGUE_CHANGE_STREAM", False)
+
+# Shared response cache; falls back to an in-process LRU when REDIS_URL is unset
+REDIS_URL = os.getenv("REDIS_URL", "")
+CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", 2048)
+
+# Image search fan-out
+IMAGE_PROVIDER_TIMEOUT = _env_float("IMAGE_PROVIDER_TIMEOUT", 4.0)
+IMAGE_FANOUT_DEADLINE = _env_float("IMAGE_FANOUT_DEADLINE", 5.0)
+
+# Natural Earth admin-0 boundaries used for offline geometry, bounding boxes and centroids
+BOUNDARIES_GEOJSON = os.getenv(
+    "BOUNDARIES_GEOJSON",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "static", "geojson", "ne_110m_admin_0_countries", "ne_110m_admin_0_countries.geojson"),
+)
+
+# Offline geocoder: country list used to widen the name index, and the fuzzy-match threshold
+COUNTRIES_JSON = os.getenv(
+    "COUNTRIES_JSON",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "countries.json"),
+)
+GEOCODER_FUZZY_CUTOFF = _env_float("GEOCODER_FUZZY_CUTOFF", 0.85)
+
+# Travel advisory index: seconds between conditional re-fetches of the State Department feed
+SAFETY_REFRESH_INTERVAL = _env_float("SAFETY_REFRESH_INTERVAL", 3600.0)
+
+# Exchange-rate table: base currency fetched from /latest/{base} and seconds between refreshes
+EXCHANGE_RATE_BASE = os.getenv("EXCHANGE_RATE_BASE", "USD")
+EXCHANGE_RATE_REFRESH_INTERVAL = _env_float("EXCHANGE_RATE_REFRESH_INTERVAL", 3600.0)
+
+# Country -> ISO 4217 currency mapping behind the currency registry
+CURRENCIES_JSON = os.getenv(
+    "CURRENCIES_JSON",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "currencies.json"),
+)
+
+# Country dossier: per-section timeout and overall deadline (seconds)
+DOSSIER_SECTION_TIMEOUT = _env_float("DOSSIER_SECTION_TIMEOUT", 5.0)
+DOSSIER_DEADLINE = _env_float("DOSSIER_DEADLINE", 8.0)
+
+# Chat answer cache: TTL of cached answers and optional MinHash matching of similar prompts
+CHAT_CACHE_TTL = _env_float("CHAT_CACHE_TTL", 86400.0)
+CHAT_SIMILARITY_ENABLED = _env_bool("CHAT_SIMILARITY_ENABLED", False)
+CHAT_SIMILARITY_THRESHOLD = _env_float("CHAT_SIMILARITY_THRESHOLD", 0.8)
+
+# Cache warming for the most requested countries: cycle interval, how many countries,
+# requests per second allowed per upstream, and the delay before the first cycle
+PREFETCH_ENABLED = _env_bool("PREFETCH_ENABLED", True)
+PREFETCH_INTERVAL = _env_float("PREFETCH_INTERVAL", 900.0)
+PREFETCH_TOP_N = _env_int("PREFETCH_TOP_N", 20)
+PREFETCH_RATE = _env_float("PREFETCH_RATE", 0.5)
+PREFETCH_STARTUP_DELAY = _env_float("PREFETCH_STARTUP_DELAY", 30.0)
+
+# Weather: forecast grid cell size in degrees, locations per Open-Meteo request, countries per
+# /weather/batch call, and seconds after each hourly model update before cached forecasts expire
+WEATHER_GRID_SIZE = _env_float("WEATHER_GRID_SIZE", 0.25)
+WEATHER_BATCH_SIZE = _env_int("WEATHER_BATCH_SIZE", 50)
+WEATHER_BATCH_MAX_COUNTRIES = _env_int("WEATHER_BATCH_MAX_COUNTRIES", 250)
+WEATHER_UPDATE_LAG = _env_float("WEATHER_UPDATE_LAG", 300.0)
+
+# Attractions: OpenTripMap tile size in degrees, most tiles per country, places requested per
+# tile, the minimum OpenTripMap rate (1-3, "h" suffix for heritage), the detail lookups per page
+# and how far in degrees outside the coarse country outline a place may lie and still be kept
+ATTRACTIONS_TILE_SIZE = _env_float("ATTRACTIONS_TILE_SIZE", 2.0)
+ATTRACTIONS_MAX_TILES = _env_int("ATTRACTIONS_MAX_TILES", 9)
+ATTRACTIONS_TILE_LIMIT = _env_int("ATTRACTIONS_TILE_LIMIT", 50)
+ATTRACTIONS_MIN_RATE = os.getenv("ATTRACTIONS_MIN_RATE", "2")
+ATTRACTIONS_MAX_DETAILS = _env_int("ATTRACTIONS_MAX_DETAILS", 10)
+ATTRACTIONS_EDGE_TOLERANCE = _env_float("ATTRACTIONS_EDGE_TOLERANCE", 0.3)
+
+# X (Twitter) API: request budgets per UTC day and month, shared through Redis when REDIS_URL is
+# set, and how long a country's posts stay fresh and then servable once the budget is spent
+X_DAILY_QUOTA = _env_int("X_DAILY_QUOTA", 4)
+X_MONTHLY_QUOTA = _env_int("X_MONTHLY_QUOTA", 100)
+SOCIAL_CACHE_TTL = _env_float("SOCIAL_CACHE_TTL", 86400.0)
+SOCIAL_STALE_TTL = _env_float("SOCIAL_STALE_TTL", 30 * 86400.0)
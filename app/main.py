@@ -1,17 +1,31 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Path, Body, status, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Path, Body, status, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
+from urllib.parse import quote
+import asyncio
 import os
 from dotenv import load_dotenv
-from app.models.country import CountryModel
+from app import config
+from app.models.country import CountryModel, AsyncCountryModel, LIST_MAX_LIMIT, BULK_MAX_ITEMS
+from app.models.payload import dumps_bytes
+from app.models.catalogue import CountryCatalogue
+from app.services.http_client import HttpClientManager
+from app.services.rate_limiter import RateLimiterRegistry
+from app.services.cache import create_response_cache
+from app.services.quota import create_quota_manager
+from app.services.boundaries import shared_boundary_store
+from app.services.geocoder import Geocoder
 from app.services.country_service import CountryService
 from app.services.weather_service import WeatherService
 from app.services.currency_service import CurrencyService
 from app.services.social_service import SocialService
 from app.services.attractions_service import AttractionsService
 from app.services.safety_service import SafetyService
+from app.services.dossier_service import DossierService
+from app.services.prefetch_service import PrefetchService, PrefetchJob, PopularityMiddleware
 import json
 import logging
 
@@ -22,10 +36,40 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Outbound clients live as long as the application: opened here, closed on shutdown
+    logger.info("Starting application")
+    http_clients.open()
+    app.state.http_clients = http_clients
+    await asyncio.to_thread(geocoder.load)
+    try:
+        await country_model.ensure_indexes()
+        await country_model.load_catalogue()
+    except Exception as e:
+        logger.error(f"Could not prepare country collection: {str(e)}")
+    watcher = None
+    if config.CATALOGUE_CHANGE_STREAM:
+        watcher = asyncio.create_task(country_model.watch_changes())
+    advisory_refresher = asyncio.create_task(safety_service.run_refresher())
+    prefetcher = asyncio.create_task(prefetch_service.run()) if config.PREFETCH_ENABLED else None
+    yield
+    if watcher:
+        watcher.cancel()
+    if prefetcher:
+        prefetcher.cancel()
+    advisory_refresher.cancel()
+    await http_clients.aclose()
+    await response_cache.close()
+    await quota_manager.close()
+    country_model.close()
+    logger.info("Closed outbound HTTP clients and MongoDB connection")
+
 app = FastAPI(
     title="Saneles Country API",
     description="API for country data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 router = APIRouter()
@@ -44,13 +88,66 @@ MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DB_NAME = os.getenv("MONGODB_DB", "countries_db")
 COLLECTION_NAME = os.getenv("MONGODB_COLLECTION", "countries")
 
-country_model = CountryModel(MONGODB_URL, DB_NAME, COLLECTION_NAME)
-country_service = CountryService(country_model)
-weather_service = WeatherService()
-currency_service = CurrencyService()
-social_service = SocialService()
-attractions_service = AttractionsService()
-safety_service = SafetyService()
+# Shared outbound HTTP connection pools, one per upstream; no client exists until the lifespan opens them
+http_clients = HttpClientManager()
+# Per-upstream async throttling for APIs with usage limits
+rate_limiter = RateLimiterRegistry()
+# Upstream response cache, shared across workers when REDIS_URL is set
+response_cache = create_response_cache()
+# Daily/monthly budgets for quota-limited APIs (X), global across workers when REDIS_URL is set
+quota_manager = create_quota_manager()
+
+# In-memory copy of the collection, loaded at startup and kept current by update_one
+country_catalogue = CountryCatalogue()
+country_model = AsyncCountryModel(MONGODB_URL, DB_NAME, COLLECTION_NAME, catalogue=country_catalogue)
+# Natural Earth boundaries, centroids and bounding boxes, parsed once at startup
+boundary_store = shared_boundary_store()
+# Country name -> centroid/bbox offline; Nominatim only for names it cannot resolve
+geocoder = Geocoder(boundary_store, http_clients=http_clients, cache=response_cache, rate_limiter=rate_limiter)
+country_service = CountryService(country_model, http_clients=http_clients, cache=response_cache,
+                                 geocoder=geocoder, rate_limiter=rate_limiter)
+weather_service = WeatherService(http_clients=http_clients, cache=response_cache, geocoder=geocoder,
+                                 country_model=country_model)
+currency_service = CurrencyService(http_clients=http_clients)
+social_service = SocialService(http_clients=http_clients, rate_limiter=rate_limiter, cache=response_cache,
+                               quota=quota_manager)
+# Country bbox tiled into OpenTripMap queries, cached per tile and ranked by rate
+attractions_service = AttractionsService(http_clients=http_clients, rate_limiter=rate_limiter,
+                                         cache=response_cache, geocoder=geocoder)
+# Travel advisories indexed in memory and refreshed in the background
+safety_service = SafetyService(http_clients=http_clients)
+# One-call country page: resolves the country once and fans out to the services above
+dossier_service = DossierService(
+    country_service, geocoder,
+    weather_service=weather_service, safety_service=safety_service, currency_service=currency_service,
+    attractions_service=attractions_service, social_service=social_service
+)
+
+
+async def _warm_summary(name: str):
+    country = await country_service.find_country(name)
+    return await country_service.get_wikipedia_summary(country["name"] if country else name)
+
+
+def _most_populous(n: int) -> List[str]:
+    countries = sorted(country_catalogue.all(), key=lambda c: c.get("population") or 0, reverse=True)
+    return [c["name"] for c in countries[:n]]
+
+
+# Re-fetches summaries, weather and photos for the most requested countries before they expire.
+# Travel advisories are refreshed as one feed by safety_service.run_refresher instead.
+prefetch_service = PrefetchService(
+    response_cache,
+    jobs=[
+        PrefetchJob("summary", "wikipedia", _warm_summary),
+        PrefetchJob("weather", "open_meteo", weather_service.get_weather),
+    ],
+    seed=_most_populous,
+)
+# Without an image API key every photo lookup fails, so there is nothing to warm
+if country_service.image_providers_configured():
+    prefetch_service.register(PrefetchJob("images", "photos", country_service.get_country_images))
+app.add_middleware(PopularityMiddleware, record=prefetch_service.record)
 
 # Pydantic model for country update
 class CountryUpdate(BaseModel):
@@ -65,6 +162,15 @@ class CountryUpdate(BaseModel):
         example="Afrikaans, English, Southern Ndebele, Northern Sotho, Southern Sotho, Swazi, Tswana, Tsonga, Venda, Xhosa, Zulu"
     )
 
+class CountryBulkItem(BaseModel):
+    name: str = Field(..., min_length=1, example="South Africa", description="Current name of the country")
+    update: CountryUpdate = Field(default_factory=CountryUpdate)
+    upsert: bool = Field(False, description="Insert the country when no country has this name")
+
+class CountryBulkRequest(BaseModel):
+    items: List[CountryBulkItem] = Field(..., max_length=BULK_MAX_ITEMS)
+    ordered: bool = Field(True, description="Stop at the first failing item instead of attempting every item")
+
 # Pydantic model for chat request
 class CountryChatRequest(BaseModel):
     message: str = Field(..., example="What is the culture like in South Africa?")
@@ -78,18 +184,91 @@ def root():
         "routes": routes
     }
 
-@app.get("/countries/", response_model=Dict[str, List[Dict[str, Any]]], tags=["countries"])
-def get_all_countries():
+@app.get("/admin/metrics", response_model=Dict[str, Any], tags=["admin"])
+def get_metrics():
+    return {
+        "http_pool": http_clients.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "catalogue": country_catalogue.stats(),
+        "boundaries": boundary_store.stats(),
+        "geocoder": geocoder.stats(),
+        "travel_advisories": safety_service.stats(),
+        "exchange_rates": currency_service.stats(),
+        "weather": weather_service.stats(),
+        "social": social_service.stats(),
+        "chat_cache": country_service.chat_cache.stats(),
+        "response_cache": response_cache.stats()
+    }
+
+@app.get("/admin/prefetch", response_model=Dict[str, Any], tags=["admin"])
+def get_prefetch_status():
+    return {"enabled": config.PREFETCH_ENABLED, **prefetch_service.stats()}
+
+@app.get("/admin/quota", response_model=Dict[str, Any], tags=["admin"])
+async def get_quota_usage():
+    return {"x_api": await social_service.quota_usage()}
+
+@app.get("/countries/", response_model=Dict[str, Any], tags=["countries"])
+async def get_all_countries(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. name,capital"),
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    region: Optional[str] = Query(None, description="Only countries in this region"),
+    subregion: Optional[str] = Query(None, description="Only countries in this subregion"),
+    response_format: str = Query("json", alias="format", pattern="^(json|ndjson)$",
+                                 description="json, or ndjson to stream one country per line"),
+):
+    field_list = fields.split(",") if fields else None
+    if response_format == "ndjson":
+        try:
+            countries = country_model.iter_countries(field_list, cursor, region, subregion, limit)
+            # Pull the first document now so bad parameters still map to a status code
+            first = await anext(countries, None)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        async def lines():
+            try:
+                if first is not None:
+                    yield dumps_bytes(first) + b"\n"
+                    async for doc in countries:
+                        yield dumps_bytes(doc) + b"\n"
+            finally:
+                await countries.aclose()
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    if any(param is not None for param in (fields, limit, cursor, region, subregion)):
+        try:
+            return await country_model.list_countries(field_list, limit or LIST_MAX_LIMIT, cursor, region, subregion)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # Served from the catalogue's pre-serialized, pre-compressed payload; no per-request encoding
     try:
-        countries = country_model.find_all()
-        return {"countries": countries}
+        payload = await country_model.list_payload()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    coding, body = payload.negotiate(request.headers.get("accept-encoding"))
+    headers = {"ETag": payload.etag_for(coding), "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if payload.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/countries/search", response_model=Dict[str, List[Dict[str, Any]]], tags=["countries"])
-async def search_countries(q: str = Query(..., description="Search query for country name", min_length=1)):
+async def search_countries(
+    q: str = Query(..., description="Search query: country name, capital or language; typos are tolerated", min_length=1),
+    limit: int = Query(50, ge=1, le=50, description="Maximum number of suggestions"),
+):
     try:
-        countries = country_model.search_by_name(q)
+        countries = await country_model.search_by_name(q, limit)
         return {"countries": countries}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -108,6 +287,21 @@ async def get_country_by_name(name: str = Path(..., description="Country name"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/countries/{name}/dossier", response_model=Dict[str, Any], tags=["countries"])
+async def get_country_dossier(
+    name: str = Path(..., description="Country name"),
+    include: Optional[str] = Query(None, description="Comma-separated sections, e.g. weather,safety,images (default: all but social)"),
+    from_currency: str = Query("USD", description="Source currency for the currency section")
+):
+    try:
+        sections = include.split(",") if include else None
+        return await dossier_service.get_dossier(name, include=sections, from_currency=from_currency)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building dossier for {name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error building dossier: {str(e)}")
+
 @app.get("/countries/{name}/photos", response_model=Dict[str, Any], tags=["photos"])
 async def get_country_photos(name: str = Path(..., description="Country name")):
     try:
@@ -150,12 +344,8 @@ async def get_country_pexels_photos(name: str = Path(..., description="Country n
 @app.get("/countries/{name}/images", response_model=Dict[str, Any], tags=["images"])
 async def get_country_images(name: str = Path(..., description="Country name")):
     try:
-        unsplash_key = os.getenv("UNSPLASH_API_KEY")
-        pixabay_key = os.getenv("PIXABAY_API_KEY")
-        pexels_key = os.getenv("PEXELS_API_KEY")
-        if not all([unsplash_key, pixabay_key, pexels_key]):
-            raise HTTPException(status_code=500, detail="One or more API keys not configured")
-        images = await country_service.get_country_images(name, unsplash_key, pixabay_key, pexels_key)
+        # Providers without a configured key are skipped and reported as "not_configured"
+        images = await country_service.get_country_images(name)
         return images
     except HTTPException:
         raise
@@ -163,12 +353,12 @@ async def get_country_images(name: str = Path(..., description="Country name")):
         raise HTTPException(status_code=500, detail=f"Error fetching images: {str(e)}")
 
 @app.put("/countries/{name}", response_model=Dict[str, Any], tags=["countries"])
-def update_country(
+async def update_country(
     name: str = Path(..., description="Country name to update"),
     update: CountryUpdate = Body(...),
 ):
     try:
-        updated = country_model.update_one(name, update.model_dump(exclude_none=True))
+        updated = await country_model.update_one(name, update.model_dump(exclude_none=True))
         if not updated:
             raise HTTPException(status_code=404, detail="Country not found")
         return updated
@@ -178,18 +368,32 @@ def update_country(
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.patch("/countries/{name}", response_model=Dict[str, Any], tags=["countries"])
-def patch_country(
+async def patch_country(
     name: str = Path(..., description="Country name to patch"),
     update: CountryUpdate = Body(...),
 ):
     try:
-        updated = country_model.update_one(name, update.dict(exclude_none=True))
+        updated = await country_model.update_one(name, update.dict(exclude_none=True))
         if not updated:
             raise HTTPException(status_code=404, detail="Country not found")
         return updated
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/countries/bulk", response_model=Dict[str, Any], tags=["countries"])
+async def bulk_update_countries(request: CountryBulkRequest = Body(...)):
+    # One bulk_write for every item; per-item outcomes are reported instead of failing the batch
+    items = [
+        {"name": item.name, "update": item.update.model_dump(exclude_none=True), "upsert": item.upsert}
+        for item in request.items
+    ]
+    try:
+        return await country_model.bulk_update(items, ordered=request.ordered)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete("/countries/{name}", tags=["countries"])
 def delete_country(name: str):
     raise HTTPException(
@@ -197,12 +401,33 @@ def delete_country(name: str):
         detail="Deleting countries is not allowed."
     )
 
+@app.get("/weather/batch", response_model=Dict[str, Any], tags=["weather"])
+async def get_weather_batch(
+    countries: List[str] = Query(..., description="Countries to forecast; repeat the parameter or separate with commas"),
+    response_format: str = Query("rows", alias="format", description="rows, or columnar for the daily arrays as-is"),
+    lang: str = Query("en", description="Language of the weather labels: en, fr, es, de or pt"),
+):
+    names = [name for value in countries for name in value.split(",")]
+    if len(names) > config.WEATHER_BATCH_MAX_COUNTRIES:
+        raise HTTPException(status_code=400, detail=f"At most {config.WEATHER_BATCH_MAX_COUNTRIES} countries per request")
+    try:
+        return await weather_service.get_weather_batch(names, response_format=response_format, lang=lang)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching weather for {names}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching weather: {str(e)}")
+
 # Weather endpoint
 @app.get("/countries/{name}/weather", response_model=Dict[str, Any], tags=["weather"])
-async def get_country_weather(name: str = Path(..., description="Country name")):
+async def get_country_weather(
+    name: str = Path(..., description="Country name"),
+    response_format: str = Query("rows", alias="format", description="rows, or columnar for the daily arrays as-is"),
+    lang: str = Query("en", description="Language of the weather labels: en, fr, es, de or pt"),
+):
     try:
         # Fetch weather directly using country name
-        weather = await weather_service.get_weather(country=name)
+        weather = await weather_service.get_weather(country=name, response_format=response_format, lang=lang)
         return weather
     except HTTPException:
         raise
@@ -235,6 +460,61 @@ async def country_chat(
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
     
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/countries/{name}/chat/stream", tags=["chat"])
+async def country_chat_stream(
+    request: Request,
+    name: str = Path(..., description="Country name"),
+    chat_request: CountryChatRequest = Body(...)
+):
+    """
+    Server-sent events: one "token" event per generated token, then "done".
+    Upstream errors before the first token are returned as normal HTTP errors.
+    """
+    huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY")
+    if not huggingface_api_key:
+        raise HTTPException(status_code=500, detail="Hugging Face API key not configured")
+
+    tokens = country_service.stream_custom_request(
+        api_key=huggingface_api_key,
+        message=chat_request.message,
+        country=name
+    )
+    try:
+        first = await tokens.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except HTTPException:
+        await tokens.aclose()
+        raise
+    except Exception as e:
+        await tokens.aclose()
+        raise HTTPException(status_code=502, detail=f"Error connecting to Hugging Face API: {str(e)}")
+
+    async def events():
+        try:
+            if first is None:
+                yield _sse("done", {})
+                return
+            yield _sse("token", {"text": first})
+            async for token in tokens:
+                if await request.is_disconnected():
+                    logger.info(f"Chat client for {name} disconnected; closing upstream stream")
+                    return
+                yield _sse("token", {"text": token})
+            yield _sse("done", {})
+        except Exception as e:
+            logger.error(f"Chat stream for {name} failed: {str(e)}")
+            yield _sse("error", {"detail": str(getattr(e, "detail", e))})
+        finally:
+            # Releases the upstream connection whether we finished, failed or were cancelled
+            await tokens.aclose()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/countries/{name}/currency/convert", response_model=Dict[str, Any], tags=["currency"])
 async def convert_currency(
     name: str = Path(..., description="Country name"),
@@ -250,6 +530,20 @@ async def convert_currency(
         logger.error(f"Error converting currency for {name}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error converting currency: {str(e)}")
 
+@app.get("/currency/convert/batch", response_model=Dict[str, Any], tags=["currency"])
+async def convert_currency_batch(
+    amount: float = Query(..., description="Amount to convert", gt=0),
+    from_currency: str = Query(..., description="Source currency code (e.g., USD)"),
+    countries: List[str] = Query(..., description="Countries to convert into; repeat the parameter for each")
+):
+    try:
+        return await currency_service.convert_batch(countries=countries, amount=amount, from_currency=from_currency)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error converting currency for {countries}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error converting currency: {str(e)}")
+
 @app.get("/countries/{name}/social", response_model=Dict[str, Any], tags=["social"])
 async def get_social_posts(name: str = Path(..., description="Country name")):
     try:
@@ -262,9 +556,17 @@ async def get_social_posts(name: str = Path(..., description="Country name")):
         raise HTTPException(status_code=500, detail=f"Error fetching social posts: {str(e)}")
     
 @app.get("/countries/{name}/attractions", response_model=Dict[str, Any], tags=["attractions"])
-async def get_attractions(name: str = Path(..., description="Country name")):
+async def get_attractions(
+    name: str = Path(..., description="Country name"),
+    limit: int = Query(10, ge=1, le=100, description="Attractions to return"),
+    offset: int = Query(0, ge=0, le=1000, description="Attractions to skip, best ranked first"),
+    kinds: Optional[str] = Query(None, description="Comma-separated OpenTripMap kinds (default cultural,natural)"),
+    details: bool = Query(False, description="Add description, image and links for the returned attractions"),
+):
     try:
-        attractions = await attractions_service.get_attractions(country=name)
+        attractions = await attractions_service.get_attractions(
+            country=name, limit=limit, offset=offset, kinds=kinds, details=details
+        )
         return attractions
     except HTTPException:
         raise
@@ -283,17 +585,35 @@ async def get_safety(name: str = Path(..., description="Country name")):
         logger.error(f"Error fetching safety for {name}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching safety: {str(e)}")
 
+@app.get("/countries/{name}/map/layers", response_model=Dict[str, Any], tags=["map"])
+async def get_country_map_layers(name: str = Path(..., description="Country name")):
+    try:
+        return await country_service.get_country_map_layers(name)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching map layers: {str(e)}")
+
 @app.get("/countries/{name}/map", response_class=HTMLResponse, tags=["map"])
-async def get_country_map(name: str = Path(..., description="Country name")):
+async def get_country_map(
+    name: str = Path(..., description="Country name"),
+    progressive: bool = Query(False, description="Return the map shell immediately and load POIs/Mapillary markers from /map/layers")
+):
     try:
-        map_data = await country_service.get_country_map_data(name)
+        map_data = await country_service.get_country_map_data(name, include_layers=not progressive)
         maptiler_key = os.getenv("MAPTILER_API_KEY") or ""
         mapillary_key = os.getenv("MAPILLARY_CLIENT_ID") or ""
 
         # Serialize JSON data with proper escaping
-        geojson_str = json.dumps(map_data['geojson'], ensure_ascii=False)
-        mapillary_images_str = json.dumps(map_data['mapillary_images'], ensure_ascii=False)
-        pois_str = json.dumps(map_data['pois'], ensure_ascii=False)
+        geojson_str = map_data.get('geojson_json') or json.dumps(map_data['geojson'], ensure_ascii=False)
+        if progressive:
+            layers_url = json.dumps(f"/countries/{quote(name)}/map/layers")
+            load_layers = f"fetch({layers_url}).then(function(r) {{ return r.json(); }}).then(addLayers);"
+        else:
+            layers_str = json.dumps(
+                {"mapillary_images": map_data['mapillary_images'], "pois": map_data['pois']}, ensure_ascii=False
+            )
+            load_layers = f"addLayers({layers_str});"
 
         # Generate HTML with Leaflet, Mapillary, and additional layers
         html_content = f"""
@@ -353,30 +673,33 @@ async def get_country_map(name: str = Path(..., description="Country name")):
                       [{map_data['coordinates']['boundingbox'][1]}, {map_data['coordinates']['boundingbox'][3]}]];
         map.fitBounds(bounds);
 
-        // Add Mapillary viewer
-        var mapillaryImages = {mapillary_images_str};
-        if (mapillaryImages.length > 0) {{
-            var viewer = new Mapillary.Viewer({{
-                container: 'mapillary',
-                imageId: mapillaryImages[0].id,
-                accessToken: '{mapillary_key}',
-                component: {{ cover: false }}
-            }});
-            mapillaryImages.forEach(function(img) {{
-                L.marker([img.lat, img.lon]).addTo(map)
-                    .bindPopup('<img src="' + img.thumb_url + '" width="100" /><br>Click to view')
-                    .on('click', function() {{
-                        viewer.moveTo(img.id);
-                    }});
+        function addLayers(layers) {{
+            // Add Mapillary viewer
+            var mapillaryImages = layers.mapillary_images || [];
+            if (mapillaryImages.length > 0) {{
+                var viewer = new Mapillary.Viewer({{
+                    container: 'mapillary',
+                    imageId: mapillaryImages[0].id,
+                    accessToken: '{mapillary_key}',
+                    component: {{ cover: false }}
+                }});
+                mapillaryImages.forEach(function(img) {{
+                    L.marker([img.lat, img.lon]).addTo(map)
+                        .bindPopup('<img src="' + img.thumb_url + '" width="100" /><br>Click to view')
+                        .on('click', function() {{
+                            viewer.moveTo(img.id);
+                        }});
+                }});
+            }}
+
+            // Add POI markers
+            var pois = layers.pois || [];
+            pois.forEach(function(poi) {{
+                L.marker([poi.lat, poi.lon]).addTo(map)
+                    .bindPopup('<b>' + poi.name + '</b><br>Type: ' + poi.type);
             }});
         }}
-
-        // Add POI markers
-        var pois = {pois_str};
-        pois.forEach(function(poi) {{
-            L.marker([poi.lat, poi.lon]).addTo(map)
-                .bindPopup('<b>' + poi.name + '</b><br>Type: ' + poi.type);
-        }});
+        {load_layers}
     </script>
 </body>
 </html>
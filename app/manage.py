@@ -0,0 +1,175 @@
+"""
+Maintenance commands for the countries collection.
+
+Usage:
+    python -m app.manage backfill-names [--force]
+    python -m app.manage import countries.json [--batch-size 500] [--strict] [--dry-run]
+    python -m app.manage geocode-capitals [--force]
+"""
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+import argparse
+import json
+import logging
+import os
+import time
+import httpx
+from pydantic import ValidationError
+from app import config  # also loads .env
+from app.models.country import CountryModel, IMPORT_BATCH_SIZE
+from app.schemas.country_schema import CountryRecord
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _country_model() -> CountryModel:
+    return CountryModel(
+        os.getenv("MONGODB_URL", "mongodb://localhost:27017"),
+        os.getenv("MONGODB_DB", "countries_db"),
+        os.getenv("MONGODB_COLLECTION", "countries"),
+    )
+
+
+def backfill_names(args) -> None:
+    model = _country_model()
+    updated = model.backfill_name_norm(force=args.force)
+    logger.info(f"Updated name_norm on {updated} countries")
+    model.ensure_indexes()
+    logger.info("Ensured unique name_norm index")
+
+
+def iter_json_records(handle: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Records from a JSON array (countries.json, mongoexport --jsonArray) or from
+    newline-delimited JSON, decoded a chunk at a time instead of loading the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = handle.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        # Newline-delimited JSON
+        buffer += handle.readline()
+        for line in buffer.splitlines():
+            if line.strip():
+                yield json.loads(line)
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+        return
+    buffer = buffer[1:]
+    while True:
+        buffer = buffer.lstrip().removeprefix(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                raise
+            buffer += chunk
+            continue
+        yield record
+        buffer = buffer[end:]
+
+
+def validate_records(records: Iterator[Any]) -> Iterator[Tuple[int, Dict[str, Any], str]]:
+    """(index, document, error) per record; error is empty when the record is valid."""
+    for index, record in enumerate(records):
+        try:
+            document = CountryRecord.model_validate(record).model_dump(exclude_none=True)
+            yield index, document, ""
+        except ValidationError as e:
+            problems = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'record'}: {err['msg']}" for err in e.errors())
+            yield index, {}, problems
+
+
+def import_countries(args) -> None:
+    model = None if args.dry_run else _country_model()
+    if model is not None:
+        model.ensure_indexes()
+    totals = {"read": 0, "invalid": 0, "inserted": 0, "updated": 0, "failed": 0}
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        if model is not None and batch:
+            for key, count in model.import_batch(batch).items():
+                totals[key] += count
+        batch.clear()
+
+    with open(args.path, encoding="utf-8") as handle:
+        for index, document, error in validate_records(iter_json_records(handle)):
+            totals["read"] += 1
+            if error:
+                totals["invalid"] += 1
+                logger.error(f"Record {index} is invalid: {error}")
+                if args.strict:
+                    raise SystemExit(f"Aborting import at record {index}; {totals['read'] - 1} records read before it")
+                continue
+            batch.append(document)
+            if len(batch) >= args.batch_size:
+                flush()
+        flush()
+    logger.info(f"Import of {args.path} finished: " + ", ".join(f"{k}={v}" for k, v in totals.items()))
+
+
+def _capital_point(client: httpx.Client, capital: str, country: str) -> Optional[Dict[str, float]]:
+    response = client.get("https://nominatim.openstreetmap.org/search",
+                          params={"city": capital, "country": country, "format": "json", "limit": 1})
+    response.raise_for_status()
+    results = response.json()
+    if not results:
+        return None
+    return {"lat": round(float(results[0]["lat"]), 4), "lon": round(float(results[0]["lon"]), 4)}
+
+
+def geocode_capitals(args) -> None:
+    """Store capital coordinates on each country (used for weather); Nominatim allows 1 request/s."""
+    model = _country_model()
+    countries = model.capitals_to_geocode(force=args.force)
+    logger.info(f"Geocoding capitals of {len(countries)} countries")
+    points: Dict[str, Dict[str, float]] = {}
+    with httpx.Client(headers={"User-Agent": config.HTTP_USER_AGENT}, timeout=10.0) as client:
+        for country in countries:
+            started = time.monotonic()
+            # Countries with several capitals are geocoded at the first one listed
+            capital = country["capital"][0] if isinstance(country["capital"], list) else country["capital"]
+            capital = capital.split(";")[0].strip()
+            try:
+                point = _capital_point(client, capital, country["name"])
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                logger.error(f"Could not geocode {capital}, {country['name']}: {str(e)}")
+                point = None
+            if point:
+                points[country["name"]] = point
+            else:
+                logger.warning(f"No coordinates found for {capital}, {country['name']}")
+            time.sleep(max(0.0, 1.0 - (time.monotonic() - started)))
+    updated = model.set_capital_coordinates(points)
+    logger.info(f"Stored capital coordinates on {updated} countries")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description="Country data maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = subcommands.add_parser("backfill-names", help="Populate name_norm and create its unique index")
+    backfill.add_argument("--force", action="store_true", help="Recompute name_norm on every document")
+    backfill.set_defaults(func=backfill_names)
+
+    importer = subcommands.add_parser("import", help="Validate and upsert countries from a JSON array or NDJSON file")
+    importer.add_argument("path", help="File to import, e.g. countries.json")
+    importer.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Documents per bulk_write")
+    importer.add_argument("--strict", action="store_true", help="Abort on the first invalid record")
+    importer.add_argument("--dry-run", action="store_true", help="Validate only; do not connect to MongoDB")
+    importer.set_defaults(func=import_countries)
+
+    capitals = subcommands.add_parser("geocode-capitals", help="Store capital coordinates used for weather forecasts")
+    capitals.add_argument("--force", action="store_true", help="Re-geocode countries that already have coordinates")
+    capitals.set_defaults(func=geocode_capitals)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
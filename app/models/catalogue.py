@@ -0,0 +1,143 @@
+from typing import List, Dict, Any, Optional, Iterable
+import bisect
+import itertools
+import logging
+from app.models.country import normalize_name, NAME_NORM_FIELD
+from app.models.payload import EncodedPayload
+from app.models.search_index import SearchIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CountryCatalogue:
+    """
+    In-memory copy of the countries collection keyed by normalized name.
+    The full list is kept pre-serialized (and pre-compressed) as the body of
+    GET /countries/ and rebuilt lazily after a write, and the autocomplete index is
+    updated document by document. Documents are handed out as shallow copies
+    so callers can enrich them without mutating the cache.
+    """
+
+    def __init__(self):
+        self._by_norm: Dict[str, Dict[str, Any]] = {}
+        self._ids: Dict[str, str] = {}
+        self._list_payload: Optional[EncodedPayload] = None
+        self._sorted: Optional[List[str]] = None
+        self.index = SearchIndex()
+        self.loaded = False
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, documents: Iterable[Dict[str, Any]]) -> None:
+        by_norm: Dict[str, Dict[str, Any]] = {}
+        ids: Dict[str, str] = {}
+        for doc in documents:
+            if not doc.get("name"):
+                continue
+            norm = normalize_name(doc["name"])
+            by_norm[norm] = self._public(doc)
+            if "_id" in doc:
+                ids[str(doc["_id"])] = norm
+        self._by_norm = by_norm
+        self._ids = ids
+        self._list_payload = None
+        self._sorted = None
+        self.index.rebuild(by_norm.items())
+        self.loaded = True
+        self.version += 1
+        logger.info(f"Loaded {len(by_norm)} countries into the catalogue (version {self.version})")
+
+    @staticmethod
+    def _public(doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in doc.items() if k not in ("_id", NAME_NORM_FIELD)}
+
+    def all(self) -> List[Dict[str, Any]]:
+        self.hits += 1
+        return [dict(doc) for doc in self._by_norm.values()]
+
+    def get(self, norm_name: str) -> Optional[Dict[str, Any]]:
+        doc = self._by_norm.get(norm_name)
+        if doc is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(doc)
+
+    def search(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Autocomplete over names, capitals and languages, best match first."""
+        self.hits += 1
+        return [dict(self._by_norm[norm]) for norm in self.index.search(query, limit)]
+
+    def page(self, fields: Optional[List[str]], limit: Optional[int], after: Optional[str] = None,
+             region: Optional[str] = None, subregion: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Same contract as the Mongo listing query: documents in name_norm order after
+        the `after` key, projected to `fields` and carrying name_norm for the cursor.
+        """
+        if self._sorted is None:
+            self._sorted = sorted(self._by_norm)
+        self.hits += 1
+        start = bisect.bisect_right(self._sorted, after) if after is not None else 0
+        result = []
+        for norm in itertools.islice(self._sorted, start, None):
+            doc = self._by_norm[norm]
+            if (region and doc.get("region") != region) or (subregion and doc.get("subregion") != subregion):
+                continue
+            if fields is None:
+                item = dict(doc)
+            else:
+                item = {f: doc[f] for f in fields if f in doc}
+            item[NAME_NORM_FIELD] = norm
+            result.append(item)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def put(self, doc: Dict[str, Any], previous_norm: Optional[str] = None) -> None:
+        """Insert or replace one document; handles renames via its _id or the previous name."""
+        norm = normalize_name(doc["name"])
+        doc_id = str(doc["_id"]) if "_id" in doc else None
+        old_norm = self._ids.get(doc_id) if doc_id else None
+        old_norm = old_norm or previous_norm
+        if old_norm and old_norm != norm:
+            self._by_norm.pop(old_norm, None)
+            self.index.remove(old_norm)
+        self._by_norm[norm] = self._public(doc)
+        self.index.add(norm, self._by_norm[norm])
+        if doc_id:
+            self._ids[doc_id] = norm
+        self._changed()
+
+    def remove(self, doc_id: Any) -> None:
+        norm = self._ids.pop(str(doc_id), None)
+        if norm is not None:
+            self._by_norm.pop(norm, None)
+            self.index.remove(norm)
+            self._changed()
+
+    def _changed(self) -> None:
+        self._list_payload = None
+        self._sorted = None
+        self.version += 1
+
+    def list_payload(self) -> EncodedPayload:
+        """Serialized {"countries": [...]} body and its variants, regenerated only after a change."""
+        if self._list_payload is None:
+            self._list_payload = EncodedPayload.from_value({"countries": list(self._by_norm.values())})
+        self.hits += 1
+        return self._list_payload
+
+    def list_json(self) -> bytes:
+        return self.list_payload().body
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "size": len(self._by_norm),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "search_index": self.index.stats(),
+        }
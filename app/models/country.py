@@ -1,7 +1,205 @@
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError
-from typing import List, Dict, Any, Optional
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import ServerSelectionTimeoutError, DuplicateKeyError, OperationFailure, BulkWriteError
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterable, Set, Tuple, TYPE_CHECKING
+import asyncio
+import base64
+import logging
 import re
+from app.models.payload import EncodedPayload
+
+if TYPE_CHECKING:
+    from app.models.catalogue import CountryCatalogue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Lower-cased, whitespace-collapsed copy of "name", maintained on every write.
+# Exact lookups and anchored prefix searches on it are plain index seeks.
+NAME_NORM_FIELD = "name_norm"
+NAME_NORM_INDEX = "name_norm_unique"
+# Internal fields never returned to API clients
+PROJECTION = {"_id": 0, NAME_NORM_FIELD: 0}
+# update_one keeps _id so the catalogue can track renames, then strips it
+WRITE_PROJECTION = {NAME_NORM_FIELD: 0}
+BACKFILL_BATCH_SIZE = 500
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r'\s+', ' ', name.strip().lower())
+
+
+def _prepare_update(norm_name: str, update_data: dict) -> Optional[str]:
+    """Add name_norm to a $set document when the name changes; return the new key if it differs."""
+    if "name" not in update_data:
+        return None
+    new_norm = normalize_name(update_data["name"])
+    update_data[NAME_NORM_FIELD] = new_norm
+    return new_norm if new_norm != norm_name else None
+
+
+def _backfill_ops(documents, force: bool) -> List[UpdateOne]:
+    return [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {NAME_NORM_FIELD: normalize_name(doc["name"])}})
+        for doc in documents
+        if doc.get("name") and (force or doc.get(NAME_NORM_FIELD) != normalize_name(doc["name"]))
+    ]
+
+
+def _missing_norm_filter(force: bool) -> Dict[str, Any]:
+    return {} if force else {NAME_NORM_FIELD: {"$exists": False}}
+
+
+def _legacy_name_filter(norm_name: str, exact: bool = True) -> Dict[str, Any]:
+    """Case-insensitive match on "name" for documents written before name_norm existed."""
+    pattern = f"^{re.escape(norm_name)}$" if exact else f"^{re.escape(norm_name)}"
+    return {NAME_NORM_FIELD: {"$exists": False}, "name": {"$regex": pattern, "$options": "i"}}
+
+
+# Listing: pages are ordered by name_norm and continue after the last key seen (keyset
+# pagination), so region/subregion filters are served by these compound indexes
+LIST_INDEXES = {
+    "region_name_norm": [("region", 1), (NAME_NORM_FIELD, 1)],
+    "subregion_name_norm": [("subregion", 1), (NAME_NORM_FIELD, 1)],
+}
+LIST_MAX_LIMIT = 500
+STREAM_BATCH_SIZE = 100
+_FIELD_NAME = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+
+def encode_cursor(norm_name: str) -> str:
+    return base64.urlsafe_b64encode(norm_name.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def list_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """Validated field names for a listing projection; None means every public field."""
+    if not fields:
+        return None
+    cleaned = list(dict.fromkeys(f.strip() for f in fields if f.strip()))
+    invalid = [f for f in cleaned if not _FIELD_NAME.match(f) or f == NAME_NORM_FIELD]
+    if invalid:
+        raise ValueError(f"Invalid fields: {', '.join(invalid)}")
+    return cleaned or None
+
+
+def list_filter(region: Optional[str] = None, subregion: Optional[str] = None,
+                after: Optional[str] = None) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if region:
+        query["region"] = region
+    if subregion:
+        query["subregion"] = subregion
+    if after is not None:
+        query[NAME_NORM_FIELD] = {"$gt": after}
+    return query
+
+
+def list_projection(fields: Optional[List[str]]) -> Dict[str, Any]:
+    # name_norm is always fetched for the cursor and stripped before returning
+    if fields is None:
+        return {"_id": 0}
+    return {"_id": 0, NAME_NORM_FIELD: 1, **{f: 1 for f in fields}}
+
+
+# {"lat", "lon"} of the capital, filled in by `python -m app.manage geocode-capitals`
+CAPITAL_COORDINATES_FIELD = "capital_coordinates"
+
+
+def capital_coordinates(country: Optional[Dict[str, Any]]) -> Optional[Dict[str, float]]:
+    """Capital coordinates stored on a country document, also accepting REST Countries' capitalInfo."""
+    if not country:
+        return None
+    point = country.get(CAPITAL_COORDINATES_FIELD)
+    if isinstance(point, dict) and point.get("lat") is not None and point.get("lon") is not None:
+        return {"lat": float(point["lat"]), "lon": float(point["lon"])}
+    latlng = (country.get("capitalInfo") or {}).get("latlng")
+    if isinstance(latlng, (list, tuple)) and len(latlng) == 2:
+        return {"lat": float(latlng[0]), "lon": float(latlng[1])}
+    return None
+
+
+# Bulk writes: every item becomes one UpdateOne in a single bulk_write; the touched
+# documents are then read back with one $in query for per-item results
+BULK_MAX_ITEMS = 1000
+IMPORT_BATCH_SIZE = 500
+
+
+def _bulk_op(name: str, update: Dict[str, Any], upsert: bool) -> Tuple[UpdateOne, str, str]:
+    """(operation, current key, key after the write) for one bulk item."""
+    norm_name = normalize_name(name)
+    if not norm_name:
+        raise ValueError("Country name must not be empty")
+    update = dict(update)
+    update.pop(NAME_NORM_FIELD, None)
+    if not update and not upsert:
+        raise ValueError(f"Nothing to update for {name}")
+    new_norm = _prepare_update(norm_name, update)
+    document: Dict[str, Any] = {}
+    if update:
+        document["$set"] = update
+    if upsert and "name" not in update:
+        document["$setOnInsert"] = {"name": name.strip()}
+    return UpdateOne({NAME_NORM_FIELD: norm_name}, document, upsert=upsert), norm_name, new_norm or norm_name
+
+
+def _import_op(record: Dict[str, Any]) -> UpdateOne:
+    record = {k: v for k, v in record.items() if k not in ("_id", NAME_NORM_FIELD)}
+    norm_name = normalize_name(record["name"])
+    return UpdateOne({NAME_NORM_FIELD: norm_name}, {"$set": {**record, NAME_NORM_FIELD: norm_name}}, upsert=True)
+
+
+def _bulk_write_details(error: BulkWriteError) -> Tuple[Dict[int, Any], Dict[int, str], int, int]:
+    details = error.details
+    upserted = {u["index"]: u["_id"] for u in details.get("upserted", [])}
+    errors = {e["index"]: e.get("errmsg", "Write failed") for e in details.get("writeErrors", [])}
+    for index, message in errors.items():
+        if "E11000" in message:
+            errors[index] = "Country name already exists"
+    return upserted, errors, details.get("nMatched", 0), details.get("nModified", 0)
+
+
+def _bulk_matched(norms: List[str], targets: List[str], upserted: Dict[int, Any], errors: Dict[int, str],
+                  existing: Set[str], ordered: bool) -> Set[int]:
+    """Indexes of items that wrote a document, replaying the batch over the names that existed before it."""
+    first_error = min(errors) if errors else None
+    present, matched = set(existing), set()
+    for index, (norm, target) in enumerate(zip(norms, targets)):
+        if index in errors or (ordered and first_error is not None and index > first_error):
+            continue
+        if index in upserted or norm in present:
+            matched.add(index)
+            present.discard(norm)
+            present.add(target)
+    return matched
+
+
+def _bulk_results(names: List[str], upserted: Dict[int, Any], errors: Dict[int, str],
+                  matched: Set[int], ordered: bool) -> List[Dict[str, Any]]:
+    # An ordered bulk_write stops at the first error; later items were never attempted
+    first_error = min(errors) if errors else None
+    results = []
+    for index, name in enumerate(names):
+        result: Dict[str, Any] = {"index": index, "name": name}
+        if index in errors:
+            result.update(status="error", detail=errors[index])
+        elif ordered and first_error is not None and index > first_error:
+            result["status"] = "skipped"
+        elif index in upserted:
+            result["status"] = "inserted"
+        elif index in matched:
+            result["status"] = "updated"
+        else:
+            result["status"] = "not_found"
+        results.append(result)
+    return results
+
 
 class CountryModel:
     def __init__(self, mongodb_url, db_name, collection_name):
@@ -9,11 +207,11 @@ class CountryModel:
         self.collection = self.client[db_name][collection_name]
 
     def normalize_name(self, name: str) -> str:
-        return re.sub(r'\s+', ' ', name.strip().lower())
+        return normalize_name(name)
 
     def find_all(self) -> List[Dict[str, Any]]:
         try:
-            return list(self.collection.find({}, {"_id": 0}))
+            return list(self.collection.find({}, PROJECTION))
         except ServerSelectionTimeoutError:
             raise Exception("Could not connect to MongoDB")
 
@@ -21,16 +219,18 @@ class CountryModel:
         try:
             norm_query = self.normalize_name(query)
             if not norm_query:
-                print("Empty query, returning empty list")
                 return []
-            print(f"Searching for: {norm_query}")
-            countries = self.collection.find(
-                {"name": {"$regex": f"^{re.escape(norm_query)}", "$options": "i"}},
-                {"_id": 0}
-            ).limit(limit)
-            result = list(countries)
-            print(f"Found {len(result)} countries")
-            return result
+            # Case-sensitive anchored regex on the normalized field is an index range scan
+            countries = list(self.collection.find(
+                {NAME_NORM_FIELD: {"$regex": f"^{re.escape(norm_query)}"}},
+                PROJECTION
+            ).limit(limit))
+            if len(countries) < limit:
+                # Documents not yet backfilled (see python -m app.manage backfill-names)
+                countries += self.collection.find(
+                    _legacy_name_filter(norm_query, exact=False), PROJECTION
+                ).limit(limit - len(countries))
+            return countries
         except ServerSelectionTimeoutError:
             raise Exception("Could not connect to MongoDB")
         except Exception as e:
@@ -39,29 +239,363 @@ class CountryModel:
     def find_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         try:
             norm_name = self.normalize_name(name)
-            country = self.collection.find_one(
-                {"name": {"$regex": f"^{re.escape(norm_name)}$", "$options": "i"}},
-                {"_id": 0}
-            )
-            return country
+            return (self.collection.find_one({NAME_NORM_FIELD: norm_name}, PROJECTION)
+                    or self.collection.find_one(_legacy_name_filter(norm_name), PROJECTION))
         except ServerSelectionTimeoutError:
             raise Exception("Could not connect to MongoDB")
 
     def update_one(self, name: str, update_data: dict) -> Optional[Dict[str, Any]]:
         try:
             norm_name = self.normalize_name(name)
-            country = self.collection.find_one(
-                {"name": {"$regex": f"^{re.escape(norm_name)}$", "$options": "i"}}
+            update_data = dict(update_data)
+            new_norm = _prepare_update(norm_name, update_data)
+            if new_norm and self.collection.find_one({NAME_NORM_FIELD: new_norm}, {"_id": 1}):
+                raise Exception("Country name already exists")
+            # A document without name_norm gets it on its first write
+            update_data.setdefault(NAME_NORM_FIELD, norm_name)
+            return self.collection.find_one_and_update(
+                {"$or": [{NAME_NORM_FIELD: norm_name}, _legacy_name_filter(norm_name)]},
+                {"$set": update_data},
+                projection=PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            raise Exception("Country name already exists")
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+
+    def import_batch(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Upsert validated country records by name in one unordered bulk_write."""
+        if not records:
+            return {"inserted": 0, "updated": 0, "failed": 0}
+        try:
+            result = self.collection.bulk_write([_import_op(r) for r in records], ordered=False)
+            return {"inserted": result.upserted_count, "updated": result.modified_count, "failed": 0}
+        except BulkWriteError as e:
+            upserted, errors, _, modified = _bulk_write_details(e)
+            for index, message in errors.items():
+                logger.error(f"Could not import {records[index].get('name')}: {message}")
+            return {"inserted": len(upserted), "updated": modified, "failed": len(errors)}
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+
+    def capitals_to_geocode(self, force: bool = False) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {"capital": {"$nin": [None, ""]}}
+        if not force:
+            query[CAPITAL_COORDINATES_FIELD] = {"$exists": False}
+        try:
+            return list(self.collection.find(query, {"_id": 0, "name": 1, "capital": 1}))
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+
+    def set_capital_coordinates(self, points: Dict[str, Dict[str, float]]) -> int:
+        """Store {"lat", "lon"} per country name in one bulk_write. Returns the number modified."""
+        ops = [
+            UpdateOne({NAME_NORM_FIELD: normalize_name(name)}, {"$set": {CAPITAL_COORDINATES_FIELD: point}})
+            for name, point in points.items()
+        ]
+        if not ops:
+            return 0
+        try:
+            return self.collection.bulk_write(ops, ordered=False).modified_count
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+
+    def backfill_name_norm(self, force: bool = False) -> int:
+        """Populate name_norm on documents imported without it. Returns the number of documents updated."""
+        updated = 0
+        cursor = self.collection.find(_missing_norm_filter(force), {"_id": 1, "name": 1, NAME_NORM_FIELD: 1})
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= BACKFILL_BATCH_SIZE:
+                updated += self._write_backfill(batch, force)
+                batch = []
+        if batch:
+            updated += self._write_backfill(batch, force)
+        return updated
+
+    def _write_backfill(self, documents, force: bool) -> int:
+        ops = _backfill_ops(documents, force)
+        if not ops:
+            return 0
+        return self.collection.bulk_write(ops, ordered=False).modified_count
+
+    def ensure_indexes(self) -> None:
+        updated = self.backfill_name_norm()
+        if updated:
+            logger.info(f"Backfilled {NAME_NORM_FIELD} on {updated} countries")
+        try:
+            self.collection.create_index(NAME_NORM_FIELD, unique=True, name=NAME_NORM_INDEX)
+        except OperationFailure as e:
+            logger.error(f"Could not create unique {NAME_NORM_FIELD} index: {str(e)}")
+
+
+class AsyncCountryModel:
+    """
+    motor-backed variant of CountryModel with the same API, for the FastAPI app.
+    Queries run on the event loop instead of hopping through the threadpool.
+    When a CountryCatalogue is attached and loaded, reads are served from memory
+    and update_one keeps it current.
+    """
+
+    def __init__(self, mongodb_url, db_name, collection_name, catalogue: Optional["CountryCatalogue"] = None):
+        self.client = AsyncIOMotorClient(mongodb_url, serverSelectionTimeoutMS=5000)
+        self.collection = self.client[db_name][collection_name]
+        self.catalogue = catalogue
+
+    def normalize_name(self, name: str) -> str:
+        return normalize_name(name)
+
+    def _catalogue_ready(self) -> bool:
+        return self.catalogue is not None and self.catalogue.loaded
+
+    async def load_catalogue(self) -> None:
+        if self.catalogue is None:
+            return
+        try:
+            documents = await self.collection.find({}, WRITE_PROJECTION).to_list(length=None)
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+        self.catalogue.load(documents)
+
+    async def find_all(self) -> List[Dict[str, Any]]:
+        if self._catalogue_ready():
+            return self.catalogue.all()
+        try:
+            return await self.collection.find({}, PROJECTION).to_list(length=None)
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+
+    async def list_countries(self, fields: Optional[List[str]] = None, limit: int = LIST_MAX_LIMIT,
+                             cursor: Optional[str] = None, region: Optional[str] = None,
+                             subregion: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page ordered by normalized name: {"countries": [...], "next_cursor": str | None}.
+        Filters and the projection are pushed down to Mongo (or the catalogue when loaded).
+        """
+        fields = list_fields(fields)
+        limit = max(1, min(limit, LIST_MAX_LIMIT))
+        after = decode_cursor(cursor) if cursor else None
+        if self._catalogue_ready():
+            page = self.catalogue.page(fields, limit + 1, after, region, subregion)
+        else:
+            try:
+                page = await self.collection.find(
+                    list_filter(region, subregion, after), list_projection(fields)
+                ).sort(NAME_NORM_FIELD, 1).limit(limit + 1).to_list(length=limit + 1)
+            except ServerSelectionTimeoutError:
+                raise Exception("Could not connect to MongoDB")
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1][NAME_NORM_FIELD])
+        for doc in page:
+            doc.pop(NAME_NORM_FIELD, None)
+        return {"countries": page, "next_cursor": next_cursor}
+
+    async def iter_countries(self, fields: Optional[List[str]] = None, cursor: Optional[str] = None,
+                             region: Optional[str] = None, subregion: Optional[str] = None,
+                             limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream matching countries in name order without materializing the result set."""
+        fields = list_fields(fields)
+        after = decode_cursor(cursor) if cursor else None
+        if self._catalogue_ready():
+            for doc in self.catalogue.page(fields, limit, after, region, subregion):
+                doc.pop(NAME_NORM_FIELD, None)
+                yield doc
+            return
+        find = self.collection.find(list_filter(region, subregion, after), list_projection(fields))
+        find = find.sort(NAME_NORM_FIELD, 1).batch_size(STREAM_BATCH_SIZE)
+        if limit:
+            find = find.limit(limit)
+        try:
+            async for doc in find:
+                doc.pop(NAME_NORM_FIELD, None)
+                yield doc
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+        finally:
+            await find.close()
+
+    async def list_payload(self) -> EncodedPayload:
+        """GET /countries/ body; cached with its compressed variants when the catalogue is loaded."""
+        if self._catalogue_ready():
+            return self.catalogue.list_payload()
+        return EncodedPayload.from_value({"countries": await self.find_all()})
+
+    async def find_all_json(self) -> bytes:
+        return (await self.list_payload()).body
+
+    async def search_by_name(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        try:
+            norm_query = self.normalize_name(query)
+            if not norm_query:
+                return []
+            if self._catalogue_ready():
+                return self.catalogue.search(query, limit)
+            cursor = self.collection.find(
+                {NAME_NORM_FIELD: {"$regex": f"^{re.escape(norm_query)}"}},
+                PROJECTION
+            ).limit(limit)
+            return await cursor.to_list(length=limit)
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+        except Exception as e:
+            raise Exception(f"Error searching countries: {str(e)}")
+
+    async def find_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        norm_name = self.normalize_name(name)
+        if self._catalogue_ready():
+            country = self.catalogue.get(norm_name)
+            if country is not None:
+                return country
+        try:
+            country = await self.collection.find_one({NAME_NORM_FIELD: norm_name}, WRITE_PROJECTION)
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+        if country is None:
+            return None
+        # Written by another process since the catalogue was loaded
+        if self._catalogue_ready():
+            self.catalogue.put(country)
+        country.pop("_id", None)
+        return country
+
+    async def update_one(self, name: str, update_data: dict) -> Optional[Dict[str, Any]]:
+        try:
+            norm_name = self.normalize_name(name)
+            update_data = dict(update_data)
+            new_norm = _prepare_update(norm_name, update_data)
+            if new_norm and await self.collection.find_one({NAME_NORM_FIELD: new_norm}, {"_id": 1}):
+                raise Exception("Country name already exists")
+            updated = await self.collection.find_one_and_update(
+                {NAME_NORM_FIELD: norm_name},
+                {"$set": update_data},
+                projection=WRITE_PROJECTION,
+                return_document=ReturnDocument.AFTER
             )
-            if not country:
-                return None
-            if "name" in update_data:
-                existing = self.collection.find_one(
-                    {"name": {"$regex": f"^{re.escape(update_data['name'])}$", "$options": "i"}}
-                )
-                if existing and self.normalize_name(existing["name"]) != norm_name:
-                    raise Exception("Country name already exists")
-            self.collection.update_one({"_id": country["_id"]}, {"$set": update_data})
-            return self.collection.find_one({"_id": country["_id"]}, {"_id": 0})
+        except DuplicateKeyError:
+            raise Exception("Country name already exists")
+        except ServerSelectionTimeoutError:
+            raise Exception("Could not connect to MongoDB")
+        if updated is None:
+            return None
+        if self.catalogue is not None:
+            self.catalogue.put(updated, previous_norm=norm_name)
+        updated.pop("_id", None)
+        return updated
+
+    async def bulk_update(self, items: List[Dict[str, Any]], ordered: bool = True) -> Dict[str, Any]:
+        """
+        Apply many updates/upserts ({"name", "update", "upsert"}) as one bulk_write.
+        Ordered mode stops at the first failing item; unordered attempts every item.
+        """
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValueError(f"At most {BULK_MAX_ITEMS} items per bulk request")
+        ops, names, norms, targets = [], [], [], []
+        for index, item in enumerate(items):
+            try:
+                op, norm_name, target = _bulk_op(item["name"], item.get("update") or {}, item.get("upsert", False))
+            except ValueError as e:
+                raise ValueError(f"Item {index}: {str(e)}")
+            ops.append(op)
+            names.append(item["name"])
+            norms.append(norm_name)
+            targets.append(target)
+        if not ops:
+            return {"ordered": ordered, "matched": 0, "modified": 0, "upserted": 0, "results": []}
+
+        try:
+            # Which source names exist decides per item whether it matched; a rename
+            # onto a name that already exists must not count as an update
+            existing = await self.collection.find(
+                {NAME_NORM_FIELD: {"$in": list(set(norms))}}, {NAME_NORM_FIELD: 1}
+            ).to_list(length=None)
+            try:
+                result = await self.collection.bulk_write(ops, ordered=ordered)
+                upserted, errors = result.upserted_ids, {}
+                matched, modified = result.matched_count, result.modified_count
+            except BulkWriteError as e:
+                upserted, errors, matched, modified = _bulk_write_details(e)
+            written = _bulk_matched(norms, targets, upserted, errors,
+                                    {doc.get(NAME_NORM_FIELD) for doc in existing}, ordered)
+            documents = await self.collection.find(
+                {NAME_NORM_FIELD: {"$in": [targets[index] for index in written]}}, WRITE_PROJECTION
+            ).to_list(length=None) if written else []
         except ServerSelectionTimeoutError:
-            raise Exception("Could not connect to MongoDB")
\ No newline at end of file
+            raise Exception("Could not connect to MongoDB")
+
+        if self.catalogue is not None:
+            previous = {targets[index]: norms[index] for index in sorted(written)}
+            for doc in documents:
+                self.catalogue.put(doc, previous_norm=previous.get(normalize_name(doc.get("name", ""))))
+        return {
+            "ordered": ordered,
+            "matched": matched,
+            "modified": modified,
+            "upserted": len(upserted),
+            "results": _bulk_results(names, upserted, errors, written, ordered),
+        }
+
+    async def watch_changes(self) -> None:
+        """
+        Apply writes made by other workers to the catalogue via a change stream.
+        Change streams need a replica set; on a standalone server this logs and returns.
+        """
+        if self.catalogue is None:
+            return
+        while True:
+            try:
+                async with self.collection.watch(full_document="updateLookup") as stream:
+                    logger.info("Watching countries collection for catalogue changes")
+                    async for change in stream:
+                        operation = change.get("operationType")
+                        if operation in ("insert", "update", "replace") and change.get("fullDocument"):
+                            self.catalogue.put(change["fullDocument"])
+                        elif operation == "delete":
+                            self.catalogue.remove(change["documentKey"]["_id"])
+                        else:
+                            await self.load_catalogue()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                logger.warning(f"Change streams unavailable, catalogue will not follow other workers: {str(e)}")
+                return
+            except Exception as e:
+                logger.error(f"Catalogue change stream failed, reloading: {str(e)}")
+                await asyncio.sleep(5)
+                try:
+                    await self.load_catalogue()
+                except Exception as reload_error:
+                    logger.error(f"Catalogue reload failed: {str(reload_error)}")
+
+    async def backfill_name_norm(self, force: bool = False) -> int:
+        updated = 0
+        cursor = self.collection.find(_missing_norm_filter(force), {"_id": 1, "name": 1, NAME_NORM_FIELD: 1})
+        while True:
+            batch = await cursor.to_list(length=BACKFILL_BATCH_SIZE)
+            if not batch:
+                break
+            ops = _backfill_ops(batch, force)
+            if ops:
+                result = await self.collection.bulk_write(ops, ordered=False)
+                updated += result.modified_count
+        return updated
+
+    async def ensure_indexes(self) -> None:
+        updated = await self.backfill_name_norm()
+        if updated:
+            logger.info(f"Backfilled {NAME_NORM_FIELD} on {updated} countries")
+        try:
+            await self.collection.create_index(NAME_NORM_FIELD, unique=True, name=NAME_NORM_INDEX)
+        except OperationFailure as e:
+            logger.error(f"Could not create unique {NAME_NORM_FIELD} index: {str(e)}")
+        for index_name, keys in LIST_INDEXES.items():
+            try:
+                await self.collection.create_index(keys, name=index_name)
+            except OperationFailure as e:
+                logger.error(f"Could not create {index_name} index: {str(e)}")
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,92 @@
+from typing import Any, Dict, Tuple, Optional
+import gzip
+import hashlib
+import json
+
+# Optional accelerators: orjson encodes the country list several times faster than
+# json, and brotli adds a "br" variant; without them we fall back to json and gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred order when the client accepts several codings equally
+_CODINGS = ("br", "gzip", "identity")
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """UTF-8 JSON, non-ASCII kept as-is; unknown types (e.g. ObjectId) become strings."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _accepted(accept_encoding: Optional[str]) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class EncodedPayload:
+    """
+    A response body serialized once, with pre-compressed variants and a strong
+    content-hash ETag per coding (the same bytes always get the same ETag, so
+    every worker agrees on it).
+    """
+
+    __slots__ = ("body", "etag", "_variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self._variants: Dict[str, bytes] = {
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=6, mtime=0),
+        }
+        if brotli is not None:
+            self._variants["br"] = brotli.compress(body, quality=9)
+
+    @classmethod
+    def from_value(cls, value: Any) -> "EncodedPayload":
+        return cls(dumps_bytes(value))
+
+    def etag_for(self, coding: str) -> str:
+        return self.etag if coding == "identity" else f'{self.etag[:-1]}-{coding}"'
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Tuple[str, bytes]:
+        """Best available (coding, body) for an Accept-Encoding header."""
+        accepted = _accepted(accept_encoding)
+        wildcard = accepted.get("*")
+        best, best_q = "identity", 0.0
+        for coding in _CODINGS:
+            if coding not in self._variants:
+                continue
+            q = accepted.get(coding, wildcard if wildcard is not None and coding != "identity" else None)
+            if coding == "identity" and q is None:
+                q = 0.001   # acceptable unless explicitly refused
+            if q and q > best_q:
+                best, best_q = coding, q
+        return best, self._variants[best]
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """If-None-Match against this version, whichever coding the client cached."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or any(self.etag_for(coding) in tags for coding in self._variants)
@@ -0,0 +1,209 @@
+from collections import defaultdict
+from typing import Dict, Any, List, Set, Tuple, Iterable
+import re
+import unicodedata
+
+_SEPARATORS = re.compile(r"[\s,;/()\-]+")
+
+# Rank of each kind of match; lower sorts first, population breaks ties
+NAME_PREFIX = 0
+WORD_PREFIX = 1
+OTHER_PREFIX = 2
+FUZZY = 3
+# Shorter queries are mostly unfinished words, where one edit matches almost anything
+FUZZY_MIN_LENGTH = 4
+# Trigram overlap (Jaccard) a fuzzy match needs with the whole term, so a query one edit away
+# from only the start of a longer term ("congo" -> "mongo"lia) is not padded into the results
+FUZZY_MIN_SIMILARITY = 0.3
+
+
+def fold_text(text: str) -> str:
+    """Lower-cased, whitespace-collapsed and accent-free: "Yaoundé" -> "yaounde"."""
+    decomposed = unicodedata.normalize("NFKD", text.strip().lower())
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", folded)
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(left: str, right: str, limit: int) -> int:
+    """Levenshtein distance, giving up (returning limit + 1) once it must exceed limit."""
+    if abs(len(left) - len(right)) > limit:
+        return limit + 1
+    previous = list(range(len(right) + 1))
+    for i, lc in enumerate(left, 1):
+        current = [i]
+        for j, rc in enumerate(right, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (lc != rc)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _terms(doc: Dict[str, Any]) -> Dict[str, int]:
+    """Searchable terms of a country document and the best match kind each one gives."""
+    terms: Dict[str, int] = {}
+
+    def add(text: Any, kind: int) -> None:
+        if not isinstance(text, str):
+            return
+        term = fold_text(text)
+        if term and kind < terms.get(term, FUZZY):
+            terms[term] = kind
+
+    name = doc.get("name") or ""
+    add(name, NAME_PREFIX)
+    for word in _SEPARATORS.split(name)[1:]:
+        add(word, WORD_PREFIX)
+    for field in ("capital", "languages"):
+        value = doc.get(field)
+        if isinstance(value, str):
+            # "Arabic, English, Tigrinya" is indexed whole and per language
+            add(value, OTHER_PREFIX)
+            value = _SEPARATORS.split(value)
+        for part in value if isinstance(value, list) else []:
+            add(part, OTHER_PREFIX)
+    return terms
+
+
+class _TrieNode:
+    __slots__ = ("children", "keys")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.keys: Dict[str, int] = {}     # catalogue key -> best match kind below this node
+
+
+class SearchIndex:
+    """
+    Autocomplete over country names, capitals and languages. Every node of the
+    prefix trie holds the keys of the countries whose terms pass through it, so a
+    prefix lookup is one walk down the query; queries with typos fall back to a
+    trigram index filtered by edit distance. Terms are accent-folded on both sides
+    and results rank by match kind, then population.
+
+    Documents are added and removed one at a time, so the catalogue keeps the index
+    current on every write instead of rebuilding it.
+    """
+
+    def __init__(self, max_fuzzy_candidates: int = 32, max_memo: int = 1024):
+        self.max_fuzzy_candidates = max_fuzzy_candidates
+        self.max_memo = max_memo
+        self._memo: Dict[str, Set[str]] = {}                   # typo queries seen since the last write
+        self._root = _TrieNode()
+        self._terms: Dict[str, Dict[str, int]] = {}            # key -> its terms and match kinds
+        self._population: Dict[str, float] = {}
+        self._term_keys: Dict[str, Set[str]] = {}              # term -> keys that have it
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)  # trigram -> terms containing it
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def rebuild(self, documents: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        self.__init__(self.max_fuzzy_candidates, self.max_memo)
+        for key, doc in documents:
+            self.add(key, doc)
+
+    def add(self, key: str, doc: Dict[str, Any]) -> None:
+        self.remove(key)
+        self._memo.clear()
+        terms = _terms(doc)
+        self._terms[key] = terms
+        population = doc.get("population")
+        self._population[key] = population if isinstance(population, (int, float)) else 0
+        for term, kind in terms.items():
+            node = self._root
+            for char in term:
+                node = node.children.setdefault(char, _TrieNode())
+                node.keys[key] = min(kind, node.keys.get(key, kind))
+            if term not in self._term_keys:
+                self._term_keys[term] = set()
+                for gram in trigrams(term):
+                    self._trigrams[gram].add(term)
+            self._term_keys[term].add(key)
+
+    def remove(self, key: str) -> None:
+        terms = self._terms.pop(key, None)
+        if terms is None:
+            return
+        self._memo.clear()
+        self._population.pop(key, None)
+        for term in terms:
+            path = [self._root]
+            for char in term:
+                node = path[-1].children.get(char)
+                if node is None:    # already pruned along with a longer term of this key
+                    break
+                path.append(node)
+            for depth in range(len(path) - 1, 0, -1):
+                node = path[depth]
+                node.keys.pop(key, None)
+                if not node.keys and not node.children:
+                    del path[depth - 1].children[term[depth - 1]]
+            keys = self._term_keys[term]
+            keys.discard(key)
+            if not keys:
+                del self._term_keys[term]
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+                    if not self._trigrams[gram]:
+                        del self._trigrams[gram]
+
+    def _prefix(self, query: str) -> Dict[str, int]:
+        node = self._root
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return {}
+        return node.keys
+
+    def _fuzzy(self, query: str) -> Set[str]:
+        matches = self._memo.get(query)
+        if matches is None:
+            matches = self._match_fuzzy(query)
+            if len(self._memo) >= self.max_memo:
+                self._memo.clear()
+            self._memo[query] = matches
+        return matches
+
+    def _match_fuzzy(self, query: str) -> Set[str]:
+        limit = 1 if len(query) <= 6 else 2
+        grams = trigrams(query)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] += 1
+        candidates = sorted(shared, key=shared.get, reverse=True)[:self.max_fuzzy_candidates]
+        matches: Set[str] = set()
+        for term in candidates:
+            if shared[term] / (len(grams) + len(trigrams(term)) - shared[term]) < FUZZY_MIN_SIMILARITY:
+                continue
+            # Against the whole term and against a prefix of the query's length,
+            # so a typo in a partially typed word still matches
+            if min(edit_distance(query, term, limit), edit_distance(query, term[:len(query)], limit)) <= limit:
+                matches.update(self._term_keys[term])
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """Catalogue keys matching the query, best first."""
+        query = fold_text(query)
+        if not query:
+            return []
+        ranked: Dict[str, int] = dict(self._prefix(query))
+        if len(ranked) < limit and len(query) >= FUZZY_MIN_LENGTH:
+            for key in self._fuzzy(query):
+                ranked.setdefault(key, FUZZY)
+        ordered = sorted(ranked, key=lambda key: (ranked[key], -self._population.get(key, 0), key))
+        return ordered[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._terms),
+            "terms": len(self._term_keys),
+            "trigrams": len(self._trigrams),
+            "memoized_queries": len(self._memo),
+        }
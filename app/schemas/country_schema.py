@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 class CountryUpdate(BaseModel):
@@ -11,4 +11,12 @@ class CountryUpdate(BaseModel):
     languages: Optional[str] = Field(
         None,
         example="Afrikaans, English, Southern Ndebele, Northern Sotho, Southern Sotho, Swazi, Tswana, Tsonga, Venda, Xhosa, Zulu"
-    )
\ No newline at end of file
+    )
+
+
+class CountryRecord(CountryUpdate):
+    """A full country document as found in countries.json; extra fields are kept."""
+    model_config = ConfigDict(extra="allow")
+
+    name: str = Field(..., min_length=1, example="South Africa")
+    population: Optional[int] = Field(None, ge=0, example=59308690)
@@ -1,63 +1,289 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import math
+import re
 import httpx
+from app import config
+from app.services.http_client import HttpClientManager
+from app.services.rate_limiter import RateLimiterRegistry
+from app.services.cache import ResponseCache, make_key
+from app.services.geocoder import Geocoder
+from app.services.boundaries import Boundary, Ring, polygons, contains, distance_to_edge
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 import logging
 import os
-import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_KINDS = "cultural,natural"
+_KINDS = re.compile(r"^[a-z_]+(,[a-z_]+)*$")
+# Half-width in degrees of the area searched when only a point is known (~100 km)
+POINT_RADIUS_DEGREES = 0.9
+
+Bbox = Tuple[float, float, float, float]   # south, north, west, east
+
+
+def tile_bbox(bbox: Bbox, tile_size: float, max_tiles: int) -> List[Bbox]:
+    """
+    Split a bounding box into a grid of roughly tile_size-degree cells, growing the
+    cells when that would take more than max_tiles requests.
+    """
+    south, north, west, east = bbox
+    height, width = max(north - south, 1e-6), max(east - west, 1e-6)
+    rows, cols = math.ceil(height / tile_size), math.ceil(width / tile_size)
+    if rows * cols > max_tiles:
+        scale = math.sqrt(rows * cols / max_tiles)
+        rows, cols = max(1, math.floor(rows / scale)), max(1, math.floor(cols / scale))
+    lat_step, lon_step = height / rows, width / cols
+    return [
+        (round(south + r * lat_step, 4), round(south + (r + 1) * lat_step, 4),
+         round(west + c * lon_step, 4), round(west + (c + 1) * lon_step, 4))
+        for r in range(rows) for c in range(cols)
+    ]
+
+
+def split_antimeridian(bbox: Bbox) -> List[Bbox]:
+    """A bounding box as one or two boxes within -180..180 longitude."""
+    south, north, west, east = bbox
+    if east - west >= 360:
+        return [(south, north, -180.0, 180.0)]
+    west, east = (lon if -180 <= lon <= 180 else (lon + 180) % 360 - 180 for lon in (west, east))
+    if west <= east:
+        return [(south, north, west, east)]
+    return [(south, north, west, 180.0), (south, north, -180.0, east)]
+
+
+def _cell(lon: float, lat: float, size: float) -> Tuple[int, int]:
+    rows, cols = math.ceil(180 / size), math.ceil(360 / size)
+    return (min(rows - 1, max(0, math.floor((lat + 90) / size))),
+            min(cols - 1, max(0, math.floor((lon + 180) / size))))
+
+
+def _cells(parts: List[List[Ring]], size: float) -> set:
+    """Grid cells a country's polygons touch: those its outlines cross and those wholly inside."""
+    cells = set()
+    for polygon in parts:
+        if not polygon:
+            continue
+        outer = polygon[0]
+        for (x1, y1), (x2, y2) in zip(outer, outer[1:] + outer[:1]):
+            steps = max(1, math.ceil(max(abs(x2 - x1), abs(y2 - y1)) / (size / 4)))
+            for i in range(steps + 1):
+                cells.add(_cell(x1 + (x2 - x1) * i / steps, y1 + (y2 - y1) * i / steps, size))
+        lons, lats = [point[0] for point in outer], [point[1] for point in outer]
+        (r0, c0), (r1, c1) = _cell(min(lons), min(lats), size), _cell(max(lons), max(lats), size)
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                if (r, c) not in cells and contains([polygon], -180 + (c + 0.5) * size, -90 + (r + 0.5) * size):
+                    cells.add((r, c))
+    return cells
+
+
+def country_tiles(parts: List[List[Ring]], tile_size: float, max_tiles: int) -> List[Bbox]:
+    """
+    Tiles of a fixed world grid that cover a country's polygons, so open sea and
+    neighbours inside its bounding box are not queried. Cells never cross the
+    antimeridian, and they grow by half until at most max_tiles are needed.
+    """
+    size = tile_size
+    cells = _cells(parts, size)
+    while len(cells) > max_tiles and size < 360:
+        size *= 1.5
+        cells = _cells(parts, size)
+    return [
+        (round(-90 + r * size, 4), round(min(90.0, -90 + (r + 1) * size), 4),
+         round(-180 + c * size, 4), round(min(180.0, -180 + (c + 1) * size), 4))
+        for r, c in sorted(cells)
+    ]
+
+
+def rate_score(rate: Any) -> float:
+    """OpenTripMap popularity 1-3, with an "h" suffix for cultural heritage ranked just above."""
+    text = str(rate or "0")
+    try:
+        return float(text.rstrip("h")) + (0.5 if text.endswith("h") else 0.0)
+    except ValueError:
+        return 0.0
+
+
 class AttractionsService:
-    def __init__(self):
+    """
+    Attractions across a whole country: its outline (from the offline geocoder) is
+    covered with grid tiles, tiles are queried concurrently within the OpenTripMap
+    rate budget and cached individually, places outside the country are dropped and
+    the rest are ranked by OpenTripMap's rate. Countries only Nominatim knows fall
+    back to tiling their bounding box, unfiltered.
+    """
+
+    def __init__(self, http_clients: Optional[HttpClientManager] = None,
+                 rate_limiter: Optional[RateLimiterRegistry] = None,
+                 cache: Optional[ResponseCache] = None,
+                 geocoder: Optional[Geocoder] = None,
+                 tile_size: Optional[float] = None,
+                 max_tiles: Optional[int] = None):
+        self.http = http_clients or HttpClientManager()
+        self.rate_limiter = rate_limiter or RateLimiterRegistry()
+        self.cache = cache or ResponseCache()
+        self.geocoder = geocoder or Geocoder(http_clients=self.http, cache=self.cache, rate_limiter=self.rate_limiter)
+        self.tile_size = config.ATTRACTIONS_TILE_SIZE if tile_size is None else tile_size
+        self.max_tiles = config.ATTRACTIONS_MAX_TILES if max_tiles is None else max_tiles
         self.opentripmap_base_url = "http://api.opentripmap.com/0.1/en/places"
         self.api_key = os.getenv("OPENTRIPMAP_API_KEY")
         if not self.api_key:
             logger.error("OPENTRIPMAP_API_KEY not set")
             raise HTTPException(status_code=500, detail="OpenTripMap API key not configured")
 
-    async def get_attractions(self, country: str) -> Dict[str, Any]:
-        normalized_country = country.title()
-        logger.info(f"Fetching attractions for {normalized_country}")
-        async with httpx.AsyncClient() as client:
-            try:
-                # Throttle to 1 request/second
-                time.sleep(1.0)
-                # Step 1: Get country coordinates
-                url = f"{self.opentripmap_base_url}/geoname?name={normalized_country}&apikey={self.api_key}"
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                if data.get("status") != "OK":
-                    logger.error(f"OpenTripMap geocode error: {data}")
-                    raise HTTPException(status_code=500, detail="Error geocoding country")
-                lon, lat = data["lon"], data["lat"]
-
-                # Step 2: Get attractions near coordinates
-                time.sleep(1.0)
-                url = f"{self.opentripmap_base_url}/radius?radius=100000&lon={lon}&lat={lat}&kinds=cultural,natural&limit=10&apikey={self.api_key}"
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                attractions: List[Dict[str, Any]] = [
-                    {
-                        "name": feature["properties"]["name"],
-                        "kind": feature["properties"]["kinds"],
-                        "coordinates": {
-                            "lon": feature["geometry"]["coordinates"][0],
-                            "lat": feature["geometry"]["coordinates"][1]
-                        }
+    async def _area(self, country: str, coordinates: Optional[Dict[str, float]]) -> Tuple[List[Bbox], Optional[Boundary]]:
+        """The tiles to query and, when its outline is known, the country's boundary."""
+        located = await self.geocoder.geocode(country)
+        if located is not None and located.boundary is not None:
+            parts = polygons(located.boundary.feature["geometry"])
+            if parts:
+                return country_tiles(parts, self.tile_size, self.max_tiles), located.boundary
+        if located is not None:
+            bbox = located.bbox
+        elif coordinates is not None:
+            lat, lon = coordinates["lat"], coordinates["lon"]
+            bbox = (lat - POINT_RADIUS_DEGREES, lat + POINT_RADIUS_DEGREES,
+                    lon - POINT_RADIUS_DEGREES, lon + POINT_RADIUS_DEGREES)
+        else:
+            return [], None
+        boxes = split_antimeridian(bbox)
+        budget = max(1, self.max_tiles // len(boxes))
+        return [tile for box in boxes for tile in tile_bbox(box, self.tile_size, budget)], None
+
+    def _within(self, places: List[Dict[str, Any]], boundary: Boundary) -> List[Dict[str, Any]]:
+        """Places inside the country's outline, or just off its coast and inside no other country."""
+        parts = polygons(boundary.feature["geometry"])
+        kept = []
+        for place in places:
+            lon, lat = place["coordinates"]["lon"], place["coordinates"]["lat"]
+            if contains(parts, lon, lat):
+                kept.append(place)
+            # The 1:110m outlines cut corners off coastlines and small islands
+            elif distance_to_edge(parts, lon, lat) <= config.ATTRACTIONS_EDGE_TOLERANCE:
+                other = self.geocoder.boundaries.locate(lon, lat)
+                if other is None or other is boundary:
+                    kept.append(place)
+        return kept
+
+    async def _fetch_tile(self, tile: Bbox, kinds: str, fetched: List[Bbox]) -> List[Dict[str, Any]]:
+        south, north, west, east = tile
+
+        async def fetch():
+            fetched.append(tile)
+            # Throttle to the OpenTripMap budget without blocking the event loop
+            await self.rate_limiter.acquire("opentripmap")
+            response = await self.http.client("opentripmap").get(f"{self.opentripmap_base_url}/bbox", params={
+                "lon_min": west, "lon_max": east, "lat_min": south, "lat_max": north,
+                "kinds": kinds, "rate": config.ATTRACTIONS_MIN_RATE, "limit": config.ATTRACTIONS_TILE_LIMIT,
+                "format": "geojson", "apikey": self.api_key,
+            })
+            response.raise_for_status()
+            return [
+                {
+                    "xid": feature["properties"].get("xid"),
+                    "name": feature["properties"]["name"],
+                    "kind": feature["properties"]["kinds"],
+                    "rate": feature["properties"].get("rate"),
+                    "coordinates": {
+                        "lon": feature["geometry"]["coordinates"][0],
+                        "lat": feature["geometry"]["coordinates"][1]
                     }
-                    for feature in data["features"] if feature["properties"]["name"]
-                ]
-                logger.info(f"Returning {len(attractions)} attractions for {country}")
-                return {"country": country, "attractions": attractions}
-            except httpx.HTTPStatusError as e:
-                logger.error(f"OpenTripMap error: {e.response.status_code} - {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"OpenTripMap error: {e.response.text}")
-            except httpx.HTTPError as e:
-                logger.error(f"Network error: {str(e)}")
-                raise HTTPException(status_code=502, detail=f"Error connecting to OpenTripMap: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Error fetching attractions: {str(e)}")
\ No newline at end of file
+                }
+                for feature in response.json().get("features", []) if feature["properties"].get("name")
+            ]
+
+        return await self.cache.get_or_fetch("opentripmap", make_key(kinds, *tile), fetch)
+
+    async def _details(self, xid: str) -> Dict[str, Any]:
+        async def fetch():
+            await self.rate_limiter.acquire("opentripmap")
+            response = await self.http.client("opentripmap").get(
+                f"{self.opentripmap_base_url}/xid/{xid}", params={"apikey": self.api_key}
+            )
+            response.raise_for_status()
+            data = response.json()
+            return {
+                "description": (data.get("wikipedia_extracts") or {}).get("text"),
+                "image": (data.get("preview") or {}).get("source"),
+                "wikipedia": data.get("wikipedia"),
+                "url": data.get("url") or data.get("otm"),
+            }
+
+        return await self.cache.get_or_fetch("opentripmap", make_key("xid", xid), fetch)
+
+    async def _enrich(self, country: str, attractions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Detail lookups for the requested page only, concurrently; a failed lookup leaves the place as is."""
+        wanted = [place for place in attractions if place["xid"]][:config.ATTRACTIONS_MAX_DETAILS]
+        results = await asyncio.gather(*(self._details(place["xid"]) for place in wanted), return_exceptions=True)
+        details = {}
+        for place, result in zip(wanted, results):
+            if isinstance(result, Exception):
+                logger.warning(f"OpenTripMap details failed for {place['xid']} in {country}: {str(result)}")
+            else:
+                details[place["xid"]] = result
+        return [{**place, **details.get(place["xid"], {})} for place in attractions]
+
+    async def get_attractions(self, country: str, coordinates: Optional[Dict[str, float]] = None,
+                              limit: int = 10, offset: int = 0, kinds: Optional[str] = None,
+                              details: bool = False) -> Dict[str, Any]:
+        kinds = (kinds or DEFAULT_KINDS).replace(" ", "").lower()
+        if not _KINDS.match(kinds):
+            raise HTTPException(status_code=400, detail=f"Invalid kinds: {kinds}")
+        logger.info(f"Fetching attractions for {country}")
+        try:
+            tiles, boundary = await self._area(country, coordinates)
+            if not tiles:
+                raise HTTPException(status_code=404, detail=f"No coordinates found for {country}")
+
+            fetched: List[Bbox] = []
+            results = await asyncio.gather(*(self._fetch_tile(tile, kinds, fetched) for tile in tiles),
+                                           return_exceptions=True)
+            errors = [result for result in results if isinstance(result, Exception)]
+            if errors and len(errors) == len(results):
+                raise errors[0]
+            for error in errors:
+                logger.warning(f"OpenTripMap tile failed for {country}: {str(error)}")
+
+            # Tiles share edges, so a place can come back twice
+            places: Dict[Any, Dict[str, Any]] = {}
+            for result in results:
+                if isinstance(result, Exception):
+                    continue
+                for place in result:
+                    key = place["xid"] or (place["name"], place["coordinates"]["lat"], place["coordinates"]["lon"])
+                    places.setdefault(key, place)
+            merged = list(places.values())
+            # Tiles overhang the border, so keep only places in the country before ranking
+            if boundary is not None:
+                merged = await run_in_threadpool(self._within, merged, boundary)
+            ranked = sorted(merged, key=lambda place: (-rate_score(place["rate"]), place["name"]))
+
+            attractions = ranked[offset:offset + limit]
+            if details:
+                attractions = await self._enrich(country, attractions)
+            logger.info(f"Returning {len(attractions)} of {len(ranked)} attractions for {country}")
+            return {
+                "country": country,
+                "attractions": attractions,
+                "total": len(ranked),
+                "offset": offset,
+                "limit": limit,
+                "kinds": kinds,
+                "tiles": {"total": len(tiles), "fetched": len(fetched), "failed": len(errors)},
+                "outside_country": len(places) - len(merged),
+            }
+        except HTTPException:
+            raise
+        except httpx.HTTPStatusError as e:
+            logger.error(f"OpenTripMap error: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"OpenTripMap error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Network error: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Error connecting to OpenTripMap: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error fetching attractions: {str(e)}")
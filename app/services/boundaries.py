@@ -0,0 +1,245 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+import json
+import logging
+import math
+import threading
+import unicodedata
+from app import config
+from app.models.country import normalize_name
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Properties of a Natural Earth feature that name the country
+_NAME_PROPERTIES = ("NAME", "NAME_LONG", "ADMIN", "NAME_EN", "FORMAL_EN")
+_CODE_PROPERTIES = ("ISO_A2", "ISO_A3", "ISO_A2_EH", "ISO_A3_EH")
+_NO_CODE = "-99"
+
+# Common names that appear in none of the feature's name properties
+ALIASES: Dict[str, str] = {
+    "usa": "USA",
+    "america": "USA",
+    "uk": "GBR",
+    "great britain": "GBR",
+    "britain": "GBR",
+    "england": "GBR",
+    "holland": "NLD",
+    "drc": "COD",
+    "dr congo": "COD",
+    "congo-brazzaville": "COG",
+    "burma": "MMR",
+    "swaziland": "SWZ",
+    "macedonia": "MKD",
+    "turkiye": "TUR",
+    "czech": "CZE",
+}
+
+
+def fold_name(name: str) -> str:
+    """normalize_name without accents or a leading "the", e.g. "The Côte d'Ivoire" -> "cote d'ivoire"."""
+    decomposed = unicodedata.normalize("NFKD", normalize_name(name))
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return folded[4:] if folded.startswith("the ") else folded
+
+
+@dataclass(frozen=True)
+class Boundary:
+    name: str
+    iso_a2: Optional[str]
+    iso_a3: Optional[str]
+    bbox: Tuple[float, float, float, float]   # south, north, west, east (Nominatim order)
+    centroid: Dict[str, float]                # label point: {"lat": ..., "lon": ...}
+    feature: Dict[str, Any]                   # shared; treat as read-only
+    feature_json: str                         # pre-serialized feature
+
+    @property
+    def coordinates(self) -> Dict[str, Any]:
+        """Same shape as the coordinates built from a Nominatim result."""
+        return {"lat": self.centroid["lat"], "lon": self.centroid["lon"], "boundingbox": list(self.bbox)}
+
+
+def _positions(coordinates: Any) -> Iterable[List[float]]:
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        yield coordinates
+        return
+    for part in coordinates:
+        yield from _positions(part)
+
+
+Ring = List[List[float]]
+
+
+def polygons(geometry: Dict[str, Any]) -> List[List[Ring]]:
+    """A Polygon or MultiPolygon as a list of polygons, each an outer ring followed by its holes."""
+    if geometry.get("type") == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry.get("type") == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _in_ring(lon: float, lat: float, ring: Ring) -> bool:
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > lat) != (y2 > lat) and lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def contains(parts: List[List[Ring]], lon: float, lat: float) -> bool:
+    """Point-in-polygon test; Natural Earth already splits shapes at the antimeridian."""
+    return any(
+        _in_ring(lon, lat, polygon[0]) and not any(_in_ring(lon, lat, hole) for hole in polygon[1:])
+        for polygon in parts if polygon
+    )
+
+
+def distance_to_edge(parts: List[List[Ring]], lon: float, lat: float) -> float:
+    """Rough distance in degrees of latitude from a point to the nearest boundary edge."""
+    scale = math.cos(math.radians(lat))
+    best = math.inf
+    for polygon in parts:
+        for ring in polygon:
+            for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+                ax, ay, bx, by = (x1 - lon) * scale, y1 - lat, (x2 - lon) * scale, y2 - lat
+                dx, dy = bx - ax, by - ay
+                length = dx * dx + dy * dy
+                t = 0.0 if length == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / length))
+                best = min(best, math.hypot(ax + t * dx, ay + t * dy))
+    return best
+
+
+def _code(value: Optional[str]) -> Optional[str]:
+    return value if value and value != _NO_CODE else None
+
+
+def _build(feature: Dict[str, Any]) -> Boundary:
+    props = feature["properties"]
+    lons, lats = zip(*((p[0], p[1]) for p in _positions(feature["geometry"]["coordinates"])))
+    bbox = (min(lats), max(lats), min(lons), max(lons))
+    if props.get("LABEL_X") is not None and props.get("LABEL_Y") is not None:
+        centroid = {"lat": float(props["LABEL_Y"]), "lon": float(props["LABEL_X"])}
+    else:
+        centroid = {"lat": (bbox[0] + bbox[1]) / 2, "lon": (bbox[2] + bbox[3]) / 2}
+    return Boundary(
+        name=props["NAME"],
+        iso_a2=_code(props.get("ISO_A2")) or _code(props.get("ISO_A2_EH")),
+        iso_a3=_code(props.get("ISO_A3")) or _code(props.get("ISO_A3_EH")),
+        bbox=bbox,
+        centroid=centroid,
+        feature=feature,
+        feature_json=json.dumps(feature, ensure_ascii=False),
+    )
+
+
+class BoundaryStore:
+    """
+    Natural Earth admin-0 boundaries parsed once and indexed by normalized and
+    accent-folded name, long/formal names, ISO codes and ALIASES. Loads lazily
+    on first lookup unless load() was called at startup.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.BOUNDARIES_GEOJSON
+        self._by_key: Dict[str, Boundary] = {}
+        self._boundaries: List[Boundary] = []
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> None:
+        with self._lock:
+            if self.loaded:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    features = json.load(f)["features"]
+            except Exception as e:
+                logger.error(f"Could not load boundaries from {self.path}: {str(e)}")
+                features = []
+            self._index(features)
+            self.loaded = True
+            logger.info(f"Loaded {len(self._boundaries)} country boundaries")
+
+    def _index(self, features: List[Dict[str, Any]]) -> None:
+        boundaries = []
+        by_key: Dict[str, Boundary] = {}
+        for feature in features:
+            try:
+                boundary = _build(feature)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed boundary feature: {str(e)}")
+                continue
+            boundaries.append(boundary)
+        # Names take precedence over codes and aliases; the first feature wins a clash
+        for boundary in boundaries:
+            props = boundary.feature["properties"]
+            for prop in _NAME_PROPERTIES:
+                if props.get(prop):
+                    by_key.setdefault(normalize_name(props[prop]), boundary)
+                    by_key.setdefault(fold_name(props[prop]), boundary)
+        for boundary in boundaries:
+            props = boundary.feature["properties"]
+            for prop in _CODE_PROPERTIES:
+                code = _code(props.get(prop))
+                if code:
+                    by_key.setdefault(code.lower(), boundary)
+        for alias, iso_a3 in ALIASES.items():
+            if iso_a3.lower() in by_key:
+                by_key.setdefault(alias, by_key[iso_a3.lower()])
+        self._boundaries = boundaries
+        self._by_key = by_key
+
+    def lookup(self, name: str) -> Optional[Boundary]:
+        if not self.loaded:
+            self.load()
+        if not name or not name.strip():
+            return None
+        boundary = self._by_key.get(normalize_name(name)) or self._by_key.get(fold_name(name))
+        if boundary is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return boundary
+
+    def locate(self, lon: float, lat: float) -> Optional[Boundary]:
+        """The country whose outline contains the point, if any."""
+        for boundary in self:
+            south, north, west, east = boundary.bbox
+            if south <= lat <= north and west <= lon <= east \
+                    and contains(polygons(boundary.feature["geometry"]), lon, lat):
+                return boundary
+        return None
+
+    def keys(self) -> List[str]:
+        """Every normalized name, code and alias the store answers to."""
+        if not self.loaded:
+            self.load()
+        return list(self._by_key)
+
+    def __iter__(self):
+        if not self.loaded:
+            self.load()
+        return iter(self._boundaries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "size": len(self._boundaries),
+            "keys": len(self._by_key),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_shared_store: Optional[BoundaryStore] = None
+
+
+def shared_boundary_store() -> BoundaryStore:
+    """Process-wide store, so the app and import-time registries parse the file once."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = BoundaryStore()
+    return _shared_store
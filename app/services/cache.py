@@ -0,0 +1,338 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Awaitable
+import asyncio
+import json
+import logging
+import time
+import uuid
+from app import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float          # seconds an entry is served as fresh
+    stale_ttl: float    # extra seconds it may be served while a refresh runs in the background
+
+
+# Per-source freshness. Geocoding and boundaries barely change; photos and POIs drift slowly.
+SOURCE_POLICIES: Dict[str, CachePolicy] = {
+    "nominatim": CachePolicy(ttl=7 * 86400, stale_ttl=7 * 86400),
+    "wikipedia": CachePolicy(ttl=86400, stale_ttl=86400),
+    "photos": CachePolicy(ttl=6 * 3600, stale_ttl=86400),
+    "overpass": CachePolicy(ttl=86400, stale_ttl=7 * 86400),
+    "mapillary": CachePolicy(ttl=86400, stale_ttl=86400),
+    "chat": CachePolicy(ttl=config.CHAT_CACHE_TTL, stale_ttl=0),
+    "weather": CachePolicy(ttl=1800, stale_ttl=1800),
+    "opentripmap": CachePolicy(ttl=86400, stale_ttl=7 * 86400),
+    "x_api": CachePolicy(ttl=config.SOCIAL_CACHE_TTL, stale_ttl=config.SOCIAL_STALE_TTL),
+}
+DEFAULT_POLICY = CachePolicy(ttl=600, stale_ttl=600)
+
+# Set while the prefetcher warms the cache: entries that expire within this many
+# seconds are re-fetched in place, and the lookups stay out of the hit/miss counts
+_refresh_horizon: ContextVar[Optional[float]] = ContextVar("refresh_horizon", default=None)
+
+
+@contextmanager
+def refreshing(horizon: float):
+    """Make get_or_fetch calls in this context refresh entries expiring within `horizon` seconds."""
+    token = _refresh_horizon.set(horizon)
+    try:
+        yield
+    finally:
+        _refresh_horizon.reset(token)
+
+
+class CacheBackend:
+    """Minimal async key/value interface shared by the in-memory and Redis backends."""
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        """Try to take a short-lived lock; returns a token when acquired, None otherwise."""
+        raise NotImplementedError
+
+    async def release_lock(self, key: str, token: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU with expiry. Values are stored serialized so callers cannot mutate them."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._locks: Dict[str, tuple] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._data[key] = (value, time.time() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        holder = self._locks.get(key)
+        if holder and holder[1] > time.time():
+            return None
+        token = uuid.uuid4().hex
+        self._locks[key] = (token, time.time() + ttl)
+        return token
+
+    async def release_lock(self, key: str, token: str) -> None:
+        holder = self._locks.get(key)
+        if holder and holder[0] == token:
+            del self._locks[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis backend shared by every worker; locks use SET NX PX."""
+
+    _RELEASE_SCRIPT = """
+        if redis.call("get", KEYS[1]) == ARGV[1] then
+            return redis.call("del", KEYS[1])
+        end
+        return 0
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+        self.redis = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.redis.get(key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.redis.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self.redis.delete(key)
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(f"lock:{key}", token, nx=True, px=max(1, int(ttl * 1000)))
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self.redis.eval(self._RELEASE_SCRIPT, 1, f"lock:{key}", token)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class ResponseCache:
+    """
+    Read-through cache for upstream responses.
+
+    get_or_fetch serves fresh entries directly, serves stale entries while one
+    background refresh runs (stale-while-revalidate), and collapses concurrent
+    misses for the same key into a single upstream call (single-flight): in-process
+    via a shared task and across workers via a backend lock.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, prefix: str = "country-api",
+                 policies: Optional[Dict[str, CachePolicy]] = None, lock_ttl: float = 10.0,
+                 lock_wait: float = 2.0):
+        self.backend = backend or MemoryCacheBackend()
+        self.prefix = prefix
+        self.policies = dict(SOURCE_POLICIES if policies is None else policies)
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: set = set()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def policy(self, source: str) -> CachePolicy:
+        return self.policies.get(source, DEFAULT_POLICY)
+
+    def _key(self, source: str, key: str) -> str:
+        return f"{self.prefix}:{source}:{key}"
+
+    def _count(self, source: str, event: str) -> None:
+        stats = self._stats.setdefault(source, {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "errors": 0,
+                                                "prefetched": 0})
+        stats[event] += 1
+
+    async def _read(self, full_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self.backend.get(full_key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {full_key}: {str(e)}")
+            return None
+        return json.loads(raw) if raw else None
+
+    async def _write(self, source: str, full_key: str, value: Any, ttl: Optional[float] = None) -> None:
+        policy = self.policy(source)
+        ttl = policy.ttl if ttl is None else ttl
+        entry = {"value": value, "fresh_until": time.time() + ttl}
+        try:
+            await self.backend.set(full_key, json.dumps(entry), ttl + policy.stale_ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {full_key}: {str(e)}")
+
+    async def get(self, source: str, key: str) -> Optional[Any]:
+        entry = await self._read(self._key(source, key))
+        return entry["value"] if entry else None
+
+    async def get_fresh(self, source: str, key: str) -> Optional[Any]:
+        """The cached value only while it is fresh; stale or missing entries give None."""
+        entry = await self._read(self._key(source, key))
+        return entry["value"] if entry and entry["fresh_until"] > time.time() else None
+
+    async def set(self, source: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; `ttl` overrides the source policy's freshness for this entry."""
+        await self._write(source, self._key(source, key), value, ttl)
+
+    async def invalidate(self, source: str, key: str) -> None:
+        try:
+            await self.backend.delete(self._key(source, key))
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {source}:{key}: {str(e)}")
+
+    async def get_or_fetch(self, source: str, key: str, fetch: Callable[[], Awaitable[Any]],
+                           ttl: Optional[float] = None) -> Any:
+        full_key = self._key(source, key)
+        entry = await self._read(full_key)
+        horizon = _refresh_horizon.get()
+        if horizon is not None:
+            if entry is not None and entry["fresh_until"] > time.time() + horizon:
+                return entry["value"]
+            self._count(source, "prefetched")
+            return await self._single_flight(source, full_key, fetch, ttl)
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                self._count(source, "hits")
+                return entry["value"]
+            self._count(source, "stale_hits")
+            self._refresh_in_background(source, full_key, fetch, ttl)
+            return entry["value"]
+        self._count(source, "misses")
+        return await self._single_flight(source, full_key, fetch, ttl)
+
+    async def refresh(self, source: str, key: str, fetch: Callable[[], Awaitable[Any]],
+                      ttl: Optional[float] = None) -> Any:
+        """Fetch and store unconditionally, sharing any refresh already in flight."""
+        return await self._single_flight(source, self._key(source, key), fetch, ttl)
+
+    async def _single_flight(self, source: str, full_key: str, fetch: Callable[[], Awaitable[Any]],
+                             ttl: Optional[float] = None) -> Any:
+        task = self._inflight.get(full_key)
+        if task is not None:
+            self._count(source, "coalesced")
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(self._fetch_and_store(source, full_key, fetch, ttl))
+        self._inflight[full_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(full_key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, source: str, full_key: str, fetch: Callable[[], Awaitable[Any]],
+                               ttl: Optional[float] = None) -> Any:
+        token = None
+        lock_held = False
+        try:
+            token = await self.backend.acquire_lock(full_key, self.lock_ttl)
+            lock_held = token is None
+        except Exception as e:
+            # The backend is down, not busy: fetch directly instead of waiting on a lock nobody holds
+            logger.warning(f"Cache lock failed for {full_key}: {str(e)}")
+        if lock_held:
+            # Another worker is fetching; give it a moment to publish its result
+            waited = 0.0
+            while waited < self.lock_wait:
+                await asyncio.sleep(0.1)
+                waited += 0.1
+                entry = await self._read(full_key)
+                if entry is not None and entry["fresh_until"] > time.time():
+                    self._count(source, "coalesced")
+                    return entry["value"]
+        try:
+            value = await fetch()
+        except Exception:
+            self._count(source, "errors")
+            raise
+        finally:
+            if token is not None:
+                try:
+                    await self.backend.release_lock(full_key, token)
+                except Exception as e:
+                    logger.warning(f"Cache unlock failed for {full_key}: {str(e)}")
+        await self._write(source, full_key, value, ttl)
+        return value
+
+    def _refresh_in_background(self, source: str, full_key: str, fetch: Callable[[], Awaitable[Any]],
+                               ttl: Optional[float] = None) -> None:
+        if full_key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self._single_flight(source, full_key, fetch, ttl)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {full_key}: {str(e)}")
+
+        task = asyncio.ensure_future(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def warm_share(self) -> Optional[float]:
+        """Share of user lookups answered from the cache (fresh or stale) rather than upstream."""
+        warm = sum(stats["hits"] + stats["stale_hits"] for stats in self._stats.values())
+        total = warm + sum(stats["misses"] for stats in self._stats.values())
+        return round(warm / total, 3) if total else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "warm_share": self.warm_share(),
+            "sources": {source: dict(stats) for source, stats in self._stats.items()},
+        }
+
+    async def close(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await self.backend.close()
+
+
+def create_response_cache() -> ResponseCache:
+    """Use Redis when REDIS_URL is configured, otherwise an in-process LRU."""
+    if config.REDIS_URL:
+        try:
+            logger.info("Using Redis response cache")
+            return ResponseCache(RedisCacheBackend(config.REDIS_URL))
+        except Exception as e:
+            logger.error(f"Could not initialise Redis cache, falling back to memory: {str(e)}")
+    return ResponseCache(MemoryCacheBackend(config.CACHE_MAX_ENTRIES))
+
+
+def make_key(*parts: Any) -> str:
+    """Stable cache key from request parts, case- and whitespace-insensitive."""
+    return "|".join(" ".join(str(part).split()).lower() for part in parts)
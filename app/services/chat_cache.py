@@ -0,0 +1,163 @@
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable, List, Tuple
+import logging
+import re
+import zlib
+from app import config
+from app.models.country import normalize_name
+from app.services.cache import ResponseCache, make_key
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[\w']+")
+# Words that carry no meaning for matching two questions about the same country
+_STOPWORDS = frozenset("a an the is are was were be of in on to for about and or me tell what what's whats "
+                       "how like can could would do does please i you".split())
+_MINHASH_PRIME = (1 << 61) - 1
+
+
+def normalize_message(message: str) -> str:
+    return " ".join(_WORD.findall(message.lower()))
+
+
+class MinHasher:
+    """Fixed-size MinHash signatures over a prompt's content words."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        # Deterministic (a, b) pairs for h(x) = (a * x + b) mod p
+        state = seed
+        self._params: List[Tuple[int, int]] = []
+        for _ in range(num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = state % (_MINHASH_PRIME - 1) + 1
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            self._params.append((a, state % _MINHASH_PRIME))
+
+    @staticmethod
+    def shingles(message: str) -> frozenset:
+        words = [w for w in normalize_message(message).split() if w not in _STOPWORDS]
+        return frozenset(words) or frozenset(normalize_message(message).split())
+
+    def signature(self, message: str) -> Tuple[int, ...]:
+        hashed = [zlib.crc32(word.encode("utf-8")) for word in self.shingles(message)]
+        if not hashed:
+            return ()
+        return tuple(min((a * h + b) % _MINHASH_PRIME for h in hashed) for a, b in self._params)
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of the two shingle sets."""
+        if not left or len(left) != len(right):
+            return 0.0
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+class ChatAnswerCache:
+    """
+    Answers keyed on (normalized country, normalized message) in the shared
+    ResponseCache under the "chat" source, so TTL, LRU eviction and single-flight
+    coalescing of identical in-flight prompts come from there.
+
+    With similarity enabled, a miss is also checked against recent prompts for the
+    same country by MinHash; a close enough prompt reuses that cached answer.
+    """
+
+    def __init__(self, cache: ResponseCache, similarity: Optional[bool] = None,
+                 threshold: Optional[float] = None, max_prompts: int = 256):
+        self.cache = cache
+        self.similarity = config.CHAT_SIMILARITY_ENABLED if similarity is None else similarity
+        self.threshold = config.CHAT_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.max_prompts = max_prompts
+        self.hasher = MinHasher()
+        # country -> recent prompt keys and their signatures, oldest first
+        self._prompts: Dict[str, "OrderedDict[str, Tuple[int, ...]]"] = {}
+        self._stats = {"hits": 0, "similar_hits": 0, "coalesced": 0, "misses": 0}
+
+    @staticmethod
+    def key(country: str, message: str) -> str:
+        return make_key(normalize_name(country), normalize_message(message))
+
+    def _remember(self, country: str, key: str, message: str) -> None:
+        if not self.similarity:
+            return
+        prompts = self._prompts.setdefault(normalize_name(country), OrderedDict())
+        prompts[key] = self.hasher.signature(message)
+        prompts.move_to_end(key)
+        while len(prompts) > self.max_prompts:
+            prompts.popitem(last=False)
+
+    async def _similar(self, country: str, key: str, message: str) -> Optional[Any]:
+        prompts = self._prompts.get(normalize_name(country))
+        if not prompts:
+            return None
+        signature = self.hasher.signature(message)
+        best_key, best = None, self.threshold
+        for candidate, candidate_signature in prompts.items():
+            score = self.hasher.similarity(signature, candidate_signature)
+            if candidate != key and score >= best:
+                best_key, best = candidate, score
+        if best_key is None:
+            return None
+        answer = await self.cache.get("chat", best_key)
+        if answer is None:
+            prompts.pop(best_key, None)
+        return answer
+
+    async def lookup(self, country: str, message: str) -> Optional[Any]:
+        """Cached answer for this prompt (or a similar one), without generating."""
+        key = self.key(country, message)
+        answer = await self.cache.get("chat", key)
+        if answer is not None:
+            self._stats["hits"] += 1
+            return answer
+        if self.similarity:
+            answer = await self._similar(country, key, message)
+            if answer is not None:
+                self._stats["similar_hits"] += 1
+                return answer
+        return None
+
+    async def store(self, country: str, message: str, answer: Any) -> None:
+        """Cache an answer generated outside get_or_generate (the streaming path)."""
+        self._stats["misses"] += 1
+        key = self.key(country, message)
+        await self.cache.set("chat", key, answer)
+        self._remember(country, key, message)
+
+    async def get_or_generate(self, country: str, message: str,
+                              generate: Callable[[], Awaitable[Any]]) -> Any:
+        if self.similarity:
+            answer = await self.lookup(country, message)
+            if answer is not None:
+                return answer
+
+        generated = False
+
+        async def fetch():
+            nonlocal generated
+            generated = True
+            return await generate()
+
+        key = self.key(country, message)
+        cached = await self.cache.get("chat", key) is not None
+        answer = await self.cache.get_or_fetch("chat", key, fetch)
+        if generated:
+            self._stats["misses"] += 1
+            self._remember(country, key, message)
+        elif cached:
+            self._stats["hits"] += 1
+        else:
+            # Nothing was cached, so this request waited on another one's generation
+            self._stats["coalesced"] += 1
+        return answer
+
+    def stats(self) -> Dict[str, Any]:
+        total = sum(self._stats.values())
+        # Requests that waited on a generation were not served from the cache
+        served = self._stats["hits"] + self._stats["similar_hits"]
+        return {
+            **self._stats,
+            "similarity": self.similarity,
+            "hit_rate": round(served / total, 3) if total else None,
+        }
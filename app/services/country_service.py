@@ -1,69 +1,172 @@
-from app.models.country import CountryModel
-from typing import Dict, Any, Optional
+from app.models.country import CountryModel, AsyncCountryModel
+from typing import Dict, Any, Optional, Union, AsyncIterator
+from app.services.http_client import HttpClientManager
+from app.services.cache import ResponseCache, make_key
+from app.services.rate_limiter import RateLimiterRegistry
+from app.services.image_providers import ImageProvider, merge_photos
+from app.services.geocoder import Geocoder
+from app.services.chat_cache import ChatAnswerCache
+from app import config
 import httpx
-import aiohttp
 from starlette.concurrency import run_in_threadpool
 from fastapi import HTTPException
+import asyncio
+import inspect
 import json
+import logging
 import os 
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 class CountryService:
-    def __init__(self, country_model: CountryModel):
+    def __init__(self, country_model: Union[CountryModel, AsyncCountryModel],
+                 http_clients: Optional[HttpClientManager] = None,
+                 cache: Optional[ResponseCache] = None,
+                 geocoder: Optional[Geocoder] = None,
+                 chat_cache: Optional[ChatAnswerCache] = None,
+                 rate_limiter: Optional[RateLimiterRegistry] = None):
         self.country_model = country_model
+        self.http = http_clients or HttpClientManager()
+        self.cache = cache or ResponseCache()
+        # Nominatim allows 1 request/s overall, so share the geocoder's bucket unless told otherwise
+        self.rate_limiter = rate_limiter or (geocoder.rate_limiter if geocoder else RateLimiterRegistry())
+        self.geocoder = geocoder or Geocoder(http_clients=self.http, cache=self.cache, rate_limiter=self.rate_limiter)
+        self.chat_cache = chat_cache or ChatAnswerCache(self.cache)
+        self.image_providers = [
+            ImageProvider("unsplash", "UNSPLASH_API_KEY", self.get_country_photos, config.IMAGE_PROVIDER_TIMEOUT),
+            ImageProvider("pixabay", "PIXABAY_API_KEY", self.get_country_pixabay_photos, config.IMAGE_PROVIDER_TIMEOUT),
+            ImageProvider("pexels", "PEXELS_API_KEY", self.get_country_pexels_photos, config.IMAGE_PROVIDER_TIMEOUT),
+        ]
+
+    async def _query_model(self, method_name: str, *args):
+        # AsyncCountryModel runs on the event loop; the sync model still needs the threadpool
+        method = getattr(self.country_model, method_name)
+        if inspect.iscoroutinefunction(method):
+            return await method(*args)
+        return await run_in_threadpool(method, *args)
+
+    async def _nominatim_search(self, query: str, polygon: bool = False) -> list:
+        params = {"q": query, "format": "json"}
+        if polygon:
+            params.update({"polygon_geojson": 1, "limit": 1})
+
+        async def fetch():
+            await self.rate_limiter.acquire("nominatim")
+            resp = await self.http.client("nominatim").get("https://nominatim.openstreetmap.org/search", params=params)
+            resp.raise_for_status()
+            return resp.json()
+        return await self.cache.get_or_fetch("nominatim", make_key(query, "polygon" if polygon else "search"), fetch)
+
+    async def _wikipedia_summary(self, title: str) -> Optional[str]:
+        async def fetch():
+            wiki_title = title.replace(" ", "_")
+            wiki_resp = await self.http.client("wikipedia").get(
+                f"https://en.wikipedia.org/api/rest_v1/page/summary/{wiki_title}"
+            )
+            # A missing article is a cacheable answer; upstream failures are not
+            if wiki_resp.status_code >= 500:
+                wiki_resp.raise_for_status()
+            return wiki_resp.json().get("extract", None)
+        return await self.cache.get_or_fetch("wikipedia", make_key(title), fetch)
+
+    async def find_country(self, name: str) -> Optional[Dict[str, Any]]:
+        return await self._query_model("find_by_name", name)
+
+    async def get_wikipedia_summary(self, title: str) -> Optional[str]:
+        return await self._wikipedia_summary(title)
 
     def get_all_countries(self):
         return self.country_model.find_all()
 
     async def get_country_details(self, name: str) -> Optional[Dict[str, Any]]:
-        country = await run_in_threadpool(self.country_model.find_by_name, name)
+        country = await self.find_country(name)
         if not country:
             return None
-        async with httpx.AsyncClient() as client:
-            # Fetch coordinates from Nominatim
-            url = "https://nominatim.openstreetmap.org/search"
-            params = {"q": country["name"], "format": "json"}
-            resp = await client.get(url, params=params, headers={"User-Agent": "country-api"})
-            data = resp.json()
-            if data and "boundingbox" in data[0]:
-                country["coordinates"] = {"boundingbox": data[0]["boundingbox"]}
-            else:
-                country["coordinates"] = None
+        # Offline for known countries, cached Nominatim otherwise
+        located = await self.geocoder.geocode(country["name"])
+        country["coordinates"] = located.coordinates if located else None
 
-            # Get Wikipedia summary
-            wiki_title = country["name"].replace(" ", "_")
-            wiki_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{wiki_title}"
-            wiki_resp = await client.get(wiki_url)
-            wiki_data = wiki_resp.json()
-            country["wikipedia_summary"] = wiki_data.get("extract", None)
+        # Get Wikipedia summary
+        country["wikipedia_summary"] = await self._wikipedia_summary(country["name"])
 
         return country
 
-    async def make_custom_request(self, api_key: str, message: str, country: str):
-            # url = "https://api-inference.huggingface.co/models/meta-llama/Meta-Llama-3-8B-Instruct"
-            url = "https://api-inference.huggingface.co/models/mistralai/Mixtral-8x7B-Instruct-v0.1"
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "inputs": f"You are a helpful assistant for questions about {country}. {message}",
-                "parameters": {
-                    "max_new_tokens": 500,
-                    "return_full_text": False,
-                    "temperature": 0.7
-                }
+    def _chat_request(self, api_key: str, message: str, country: str, stream: bool = False):
+        # url = "https://api-inference.huggingface.co/models/meta-llama/Meta-Llama-3-8B-Instruct"
+        url = "https://api-inference.huggingface.co/models/mistralai/Mixtral-8x7B-Instruct-v0.1"
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "inputs": f"You are a helpful assistant for questions about {country}. {message}",
+            "parameters": {
+                "max_new_tokens": 500,
+                "return_full_text": False,
+                "temperature": 0.7
             }
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if isinstance(result, list) and len(result) > 0 and "generated_text" in result[0]:
-                            return {"choices": [{"message": {"content": result[0]["generated_text"].strip()}}]}
-                        else:
-                            raise HTTPException(status_code=500, detail="Unexpected response format from Hugging Face API")
-                    else:
-                        error_text = await response.text()
-                        raise HTTPException(status_code=response.status, detail=f"Hugging Face API error: {error_text}")
+        }
+        if stream:
+            payload["stream"] = True
+        return url, headers, payload
+
+    async def make_custom_request(self, api_key: str, message: str, country: str):
+        # Repeated (and, optionally, similar) questions are answered from the chat cache;
+        # identical questions in flight share one upstream call
+        return await self.chat_cache.get_or_generate(
+            country, message, lambda: self._generate_reply(api_key, message, country)
+        )
+
+    async def _generate_reply(self, api_key: str, message: str, country: str):
+            url, headers, payload = self._chat_request(api_key, message, country)
+            response = await self.http.client("huggingface").post(url, headers=headers, json=payload)
+            if response.status_code == 200:
+                result = response.json()
+                if isinstance(result, list) and len(result) > 0 and "generated_text" in result[0]:
+                    return {"choices": [{"message": {"content": result[0]["generated_text"].strip()}}]}
+                else:
+                    raise HTTPException(status_code=500, detail="Unexpected response format from Hugging Face API")
+            else:
+                raise HTTPException(status_code=response.status_code, detail=f"Hugging Face API error: {response.text}")
+
+    async def stream_custom_request(self, api_key: str, message: str, country: str) -> AsyncIterator[str]:
+        """
+        Relay generated tokens as the inference API emits them (its SSE stream).
+        Tokens are read from upstream only as fast as the caller consumes them, and
+        closing the generator (e.g. on client disconnect) closes the upstream response.
+        A cached answer is relayed as a single token.
+        """
+        cached = await self.chat_cache.lookup(country, message)
+        if cached is not None:
+            yield cached["choices"][0]["message"]["content"]
+            return
+
+        url, headers, payload = self._chat_request(api_key, message, country, stream=True)
+        tokens = []
+        async with self.http.client("huggingface").stream("POST", url, headers=headers, json=payload) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise HTTPException(status_code=response.status_code,
+                                    detail=f"Hugging Face API error: {body.decode('utf-8', 'replace')}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if not data or data == "[DONE]":
+                    continue
+                event = json.loads(data)
+                if "error" in event:
+                    raise HTTPException(status_code=502, detail=f"Hugging Face API error: {event['error']}")
+                token = event.get("token") or {}
+                if token.get("text") and not token.get("special"):
+                    tokens.append(token["text"])
+                    yield token["text"]
+        # Only complete answers are cached; a cancelled stream never gets here
+        answer = "".join(tokens).strip()
+        if answer:
+            await self.chat_cache.store(country, message, {"choices": [{"message": {"content": answer}}]})
 
         # ... (other methods like get_country_map_data, get_country_photos, etc., remain unchanged)
 
@@ -74,240 +177,297 @@ class CountryService:
         return self.country_model.update_one(name, update_data)
 
     async def get_country_photos(self, name: str, access_key: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    "https://api.unsplash.com/search/photos",
-                    params={"query": name, "client_id": access_key, "per_page": 5, "orientation": "landscape"}
-                )
-                response.raise_for_status()
-                data = response.json()
-                photos = [
-                    {
-                        "url": photo["urls"]["regular"],
-                        "thumbnail": photo["urls"]["thumb"],
-                        "description": photo.get("alt_description", "No description available"),
-                        "photographer": photo["user"]["name"],
-                        "source_url": photo["links"]["html"],
-                        "source": "Unsplash"
-                    }
-                    for photo in data.get("results", [])
-                ]
-                return {"photos": photos, "total_results": data.get("total", 0)}
-            except httpx.HTTPStatusError as e:
-                raise HTTPException(status_code=e.response.status_code, detail=f"Unsplash API error: {str(e)}")
-            except httpx.HTTPError as e:
-                raise HTTPException(status_code=502, detail=f"Error connecting to Unsplash API: {str(e)}")
+        async def fetch():
+            response = await self.http.client("unsplash").get(
+                "https://api.unsplash.com/search/photos",
+                params={"query": name, "client_id": access_key, "per_page": 5, "orientation": "landscape"}
+            )
+            response.raise_for_status()
+            data = response.json()
+            photos = [
+                {
+                    "url": photo["urls"]["regular"],
+                    "thumbnail": photo["urls"]["thumb"],
+                    "description": photo.get("alt_description", "No description available"),
+                    "photographer": photo["user"]["name"],
+                    "source_url": photo["links"]["html"],
+                    "source": "Unsplash"
+                }
+                for photo in data.get("results", [])
+            ]
+            return {"photos": photos, "total_results": data.get("total", 0)}
+        try:
+            return await self.cache.get_or_fetch("photos", make_key("unsplash", name), fetch)
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=e.response.status_code, detail=f"Unsplash API error: {str(e)}")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Error connecting to Unsplash API: {str(e)}")
 
     async def get_country_pixabay_photos(self, name: str, access_key: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    "https://pixabay.com/api/",
-                    params={
-                        "key": access_key,
-                        "q": name,
-                        "image_type": "photo",
-                        "per_page": 5,
-                        "safesearch": True
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                photos = [
-                    {
-                        "url": photo["webformatURL"],
-                        "thumbnail": photo["previewURL"],
-                        "description": photo.get("tags", "No description available"),
-                        "photographer": photo["user"],
-                        "source_url": photo["pageURL"],
-                        "source": "Pixabay"
-                    }
-                    for photo in data.get("hits", [])
-                ]
-                return {"photos": photos, "total_results": data.get("totalHits", 0)}
-            except httpx.HTTPStatusError as e:
-                raise HTTPException(status_code=e.response.status_code, detail=f"Pixabay API error: {str(e)}")
-            except httpx.HTTPError as e:
-                raise HTTPException(status_code=502, detail=f"Error connecting to Pixabay API: {str(e)}")
+        async def fetch():
+            response = await self.http.client("pixabay").get(
+                "https://pixabay.com/api/",
+                params={
+                    "key": access_key,
+                    "q": name,
+                    "image_type": "photo",
+                    "per_page": 5,
+                    "safesearch": True
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
+            photos = [
+                {
+                    "url": photo["webformatURL"],
+                    "thumbnail": photo["previewURL"],
+                    "description": photo.get("tags", "No description available"),
+                    "photographer": photo["user"],
+                    "source_url": photo["pageURL"],
+                    "source": "Pixabay"
+                }
+                for photo in data.get("hits", [])
+            ]
+            return {"photos": photos, "total_results": data.get("totalHits", 0)}
+        try:
+            return await self.cache.get_or_fetch("photos", make_key("pixabay", name), fetch)
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=e.response.status_code, detail=f"Pixabay API error: {str(e)}")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Error connecting to Pixabay API: {str(e)}")
 
     async def get_country_pexels_photos(self, name: str, access_key: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    "https://api.pexels.com/v1/search",
-                    params={"query": name, "per_page": 5},
-                    headers={"Authorization": access_key}
-                )
-                response.raise_for_status()
-                data = response.json()
-                photos = [
-                    {
-                        "url": photo["src"]["medium"],
-                        "thumbnail": photo["src"]["tiny"],
-                        "description": photo.get("alt", "No description available"),
-                        "photographer": photo["photographer"],
-                        "source_url": photo["url"],
-                        "source": "Pexels"
-                    }
-                    for photo in data.get("photos", [])
-                ]
-                return {"photos": photos, "total_results": data.get("total_results", 0)}
-            except httpx.HTTPStatusError as e:
-                raise HTTPException(status_code=e.response.status_code, detail=f"Pexels API error: {str(e)}")
-            except httpx.HTTPError as e:
-                raise HTTPException(status_code=502, detail=f"Error connecting to Pexels API: {str(e)}")
-
-    async def get_country_images(self, name: str, unsplash_key: str, pixabay_key: str, pexels_key: str) -> Dict[str, Any]:
-        photos = []
-        urls_seen = set()
-
-        # Unsplash
+        async def fetch():
+            response = await self.http.client("pexels").get(
+                "https://api.pexels.com/v1/search",
+                params={"query": name, "per_page": 5},
+                headers={"Authorization": access_key}
+            )
+            response.raise_for_status()
+            data = response.json()
+            photos = [
+                {
+                    "url": photo["src"]["medium"],
+                    "thumbnail": photo["src"]["tiny"],
+                    "description": photo.get("alt", "No description available"),
+                    "photographer": photo["photographer"],
+                    "source_url": photo["url"],
+                    "source": "Pexels"
+                }
+                for photo in data.get("photos", [])
+            ]
+            return {"photos": photos, "total_results": data.get("total_results", 0)}
+        try:
+            return await self.cache.get_or_fetch("photos", make_key("pexels", name), fetch)
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=e.response.status_code, detail=f"Pexels API error: {str(e)}")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Error connecting to Pexels API: {str(e)}")
+
+    def register_image_provider(self, provider: ImageProvider) -> None:
+        """Add a photo source; it is queried concurrently with the others."""
+        self.image_providers = [p for p in self.image_providers if p.name != provider.name] + [provider]
+
+    def image_providers_configured(self) -> bool:
+        """Whether any photo source has an API key in the environment."""
+        return any(os.getenv(provider.key_env) for provider in self.image_providers)
+
+    async def _search_provider(self, provider: ImageProvider, name: str, api_key: str) -> Dict[str, Any]:
+        return await asyncio.wait_for(provider.search(name, api_key), timeout=provider.timeout)
+
+    async def get_country_images(self, name: str, api_keys: Optional[Dict[str, str]] = None,
+                                 deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Query every configured image provider concurrently. Each provider has its own
+        timeout and the whole fan-out stops at `deadline`; whatever arrived by then is
+        merged and de-duplicated, and "providers" reports how each source fared.
+        """
+        api_keys = api_keys or {}
+        deadline = config.IMAGE_FANOUT_DEADLINE if deadline is None else deadline
+        providers: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[asyncio.Task, ImageProvider] = {}
+        started = time.monotonic()
+        for provider in self.image_providers:
+            api_key = api_keys.get(provider.name) or os.getenv(provider.key_env)
+            if not api_key:
+                providers[provider.name] = {"status": "not_configured"}
+                continue
+            tasks[asyncio.ensure_future(self._search_provider(provider, name, api_key))] = provider
+        if not tasks:
+            raise HTTPException(status_code=500, detail="No image provider API keys configured")
+
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+
+        results: Dict[str, list] = {}
+        for task, provider in tasks.items():
+            elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+            if task in pending:
+                providers[provider.name] = {"status": "timeout", "elapsed_ms": elapsed_ms}
+                logger.warning(f"{provider.name} missed the {deadline}s image deadline for {name}")
+                continue
+            error = task.exception()
+            if isinstance(error, asyncio.TimeoutError):
+                providers[provider.name] = {"status": "timeout"}
+                logger.warning(f"{provider.name} timed out for {name}")
+            elif error is not None:
+                providers[provider.name] = {"status": "error", "detail": str(error)}
+                logger.warning(f"{provider.name} error for {name}: {str(error)}")
+            else:
+                results[provider.name] = task.result()["photos"]
+                providers[provider.name] = {"status": "ok", "count": len(results[provider.name])}
+
+        # Merge in registration order so the output does not depend on which provider answered first
+        photos = merge_photos(results[p.name] for p in self.image_providers if p.name in results)
+        return {"photos": photos[:15], "total_results": len(photos), "providers": providers}
+
+    async def _map_geocode(self, name: str) -> Dict[str, Any]:
+        """
+        Coordinates, bounding box and boundary GeoJSON for the map. Countries the
+        offline geocoder knows come with a Natural Earth boundary; anything else
+        costs one cached Nominatim polygon search.
+        """
+        if not self.geocoder.loaded:
+            await run_in_threadpool(self.geocoder.load)
+        known = self.geocoder.lookup(name)
+        if known is not None:
+            return {"coordinates": known.coordinates, "geojson": known.boundary.feature,
+                    "geojson_json": known.boundary.feature_json}
+
+        data = await self._nominatim_search(name, polygon=True)
+        if not data or "boundingbox" not in data[0]:
+            raise HTTPException(status_code=404, detail="Country coordinates not found")
+        if not data[0].get("geojson"):
+            raise HTTPException(status_code=404, detail="Country GeoJSON not found")
+
+        coordinates = {
+            "lat": float(data[0]["lat"]),
+            "lon": float(data[0]["lon"]),
+            "boundingbox": [
+                float(data[0]["boundingbox"][0]),  # south
+                float(data[0]["boundingbox"][1]),  # north
+                float(data[0]["boundingbox"][2]),  # west
+                float(data[0]["boundingbox"][3])   # east
+            ]
+        }
+        return {"coordinates": coordinates, "geojson": data[0]["geojson"]}
+
+    async def _map_capital(self, name: str) -> str:
+        # Fetch capital city from MongoDB
+        country = await self.find_country(name)
+        return country.get("capital") if country else name
+
+    async def _fetch_mapillary_images(self, bbox: list) -> list:
+        mapillary_key = os.getenv("MAPILLARY_CLIENT_ID")
+        if not mapillary_key:
+            return []
+
+        async def fetch():
+            mapillary_params = {
+                "access_token": mapillary_key,
+                "bbox": f"{bbox[2]},{bbox[0]},{bbox[3]},{bbox[1]}",
+                "limit": 5
+            }
+            mapillary_resp = await self.http.client("mapillary").get(
+                "https://graph.mapillary.com/v3/images", params=mapillary_params
+            )
+            mapillary_resp.raise_for_status()
+            mapillary_data = mapillary_resp.json()
+            return [
+                {
+                    "id": img["id"],
+                    "lat": img["geometry"]["coordinates"][1],
+                    "lon": img["geometry"]["coordinates"][0],
+                    "thumb_url": img.get("thumb_1024_url", "")
+                }
+                for img in mapillary_data.get("data", [])
+            ]
         try:
-            unsplash_photos = await self.get_country_photos(name, unsplash_key)
-            for photo in unsplash_photos["photos"]:
-                if photo["url"] not in urls_seen:
-                    photos.append(photo)
-                    urls_seen.add(photo["url"])
+            return await self.cache.get_or_fetch("mapillary", make_key(*(round(v, 4) for v in bbox)), fetch)
         except Exception as e:
-            print(f"Unsplash error: {str(e)}")  # Log error, continue with other APIs
+            logger.warning(f"Mapillary error: {str(e)}")
+            return []
 
-        # Pixabay
+    async def _fetch_overpass_pois(self, bbox: list) -> list:
+        """Tourist attractions inside the bounding box, cached per bbox since Overpass is slow."""
+        async def fetch():
+            south, north, west, east = bbox
+            overpass_query = f"""
+                [out:json];
+                (
+                    node["tourism"="attraction"]({south},{west},{north},{east});
+                    way["tourism"="attraction"]({south},{west},{north},{east});
+                );
+                out center;
+            """
+            overpass_resp = await self.http.client("overpass").post(
+                "https://overpass-api.de/api/interpreter", data={"data": overpass_query}
+            )
+            overpass_resp.raise_for_status()
+            overpass_data = overpass_resp.json()
+            return [
+                {
+                    "name": elem.get("tags", {}).get("name", "Unknown"),
+                    "lat": elem.get("lat", elem.get("center", {}).get("lat")),
+                    "lon": elem.get("lon", elem.get("center", {}).get("lon")),
+                    "type": elem.get("tags", {}).get("tourism", "attraction")
+                }
+                for elem in overpass_data.get("elements", [])
+            ]
+        try:
+            return await self.cache.get_or_fetch("overpass", make_key(*(round(v, 4) for v in bbox)), fetch)
+        except Exception as e:
+            logger.warning(f"Overpass error: {str(e)}")
+            return []
+
+    async def get_country_map_layers(self, name: str) -> Dict[str, Any]:
+        """Mapillary markers and POIs for the progressive map, fetched concurrently."""
         try:
-            pixabay_photos = await self.get_country_pixabay_photos(name, pixabay_key)
-            for photo in pixabay_photos["photos"]:
-                if photo["url"] not in urls_seen:
-                    photos.append(photo)
-                    urls_seen.add(photo["url"])
+            geo = await self._map_geocode(name)
+            bbox = geo["coordinates"]["boundingbox"]
+            mapillary_images, pois = await asyncio.gather(
+                self._fetch_mapillary_images(bbox),
+                self._fetch_overpass_pois(bbox)
+            )
+            return {"mapillary_images": mapillary_images, "pois": pois}
+        except HTTPException:
+            raise
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=e.response.status_code, detail=f"Nominatim API error: {str(e)}")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Error connecting to Nominatim API: {str(e)}")
         except Exception as e:
-            print(f"Pixabay error: {str(e)}")  # Log error, continue
+            raise HTTPException(status_code=500, detail=f"Error fetching map layers: {str(e)}")
 
-        # Pexels
+    async def get_country_map_data(self, name: str, include_layers: bool = True) -> Dict[str, Any]:
+        """
+        Geocode and capital lookup run together; once the bounding box is known,
+        Mapillary and Overpass run concurrently. With include_layers=False only the
+        geocode-dependent shell data is returned (see get_country_map_layers).
+        """
         try:
-            pexels_photos = await self.get_country_pexels_photos(name, pexels_key)
-            for photo in pexels_photos["photos"]:
-                if photo["url"] not in urls_seen:
-                    photos.append(photo)
-                    urls_seen.add(photo["url"])
+            geo, capital = await asyncio.gather(self._map_geocode(name), self._map_capital(name))
+            result = {
+                "coordinates": geo["coordinates"],
+                "capital": capital,
+                "geojson": geo["geojson"],
+                "geojson_json": geo.get("geojson_json"),
+                "mapillary_images": [],
+                "pois": []
+            }
+            if include_layers:
+                bbox = geo["coordinates"]["boundingbox"]
+                result["mapillary_images"], result["pois"] = await asyncio.gather(
+                    self._fetch_mapillary_images(bbox),
+                    self._fetch_overpass_pois(bbox)
+                )
+            return result
+        except HTTPException:
+            raise
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=e.response.status_code, detail=f"Nominatim API error: {str(e)}")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Error connecting to Nominatim API: {str(e)}")
         except Exception as e:
-            print(f"Pexels error: {str(e)}")  # Log error, continue
-
-        return {"photos": photos[:15], "total_results": len(photos)}
-    
-    async def get_country_map_data(self, name: str) -> Dict[str, Any]:
-            async with httpx.AsyncClient() as client:
-                try:
-                    # Fetch coordinates from Nominatim
-                    url = "https://nominatim.openstreetmap.org/search"
-                    params = {
-                        "q": name,
-                        "format": "json",
-                        "polygon_geojson": 1,
-                        "limit": 1
-                    }
-                    resp = await client.get(url, params=params, headers={"User-Agent": "country-api/1.0"})
-                    resp.raise_for_status()
-                    data = resp.json()
-                    if not data or "boundingbox" not in data[0]:
-                        raise HTTPException(status_code=404, detail="Country coordinates not found")
-
-                    coordinates = {
-                        "lat": float(data[0]["lat"]),
-                        "lon": float(data[0]["lon"]),
-                        "boundingbox": [
-                            float(data[0]["boundingbox"][0]),  # south
-                            float(data[0]["boundingbox"][1]),  # north
-                            float(data[0]["boundingbox"][2]),  # west
-                            float(data[0]["boundingbox"][3])   # east
-                        ]
-                    }
-
-                    # Fetch capital city from MongoDB
-                    country = await run_in_threadpool(self.country_model.find_by_name, name)
-                    capital = country.get("capital") if country else name
-
-                    # Fetch Mapillary images
-                    mapillary_key = os.getenv("MAPILLARY_CLIENT_ID")
-                    mapillary_images = []
-                    if mapillary_key:
-                        try:
-                            mapillary_url = "https://graph.mapillary.com/v3/images"
-                            mapillary_params = {
-                                "access_token": mapillary_key,
-                                "bbox": f"{coordinates['boundingbox'][2]},{coordinates['boundingbox'][0]},{coordinates['boundingbox'][3]},{coordinates['boundingbox'][1]}",
-                                "limit": 5
-                            }
-                            mapillary_resp = await client.get(mapillary_url, params=mapillary_params)
-                            mapillary_resp.raise_for_status()
-                            mapillary_data = mapillary_resp.json()
-                            mapillary_images = [
-                                {
-                                    "id": img["id"],
-                                    "lat": img["geometry"]["coordinates"][1],
-                                    "lon": img["geometry"]["coordinates"][0],
-                                    "thumb_url": img.get("thumb_1024_url", "")
-                                }
-                                for img in mapillary_data.get("data", [])
-                            ]
-                        except Exception as e:
-                            print(f"Mapillary error: {str(e)}")
-
-                    # Fetch POIs from Overpass API (e.g., tourist attractions)
-                    overpass_url = "https://overpass-api.de/api/interpreter"
-                    overpass_query = f"""
-                        [out:json];
-                        (
-                            node["tourism"="attraction"]({coordinates['boundingbox'][0]},{coordinates['boundingbox'][2]},{coordinates['boundingbox'][1]},{coordinates['boundingbox'][3]});
-                            way["tourism"="attraction"]({coordinates['boundingbox'][0]},{coordinates['boundingbox'][2]},{coordinates['boundingbox'][1]},{coordinates['boundingbox'][3]});
-                        );
-                        out center;
-                    """
-                    try:
-                        overpass_resp = await client.post(overpass_url, data={"data": overpass_query})
-                        overpass_resp.raise_for_status()
-                        overpass_data = overpass_resp.json()
-                        pois = [
-                            {
-                                "name": elem.get("tags", {}).get("name", "Unknown"),
-                                "lat": elem.get("lat", elem.get("center", {}).get("lat")),
-                                "lon": elem.get("lon", elem.get("center", {}).get("lon")),
-                                "type": elem.get("tags", {}).get("tourism", "attraction")
-                            }
-                            for elem in overpass_data.get("elements", [])
-                        ]
-                    except Exception as e:
-                        print(f"Overpass error: {str(e)}")
-                        pois = []
-
-                    # Use Nominatim's GeoJSON or local fallback
-                    geojson_data = data[0].get("geojson")
-                    if not geojson_data:
-                        try:
-                            with open("app/static/geojson/ne_110m_admin_0_countries/ne_110m_admin_0_countries.geojson", "r") as f:
-                                geojson_data = json.load(f)
-                            country_feature = None
-                            for feature in geojson_data["features"]:
-                                if feature["properties"]["NAME"].lower() == name.lower():
-                                    country_feature = feature
-                                    break
-                            if not country_feature:
-                                raise HTTPException(status_code=404, detail="Country GeoJSON not found")
-                            geojson_data = country_feature
-                        except FileNotFoundError:
-                            raise HTTPException(status_code=500, detail="GeoJSON file not found")
-
-                    return {
-                        "coordinates": coordinates,
-                        "capital": capital,
-                        "geojson": geojson_data,
-                        "mapillary_images": mapillary_images,
-                        "pois": pois
-                    }
-                except httpx.HTTPStatusError as e:
-                    raise HTTPException(status_code=e.response.status_code, detail=f"Nominatim API error: {str(e)}")
-                except httpx.HTTPError as e:
-                    raise HTTPException(status_code=502, detail=f"Error connecting to Nominatim API: {str(e)}")
-                except Exception as e:
-                    raise HTTPException(status_code=500, detail=f"Error fetching map data: {str(e)}")
-
-        # ... (other methods like get_country_details, get_country_photos, etc., remain unchanged)
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Error fetching map data: {str(e)}")
@@ -0,0 +1,134 @@
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Mapping, Tuple
+import json
+import logging
+import re
+import sys
+from app import config
+from app.models.country import normalize_name
+from app.services.boundaries import ALIASES, BoundaryStore, fold_name, shared_boundary_store
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# flagcdn URLs in countries.json end in the ISO alpha-2 code, e.g. .../w320/za.png
+_FLAG_CODE = re.compile(r"/([a-z]{2})\.(?:png|svg)$", re.IGNORECASE)
+# "Congo (Congo-Brazzaville)" -> "Congo"
+_PARENTHETICAL = re.compile(r"\s*\([^)]*\)")
+# Natural Earth properties whose values are alternative names or codes for a country
+_BOUNDARY_KEYS = ("NAME", "NAME_LONG", "ADMIN", "NAME_EN", "FORMAL_EN",
+                  "ISO_A2", "ISO_A3", "ISO_A2_EH", "ISO_A3_EH")
+
+
+def _name_keys(name: str) -> Tuple[str, ...]:
+    bare = _PARENTHETICAL.sub("", name)
+    return tuple(dict.fromkeys((normalize_name(name), fold_name(name), normalize_name(bare), fold_name(bare))))
+
+
+class CurrencyRegistry:
+    """
+    Read-only country <-> currency index. Every key form resolves with one dict
+    lookup: normalize_name() and accent-folded country names, alternative names
+    and ISO alpha-2/alpha-3 codes. Built once at import and shared by services.
+    """
+
+    __slots__ = ("_by_key", "_by_currency", "_names")
+
+    def __init__(self, by_key: Dict[str, str], by_currency: Dict[str, Tuple[str, ...]], names: Dict[str, str]):
+        self._by_key: Mapping[str, str] = MappingProxyType(by_key)
+        self._by_currency: Mapping[str, Tuple[str, ...]] = MappingProxyType(by_currency)
+        self._names: Mapping[str, str] = MappingProxyType(names)
+
+    def currency_for(self, country: str) -> Optional[str]:
+        return self._by_key.get(normalize_name(country)) or self._by_key.get(fold_name(country))
+
+    def countries_for(self, currency: str) -> Tuple[str, ...]:
+        return self._by_currency.get(currency.upper(), ())
+
+    def canonical_name(self, country: str) -> Optional[str]:
+        """The currencies.json spelling of a country, for any accepted key."""
+        return self._names.get(normalize_name(country)) or self._names.get(fold_name(country))
+
+    @property
+    def currencies(self) -> Tuple[str, ...]:
+        return tuple(self._by_currency)
+
+    def __len__(self) -> int:
+        return sum(len(names) for names in self._by_currency.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"countries": len(self), "currencies": len(self._by_currency), "keys": len(self._by_key)}
+
+
+def build_registry(currencies: Dict[str, str], countries: Optional[List[Dict[str, Any]]] = None,
+                   boundaries: Optional[BoundaryStore] = None) -> CurrencyRegistry:
+    """
+    Index currencies.json, then widen it with ISO alpha-2 codes from the flag URLs
+    in countries.json and with the alternative names and ISO codes of matching
+    Natural Earth boundaries (plus their ALIASES). Explicit currencies.json names
+    always win a clash.
+    """
+    by_key: Dict[str, str] = {}
+    names: Dict[str, str] = {}
+    by_currency: Dict[str, List[str]] = {}
+    for country, code in currencies.items():
+        code = sys.intern(code.strip().upper())
+        by_currency.setdefault(code, []).append(country)
+        for key in _name_keys(country):
+            by_key.setdefault(key, code)
+            names.setdefault(key, country)
+
+    def alias(keys, resolved):
+        code, country = by_key[resolved], names[resolved]
+        for key in keys:
+            by_key.setdefault(key, code)
+            names.setdefault(key, country)
+
+    for entry in countries or []:
+        match = _FLAG_CODE.search(entry.get("flag") or "")
+        name = entry.get("name")
+        resolved = next((k for k in _name_keys(name) if k in by_key), None) if name else None
+        if match and resolved:
+            alias([match.group(1).lower()], resolved)
+
+    for boundary in boundaries or []:
+        props = boundary.feature["properties"]
+        keys = [key for prop in _BOUNDARY_KEYS
+                if props.get(prop) and props[prop] != "-99"
+                for key in _name_keys(str(props[prop]))]
+        resolved = next((k for k in keys if k in by_key), None)
+        if resolved:
+            alias(keys, resolved)
+
+    for name, iso_a3 in ALIASES.items():
+        if iso_a3.lower() in by_key:
+            alias([name], iso_a3.lower())
+
+    return CurrencyRegistry(by_key, {code: tuple(c) for code, c in by_currency.items()}, names)
+
+
+def _read_json(path: str, required: bool):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        if required:
+            raise
+        logger.warning(f"{path} not found; currency registry built without it")
+        return None
+
+
+def load_registry(currencies_path: Optional[str] = None, countries_path: Optional[str] = None,
+                  boundaries: Optional[BoundaryStore] = None) -> CurrencyRegistry:
+    currencies_path = currencies_path or config.CURRENCIES_JSON
+    currencies = _read_json(currencies_path, required=True)
+    if not isinstance(currencies, dict):
+        logger.error(f"Invalid format in {currencies_path}: expected a dictionary")
+        raise ValueError("Currency mappings must be a JSON object")
+    countries = _read_json(countries_path or config.COUNTRIES_JSON, required=False)
+    registry = build_registry(currencies, countries, boundaries or shared_boundary_store())
+    logger.info(f"Currency registry: {registry.stats()}")
+    return registry
+
+
+CURRENCY_REGISTRY = load_registry()
@@ -1,87 +1,159 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List
+import asyncio
 import httpx
+from app import config
+from app.services.http_client import HttpClientManager
+from app.services.exchange_rates import RateTable
+from app.services.currency_registry import CurrencyRegistry, CURRENCY_REGISTRY
 from fastapi import HTTPException
 import logging
 import os
-import json
-from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class CurrencyService:
-    def __init__(self):
+    def __init__(self, http_clients: Optional[HttpClientManager] = None,
+                 refresh_interval: Optional[float] = None,
+                 registry: Optional[CurrencyRegistry] = None):
+        self.http = http_clients or HttpClientManager()
         self.exchange_rate_base_url = "https://v6.exchangerate-api.com/v6"
+        self.base_currency = config.EXCHANGE_RATE_BASE.upper()
+        self.refresh_interval = config.EXCHANGE_RATE_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.rate_table: Optional[RateTable] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._background: Optional[asyncio.Task] = None
         self.api_key = os.getenv("EXCHANGERATE_API_KEY")
         if not self.api_key:
             logger.error("EXCHANGERATE_API_KEY not set in environment variables")
             raise HTTPException(status_code=500, detail="ExchangeRate-API key not configured")
-        # Load country-to-currency mappings from JSON file
-        self.country_currencies = self._load_currencies()
+        # Shared, read-only country -> currency index built at import
+        self.currencies = registry or CURRENCY_REGISTRY
 
-    def _load_currencies(self) -> Dict[str, str]:
-        """
-        Load country-to-currency mappings from app/static/currencies.json.
-        Returns a dictionary or raises an exception if loading fails.
-        """
-        json_file_path = Path(__file__).parent.parent / "static" / "currencies.json"
-        logger.info(f"Attempting to load currency mappings from {json_file_path}")
+    async def refresh_rates(self) -> RateTable:
+        """Fetch /latest/{base} once, sharing a refresh already in flight."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._fetch_rates())
+        return await asyncio.shield(self._refreshing)
 
-        try:
-            with open(json_file_path, "r") as file:
-                currencies = json.load(file)
-                if not isinstance(currencies, dict):
-                    logger.error(f"Invalid format in {json_file_path}: expected a dictionary")
-                    raise ValueError("Currency mappings must be a JSON object")
-                logger.info(f"Loaded currencies: {list(currencies.keys())}")
-                return currencies
-        except FileNotFoundError:
-            logger.error(f"Currency file not found: {json_file_path}")
-            raise HTTPException(status_code=500, detail=f"Currency file not found: {json_file_path}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in {json_file_path}: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Invalid JSON in currency file: {str(e)}")
-        except Exception as e:
-            logger.error(f"Unexpected error loading {json_file_path}: {str(e)} (Type: {type(e).__name__})")
-            raise HTTPException(status_code=500, detail=f"Error loading currency file: {str(e)}")
+    async def _fetch_rates(self) -> RateTable:
+        url = f"{self.exchange_rate_base_url}/{self.api_key}/latest/{self.base_currency}"
+        response = await self.http.client("exchangerate").get(url)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("result") != "success":
+            logger.error(f"ExchangeRate-API error for base {self.base_currency}: {data}")
+            raise HTTPException(status_code=500, detail=f"ExchangeRate-API error: {data.get('error-type', 'Unknown error')}")
+        self.rate_table = RateTable.from_response(data)
+        logger.info(f"Loaded {len(self.rate_table)} exchange rates against {self.rate_table.base}")
+        return self.rate_table
+
+    def _refresh_in_background(self) -> None:
+        async def refresh():
+            try:
+                await self.refresh_rates()
+            except Exception as e:
+                logger.warning(f"Exchange-rate refresh failed, keeping rates from "
+                               f"{self.rate_table.age():.0f}s ago: {str(e)}")
+        if self._refreshing is None or self._refreshing.done():
+            self._background = asyncio.ensure_future(refresh())
+
+    async def _rates(self) -> RateTable:
+        """The current table; a stale one is served while a refresh runs in the background."""
+        if self.rate_table is None:
+            return await self.refresh_rates()
+        if self.rate_table.age() >= self.refresh_interval:
+            self._refresh_in_background()
+        return self.rate_table
+
+    def _currency_for(self, country: str) -> str:
+        currency = self.currencies.currency_for(country)
+        if currency is None:
+            logger.error(f"No currency known for {country}")
+            raise HTTPException(status_code=404, detail=f"No currency known for {country}")
+        return currency
+
+    @staticmethod
+    def _check_supported(table: RateTable, *codes: str) -> None:
+        for code in codes:
+            if code not in table:
+                raise HTTPException(status_code=400, detail=f"Unsupported currency: {code}")
 
     async def convert_currency(self, country: str, amount: float, from_currency: str) -> Dict[str, Any]:
         """
         Convert an amount from a given currency to the country's local currency.
         """
-        # Normalize country name to title case for consistent lookup
-        normalized_country = country.title()
-        to_currency = self.country_currencies.get(normalized_country, "USD")  # Default to USD if not found
-        logger.info(f"Converting {amount} {from_currency} to {to_currency} for {normalized_country} (original: {country})")
+        from_currency = from_currency.upper()
+        to_currency = self._currency_for(country)
+        logger.info(f"Converting {amount} {from_currency} to {to_currency} for {country}")
+        try:
+            table = await self._rates()
+            self._check_supported(table, from_currency, to_currency)
+            rate = table.rate(from_currency, to_currency)
+            converted = amount * rate
 
-        # Fetch from ExchangeRate-API
-        async with httpx.AsyncClient() as client:
-            try:
-                url = f"{self.exchange_rate_base_url}/{self.api_key}/pair/{from_currency}/{to_currency}"
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
+            return {
+                "country": country,  # Return original case for consistency
+                "from": f"{amount:.2f} {from_currency}",
+                "to": f"{converted:.2f} {to_currency}",
+                "exchange_rate": rate
+            }
+        except HTTPException:
+            raise
+        except httpx.HTTPStatusError as e:
+            logger.error(f"ExchangeRate-API error: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"ExchangeRate-API error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Network error connecting to ExchangeRate-API: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Error connecting to ExchangeRate-API: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error processing currency conversion: {str(e)} (Type: {type(e).__name__})")
+            raise HTTPException(status_code=500, detail=f"Error processing currency conversion: {str(e)} (Type: {type(e).__name__})")
 
-                if data["result"] != "success":
-                    logger.error(f"ExchangeRate-API error for {from_currency} to {to_currency}: {data}")
-                    raise HTTPException(status_code=500, detail=f"ExchangeRate-API error: {data.get('error-type', 'Unknown error')}")
+    async def convert_batch(self, countries: List[str], amount: float, from_currency: str) -> Dict[str, Any]:
+        """
+        Convert one amount into the local currency of each country, from a single
+        rate table lookup.
+        """
+        from_currency = from_currency.upper()
+        try:
+            table = await self._rates()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"ExchangeRate-API error: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"ExchangeRate-API error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Network error connecting to ExchangeRate-API: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Error connecting to ExchangeRate-API: {str(e)}")
+        self._check_supported(table, from_currency)
 
-                rate = data["conversion_rate"]
-                converted = amount * rate
+        conversions = []
+        for country in countries:
+            to_currency = self.currencies.currency_for(country)
+            if to_currency is None:
+                conversions.append({"country": country, "currency": None, "error": "Unknown currency"})
+                continue
+            if to_currency not in table:
+                conversions.append({"country": country, "currency": to_currency, "error": "Unsupported currency"})
+                continue
+            rate = table.rate(from_currency, to_currency)
+            conversions.append({
+                "country": country,
+                "currency": to_currency,
+                "to": f"{amount * rate:.2f} {to_currency}",
+                "exchange_rate": rate
+            })
+        return {
+            "from": f"{amount:.2f} {from_currency}",
+            "conversions": conversions,
+            "rates_age_seconds": round(table.age(), 1)
+        }
 
-                return {
-                    "country": country,  # Return original case for consistency
-                    "from": f"{amount:.2f} {from_currency}",
-                    "to": f"{converted:.2f} {to_currency}",
-                    "exchange_rate": rate
-                }
-            except httpx.HTTPStatusError as e:
-                logger.error(f"ExchangeRate-API error: {e.response.status_code} - {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"ExchangeRate-API error: {e.response.text}")
-            except httpx.HTTPError as e:
-                logger.error(f"Network error connecting to ExchangeRate-API: {str(e)}")
-                raise HTTPException(status_code=502, detail=f"Error connecting to ExchangeRate-API: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error processing currency conversion: {str(e)} (Type: {type(e).__name__})")
-                raise HTTPException(status_code=500, detail=f"Error processing currency conversion: {str(e)} (Type: {type(e).__name__})")
\ No newline at end of file
+    def stats(self) -> Dict[str, Any]:
+        table = self.rate_table
+        return {
+            "base": self.base_currency,
+            "currencies": len(table) if table else 0,
+            "age_seconds": round(table.age(), 1) if table else None,
+            "registry": self.currencies.stats(),
+        }
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Awaitable, Iterable, List
+import asyncio
+import logging
+import time
+from fastapi import HTTPException
+from app import config
+from app.models.country import capital_coordinates
+from app.services.geocoder import Geocoder, GeocodeResult
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DossierContext:
+    """Everything resolved once up front and shared by every section."""
+    name: str                              # canonical name when the country is in the database
+    country: Optional[Dict[str, Any]]
+    located: Optional[GeocodeResult]
+    from_currency: str = "USD"
+
+    @property
+    def centroid(self) -> Optional[Dict[str, float]]:
+        return self.located.centroid if self.located else None
+
+    @property
+    def capital(self) -> Optional[Dict[str, float]]:
+        return capital_coordinates(self.country)
+
+
+@dataclass(frozen=True)
+class DossierSection:
+    name: str
+    fetch: Callable[[DossierContext], Awaitable[Any]]
+    timeout: float
+    default: bool = True                   # included when the client does not pass ?include=
+
+
+class DossierService:
+    """
+    One response for a country page. The country document and coordinates are
+    resolved once; the requested sections then run concurrently, each with its own
+    timeout and all bounded by an overall deadline. Sections that fail or run late
+    are reported with their status instead of failing the whole dossier.
+    """
+
+    def __init__(self, country_service, geocoder: Geocoder, weather_service=None, safety_service=None,
+                 currency_service=None, attractions_service=None, social_service=None,
+                 section_timeout: Optional[float] = None, deadline: Optional[float] = None):
+        self.country_service = country_service
+        self.geocoder = geocoder
+        self.deadline = config.DOSSIER_DEADLINE if deadline is None else deadline
+        timeout = config.DOSSIER_SECTION_TIMEOUT if section_timeout is None else section_timeout
+        self.sections: Dict[str, DossierSection] = {}
+        self.register(DossierSection(
+            "summary", lambda ctx: country_service.get_wikipedia_summary(ctx.name), timeout))
+        self.register(DossierSection(
+            "images", lambda ctx: country_service.get_country_images(ctx.name),
+            max(timeout, config.IMAGE_FANOUT_DEADLINE)))
+        if weather_service is not None:
+            self.register(DossierSection(
+                "weather", lambda ctx: weather_service.get_weather(ctx.name, coordinates=ctx.capital or ctx.centroid), timeout))
+        if safety_service is not None:
+            self.register(DossierSection("safety", lambda ctx: safety_service.get_safety(ctx.name), timeout))
+        if currency_service is not None:
+            self.register(DossierSection(
+                "currency", lambda ctx: currency_service.convert_currency(ctx.name, 1.0, ctx.from_currency), timeout))
+        if attractions_service is not None:
+            self.register(DossierSection(
+                "attractions",
+                lambda ctx: attractions_service.get_attractions(ctx.name, coordinates=ctx.centroid), timeout))
+        if social_service is not None:
+            # X quota is a few requests a day; only fetched when explicitly included
+            self.register(DossierSection(
+                "social", lambda ctx: social_service.get_social_posts(ctx.name), timeout, default=False))
+
+    def register(self, section: DossierSection) -> None:
+        self.sections[section.name] = section
+
+    def _select(self, include: Optional[Iterable[str]]) -> List[str]:
+        if not include:
+            return [name for name, section in self.sections.items() if section.default]
+        selected = list(dict.fromkeys(name.strip().lower() for name in include if name.strip()))
+        unknown = [name for name in selected if name not in self.sections]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown dossier sections: {', '.join(unknown)}. "
+                                                        f"Available: {', '.join(self.sections)}")
+        return selected
+
+    async def _resolve(self, name: str, from_currency: str) -> DossierContext:
+        country, located = await asyncio.gather(
+            self.country_service.find_country(name), self.geocoder.geocode(name), return_exceptions=True
+        )
+        if isinstance(country, Exception):
+            logger.warning(f"Country lookup failed for {name}: {str(country)}")
+            country = None
+        if isinstance(located, Exception):
+            logger.warning(f"Geocoding failed for {name}: {str(located)}")
+            located = None
+        if country is None and located is None:
+            raise HTTPException(status_code=404, detail=f"Country not found: {name}")
+        canonical = country["name"] if country and country.get("name") else name
+        return DossierContext(canonical, country, located, from_currency.upper())
+
+    @staticmethod
+    async def _run(section: DossierSection, ctx: DossierContext) -> Any:
+        return await asyncio.wait_for(section.fetch(ctx), timeout=section.timeout)
+
+    async def get_dossier(self, name: str, include: Optional[Iterable[str]] = None,
+                          from_currency: str = "USD") -> Dict[str, Any]:
+        started = time.monotonic()
+        selected = self._select(include)
+        ctx = await self._resolve(name, from_currency)
+
+        tasks: Dict[asyncio.Task, str] = {
+            asyncio.ensure_future(self._run(self.sections[section], ctx)): section for section in selected
+        }
+        finished_at: Dict[str, float] = {}
+        for task, section in tasks.items():
+            task.add_done_callback(lambda _, section=section: finished_at.setdefault(section, time.monotonic()))
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline) if tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+
+        sections: Dict[str, Dict[str, Any]] = {}
+        for task, section in tasks.items():
+            elapsed_ms = round((finished_at.get(section, time.monotonic()) - started) * 1000, 1)
+            if task in pending:
+                sections[section] = {"status": "timeout", "elapsed_ms": elapsed_ms}
+                logger.warning(f"Dossier section {section} missed the {self.deadline}s deadline for {name}")
+                continue
+            error = task.exception()
+            if isinstance(error, asyncio.TimeoutError):
+                sections[section] = {"status": "timeout", "elapsed_ms": elapsed_ms}
+                logger.warning(f"Dossier section {section} timed out for {name}")
+            elif isinstance(error, HTTPException):
+                sections[section] = {"status": "error", "code": error.status_code, "detail": error.detail,
+                                     "elapsed_ms": elapsed_ms}
+            elif error is not None:
+                sections[section] = {"status": "error", "code": 500, "detail": str(error), "elapsed_ms": elapsed_ms}
+                logger.warning(f"Dossier section {section} failed for {name}: {str(error)}")
+            else:
+                sections[section] = {"status": "ok", "elapsed_ms": elapsed_ms, "data": task.result()}
+
+        return {
+            "name": ctx.name,
+            "country": ctx.country,
+            "coordinates": ctx.located.coordinates if ctx.located else None,
+            "sections": sections,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }
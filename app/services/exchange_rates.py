@@ -0,0 +1,47 @@
+from array import array
+from typing import Dict, Any, Optional, Iterable, Tuple
+import time
+
+
+class RateTable:
+    """
+    One ExchangeRate-API /latest/{base} snapshot: every currency's rate against
+    the base in a flat array, indexed by currency code. Any pair is triangulated
+    through the base, so a single upstream call covers all N x N conversions.
+    """
+
+    __slots__ = ("base", "_index", "_rates", "fetched_at", "next_update")
+
+    def __init__(self, base: str, rates: Iterable[Tuple[str, float]],
+                 fetched_at: Optional[float] = None, next_update: Optional[float] = None):
+        self.base = base.upper()
+        self._index: Dict[str, int] = {}
+        self._rates = array("d")
+        for code, rate in rates:
+            if rate and rate > 0:
+                self._index[code.upper()] = len(self._rates)
+                self._rates.append(float(rate))
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.next_update = next_update
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any]) -> "RateTable":
+        return cls(
+            data["base_code"],
+            data["conversion_rates"].items(),
+            next_update=data.get("time_next_update_unix"),
+        )
+
+    def __contains__(self, code: str) -> bool:
+        return code.upper() in self._index
+
+    def __len__(self) -> int:
+        return len(self._rates)
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """Units of to_currency per unit of from_currency; KeyError for unknown codes."""
+        rates, index = self._rates, self._index
+        return rates[index[to_currency.upper()]] / rates[index[from_currency.upper()]]
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
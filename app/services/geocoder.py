@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple, List
+import difflib
+import json
+import logging
+import re
+import threading
+from starlette.concurrency import run_in_threadpool
+from app import config
+from app.models.search_index import edit_distance
+from app.services.boundaries import Boundary, BoundaryStore, fold_name
+from app.services.cache import ResponseCache, make_key
+from app.services.http_client import HttpClientManager
+from app.services.rate_limiter import RateLimiterRegistry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NOMINATIM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
+# flagcdn URLs in countries.json end in the ISO alpha-2 code, e.g. .../w320/za.png
+_FLAG_CODE = re.compile(r"/([a-z]{2})\.(?:png|svg)$", re.IGNORECASE)
+# Remembered fuzzy answers (including misses) per distinct query
+_MAX_FUZZY_MEMO = 4096
+
+
+def _typo_limit(name: str) -> int:
+    """Edits a fuzzy match may be away from the query and still look like a typo."""
+    return 1 if len(name) <= 6 else 2 if len(name) <= 12 else 3
+
+
+@dataclass(frozen=True)
+class GeocodeResult:
+    name: str
+    lat: float
+    lon: float
+    bbox: Tuple[float, float, float, float]   # south, north, west, east
+    source: str                               # "offline", "fuzzy" or "nominatim"
+    boundary: Optional[Boundary] = None
+
+    @property
+    def centroid(self) -> Dict[str, float]:
+        return {"lat": self.lat, "lon": self.lon}
+
+    @property
+    def coordinates(self) -> Dict[str, Any]:
+        return {"lat": self.lat, "lon": self.lon, "boundingbox": list(self.bbox)}
+
+
+class Geocoder:
+    """
+    Country name -> centroid and bounding box without leaving the process.
+
+    Names are resolved against the Natural Earth boundary store, widened with the
+    names in countries.json (linked to boundaries through the ISO code in their flag
+    URL), then fuzzily via difflib when the difference is typo-sized. Catalogue
+    names with no boundary and names that still do not match go to Nominatim,
+    rate limited and cached under the same keys CountryService uses.
+    """
+
+    def __init__(self, boundaries: Optional[BoundaryStore] = None,
+                 http_clients: Optional[HttpClientManager] = None,
+                 cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiterRegistry] = None,
+                 countries_path: Optional[str] = None,
+                 fuzzy_cutoff: Optional[float] = None):
+        self.boundaries = boundaries or BoundaryStore()
+        self.http = http_clients or HttpClientManager()
+        self.cache = cache or ResponseCache()
+        self.rate_limiter = rate_limiter or RateLimiterRegistry()
+        self.countries_path = countries_path or config.COUNTRIES_JSON
+        self.fuzzy_cutoff = config.GEOCODER_FUZZY_CUTOFF if fuzzy_cutoff is None else fuzzy_cutoff
+        self._extra: Dict[str, Boundary] = {}
+        self._unlinked: set = set()
+        self._choices: List[str] = []
+        self._fuzzy: Dict[str, Optional[Boundary]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._stats = {"offline": 0, "fuzzy": 0, "nominatim": 0, "misses": 0}
+
+    def load(self) -> None:
+        with self._lock:
+            if self.loaded:
+                return
+            self.boundaries.load()
+            extra: Dict[str, Boundary] = {}
+            unlinked = set()
+            for country in self._read_countries():
+                name, flag = country.get("name"), country.get("flag") or ""
+                if not name or self.boundaries.lookup(name) is not None:
+                    continue
+                match = _FLAG_CODE.search(flag)
+                boundary = self.boundaries.lookup(match.group(1)) if match else None
+                if boundary is not None:
+                    extra[fold_name(name)] = boundary
+                else:
+                    # A real country Natural Earth lacks (Åland, Andorra, ...): never fuzzy-match
+                    # it onto a neighbour in name, let Nominatim place it instead
+                    unlinked.add(fold_name(name))
+            self._extra = extra
+            self._unlinked = unlinked
+            # ISO codes are matched exactly only; fuzzy-matching "usa" to "us" would be noise
+            self._choices = sorted(k for k in set(self.boundaries.keys()) | set(extra) if len(k) > 3)
+            self.loaded = True
+            logger.info(f"Geocoder ready with {len(self._choices)} names ({len(extra)} from countries.json)")
+
+    def _read_countries(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.countries_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"{self.countries_path} not found; geocoding from boundaries only")
+        except Exception as e:
+            logger.error(f"Could not read {self.countries_path}: {str(e)}")
+        return []
+
+    def _match(self, name: str) -> Tuple[Optional[Boundary], str]:
+        boundary = self.boundaries.lookup(name)
+        if boundary is not None:
+            return boundary, "offline"
+        folded = fold_name(name)
+        if folded in self._extra:
+            return self._extra[folded], "offline"
+        if folded in self._unlinked:
+            return None, "fuzzy"
+        if folded not in self._fuzzy:
+            limit = _typo_limit(folded)
+            close = [
+                choice for choice in difflib.get_close_matches(folded, self._choices, n=3, cutoff=self.fuzzy_cutoff)
+                if edit_distance(folded, choice, limit) <= limit
+            ]
+            if close:
+                match = self._extra.get(close[0]) or self.boundaries.lookup(close[0])
+            else:
+                match = None
+            if len(self._fuzzy) >= _MAX_FUZZY_MEMO:
+                self._fuzzy.clear()
+            self._fuzzy[folded] = match
+        return self._fuzzy[folded], "fuzzy"
+
+    def lookup(self, name: str) -> Optional[GeocodeResult]:
+        """Offline only: exact, alias and fuzzy matches. Never touches the network."""
+        if not self.loaded:
+            self.load()
+        if not name or not name.strip():
+            return None
+        boundary, source = self._match(name)
+        if boundary is None:
+            return None
+        self._stats[source] += 1
+        return GeocodeResult(boundary.name, boundary.centroid["lat"], boundary.centroid["lon"],
+                             boundary.bbox, source, boundary)
+
+    async def geocode(self, name: str) -> Optional[GeocodeResult]:
+        """
+        lookup(), falling back to a cached Nominatim search for unknown names.
+        Upstream errors propagate as httpx exceptions; no match returns None.
+        """
+        if not self.loaded:
+            # The first load parses ~1 MB of GeoJSON; keep it off the event loop
+            await run_in_threadpool(self.load)
+        result = self.lookup(name)
+        if result is not None:
+            return result
+
+        async def fetch():
+            await self.rate_limiter.acquire("nominatim")
+            response = await self.http.client("nominatim").get(
+                NOMINATIM_SEARCH_URL, params={"q": name, "format": "json"}
+            )
+            response.raise_for_status()
+            return response.json()
+
+        data = await self.cache.get_or_fetch("nominatim", make_key(name, "search"), fetch)
+        if not data or "boundingbox" not in data[0]:
+            self._stats["misses"] += 1
+            return None
+        try:
+            south, north, west, east = map(float, data[0]["boundingbox"])
+            lat = float(data[0].get("lat", (south + north) / 2))
+            lon = float(data[0].get("lon", (west + east) / 2))
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid Nominatim result for {name}: {str(e)}")
+            self._stats["misses"] += 1
+            return None
+        self._stats["nominatim"] += 1
+        return GeocodeResult(data[0].get("display_name", name), lat, lon, (south, north, west, east), "nominatim")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"loaded": self.loaded, "names": len(self._choices), **self._stats}
@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+import importlib.util
+import logging
+import httpx
+from app import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional "h2" package; fall back to HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    max_connections: int = config.HTTP_MAX_CONNECTIONS
+    max_keepalive: int = config.HTTP_MAX_KEEPALIVE
+    http2: bool = True
+    connect_timeout: float = config.HTTP_CONNECT_TIMEOUT
+    read_timeout: float = config.HTTP_READ_TIMEOUT
+
+
+# Per-upstream pool settings. Public services with strict usage policies get small pools.
+UPSTREAMS: Dict[str, UpstreamConfig] = {
+    "nominatim": UpstreamConfig(max_connections=2, max_keepalive=2),
+    "wikipedia": UpstreamConfig(),
+    "unsplash": UpstreamConfig(max_connections=10, max_keepalive=5),
+    "pixabay": UpstreamConfig(max_connections=10, max_keepalive=5),
+    "pexels": UpstreamConfig(max_connections=10, max_keepalive=5),
+    "mapillary": UpstreamConfig(max_connections=5, max_keepalive=5),
+    "overpass": UpstreamConfig(max_connections=2, max_keepalive=2, http2=False, read_timeout=60.0),
+    "open_meteo": UpstreamConfig(),
+    "exchangerate": UpstreamConfig(max_connections=5, max_keepalive=5),
+    "travel_advisory": UpstreamConfig(max_connections=2, max_keepalive=2),
+    "x_api": UpstreamConfig(max_connections=2, max_keepalive=2),
+    "opentripmap": UpstreamConfig(max_connections=5, max_keepalive=5, http2=False),
+    "huggingface": UpstreamConfig(max_connections=10, max_keepalive=5, read_timeout=120.0),
+}
+
+
+class HttpClientManager:
+    """
+    Application-scoped pool of httpx.AsyncClient instances, one per upstream.
+    The app opens every client in its lifespan; outside it (tests, the CLI) they
+    are created lazily on first use. Clients reuse keep-alive connections across
+    requests and record whether each request was served from an idle pooled
+    connection (hit) or had to open a new one (miss).
+    """
+
+    def __init__(self, upstreams: Optional[Dict[str, UpstreamConfig]] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.upstreams = dict(UPSTREAMS if upstreams is None else upstreams)
+        self._transport = transport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def client(self, upstream: str) -> httpx.AsyncClient:
+        """Return the shared client for an upstream, creating it on first use."""
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._create_client(upstream)
+            self._clients[upstream] = client
+        return client
+
+    def open(self) -> None:
+        """Create the client of every configured upstream; called from the app lifespan."""
+        for upstream in self.upstreams:
+            self.client(upstream)
+
+    def _create_client(self, upstream: str) -> httpx.AsyncClient:
+        cfg = self.upstreams.get(upstream, UpstreamConfig())
+        http2 = cfg.http2 and config.HTTP2_ENABLED and HTTP2_AVAILABLE
+        self._stats.setdefault(upstream, {"requests": 0, "pool_hits": 0, "pool_misses": 0, "errors": 0})
+        logger.info(f"Creating HTTP client for {upstream} (max_connections={cfg.max_connections}, http2={http2})")
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive,
+                keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=cfg.connect_timeout,
+                read=cfg.read_timeout,
+                write=config.HTTP_WRITE_TIMEOUT,
+                pool=config.HTTP_POOL_TIMEOUT,
+            ),
+            headers={"User-Agent": config.HTTP_USER_AGENT},
+            transport=self._transport,
+            event_hooks={
+                "request": [self._make_request_hook(upstream)],
+                "response": [self._make_response_hook(upstream)],
+            },
+        )
+
+    def _make_request_hook(self, upstream: str):
+        async def on_request(request: httpx.Request) -> None:
+            # httpcore reports connection setup through the "trace" extension;
+            # a request that never connects was served by a pooled connection.
+            state = {"connected": False}
+
+            async def trace(event_name: str, info: Dict[str, Any]) -> None:
+                if event_name.startswith("connection.connect_tcp.started"):
+                    state["connected"] = True
+
+            request.extensions["trace"] = trace
+            request.extensions["pool_state"] = state
+            self._stats[upstream]["requests"] += 1
+        return on_request
+
+    def _make_response_hook(self, upstream: str):
+        async def on_response(response: httpx.Response) -> None:
+            stats = self._stats[upstream]
+            state = response.request.extensions.get("pool_state")
+            if state is not None and state["connected"]:
+                stats["pool_misses"] += 1
+            else:
+                stats["pool_hits"] += 1
+            if response.status_code >= 500:
+                stats["errors"] += 1
+        return on_response
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for upstream, stats in self._stats.items():
+            served = stats["pool_hits"] + stats["pool_misses"]
+            result[upstream] = {
+                **stats,
+                "hit_ratio": round(stats["pool_hits"] / served, 3) if served else None,
+            }
+        return result
+
+    async def aclose(self) -> None:
+        for upstream, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client for {upstream}: {str(e)}")
+        self._clients.clear()
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Dict, Any, List, Callable, Awaitable, Iterable, Set
+from urllib.parse import urlsplit
+import re
+
+# Size/format suffixes that photo CDNs append to the same underlying image
+_SIZE_SUFFIX = re.compile(r"([_-]\d{2,4}x\d{2,4}|_\d{3,4}|[_-](small|medium|large|thumb|tiny|original))+$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ImageProvider:
+    """
+    One photo source for get_country_images. `search(name, api_key)` must return
+    {"photos": [...], "total_results": int} in the shared photo format.
+    """
+    name: str
+    key_env: str
+    search: Callable[[str, str], Awaitable[Dict[str, Any]]]
+    timeout: float = 4.0
+
+
+def normalize_image_url(url: str) -> str:
+    """Scheme-, host-case-, query- and size-suffix-insensitive form of an image URL."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path, _, ext = parts.path.rpartition(".")
+    if not path or "/" in ext:
+        path, ext = parts.path, ""
+    path = _SIZE_SUFFIX.sub("", path.rstrip("/"))
+    return f"{host}{path}".lower()
+
+
+def image_keys(photo: Dict[str, Any]) -> Set[str]:
+    """
+    Keys under which two results count as the same picture: the normalized image
+    URL and the provider's page for the photo. Captions and photographers are not
+    used; one uploader often tags many different photos alike.
+    """
+    keys = {"url:" + normalize_image_url(photo["url"])}
+    if photo.get("source_url"):
+        keys.add("page:" + normalize_image_url(photo["source_url"]))
+    return keys
+
+
+def merge_photos(results: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Concatenate provider results in order, dropping near-duplicates."""
+    seen: Set[str] = set()
+    merged = []
+    for photos in results:
+        for photo in photos:
+            keys = image_keys(photo)
+            if keys & seen:
+                continue
+            seen |= keys
+            merged.append(photo)
+    return merged
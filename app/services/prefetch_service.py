@@ -0,0 +1,194 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+import asyncio
+import logging
+import time
+from app import config
+from app.models.country import normalize_name
+from app.services.cache import ResponseCache, refreshing
+from app.services.rate_limiter import RateLimiterRegistry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PrefetchJob:
+    name: str
+    upstream: str                                  # rate budget shared by every call of this job
+    warm: Callable[[str], Awaitable[Any]]          # the normal, cache-backed service call for a country
+
+
+class PopularityTracker:
+    """Request counts per country, decayed every cycle so recent interest outweighs old."""
+
+    def __init__(self, decay: float = 0.5, max_countries: int = 1000):
+        self.decay = decay
+        self.max_countries = max_countries
+        self._counts: Counter = Counter()
+        self._names: Dict[str, str] = {}          # normalized -> name as first requested
+
+    def record(self, name: str) -> None:
+        norm = normalize_name(name)
+        if not norm:
+            return
+        self._counts[norm] += 1
+        self._names.setdefault(norm, name.strip())
+        if len(self._counts) > self.max_countries:
+            for rare, _ in self._counts.most_common()[self.max_countries:]:
+                del self._counts[rare]
+                self._names.pop(rare, None)
+
+    def top(self, n: int) -> List[str]:
+        return [self._names[norm] for norm, _ in self._counts.most_common(n)]
+
+    def counts(self, n: int) -> Dict[str, float]:
+        return {self._names[norm]: round(count, 2) for norm, count in self._counts.most_common(n)}
+
+    def decay_counts(self) -> None:
+        for norm in list(self._counts):
+            self._counts[norm] *= self.decay
+            if self._counts[norm] < 0.01:
+                del self._counts[norm]
+                self._names.pop(norm, None)
+
+
+class PrefetchService:
+    """
+    Keeps upstream data for the most requested countries warm. Every `interval`
+    seconds it runs each job for the top-N countries inside cache.refreshing(), so
+    only entries that would expire before the next cycle are re-fetched. Jobs for
+    different upstreams run concurrently. The jobs are ordinary service calls, so
+    they still take tokens from the shared rate limiter like user requests do;
+    this service's own token buckets only cap how fast warming runs, which keeps
+    it to a small share of each upstream's budget. Until enough countries have
+    been requested, the list is topped up from `seed` (e.g. the most populous countries).
+    """
+
+    def __init__(self, cache: ResponseCache, jobs: Optional[List[PrefetchJob]] = None,
+                 tracker: Optional[PopularityTracker] = None, seed: Optional[Callable[[int], List[str]]] = None,
+                 interval: Optional[float] = None, top_n: Optional[int] = None,
+                 rate: Optional[float] = None, startup_delay: Optional[float] = None):
+        self.cache = cache
+        self.jobs: Dict[str, PrefetchJob] = {job.name: job for job in jobs or []}
+        self.tracker = tracker or PopularityTracker()
+        self.seed = seed
+        self.interval = config.PREFETCH_INTERVAL if interval is None else interval
+        self.top_n = config.PREFETCH_TOP_N if top_n is None else top_n
+        self.startup_delay = config.PREFETCH_STARTUP_DELAY if startup_delay is None else startup_delay
+        self.rate = config.PREFETCH_RATE if rate is None else rate
+        self.rate_limiter = RateLimiterRegistry(
+            {job.upstream: {"rate": self.rate, "capacity": 1.0} for job in self.jobs.values()}
+        )
+        self.cycles = 0
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_countries: List[str] = []
+        self._job_stats: Dict[str, Dict[str, Any]] = {
+            name: {"warmed": 0, "failed": 0, "last_error": None} for name in self.jobs
+        }
+
+    def register(self, job: PrefetchJob) -> None:
+        self.jobs[job.name] = job
+        self.rate_limiter.rates.setdefault(job.upstream, {"rate": self.rate, "capacity": 1.0})
+        self._job_stats.setdefault(job.name, {"warmed": 0, "failed": 0, "last_error": None})
+
+    def record(self, name: str) -> None:
+        self.tracker.record(name)
+
+    def countries(self) -> List[str]:
+        countries = self.tracker.top(self.top_n)
+        if len(countries) < self.top_n and self.seed is not None:
+            known = {normalize_name(name) for name in countries}
+            try:
+                for name in self.seed(self.top_n):
+                    if len(countries) >= self.top_n:
+                        break
+                    if normalize_name(name) not in known:
+                        countries.append(name)
+                        known.add(normalize_name(name))
+            except Exception as e:
+                logger.warning(f"Could not seed prefetch countries: {str(e)}")
+        return countries
+
+    async def _run_job(self, job: PrefetchJob, countries: List[str]) -> None:
+        stats = self._job_stats[job.name]
+        for country in countries:
+            await self.rate_limiter.acquire(job.upstream)
+            try:
+                with refreshing(self.interval * 1.5):
+                    await job.warm(country)
+                stats["warmed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats["failed"] += 1
+                stats["last_error"] = f"{country}: {getattr(e, 'detail', None) or str(e)}"
+                logger.warning(f"Prefetch {job.name} failed for {country}: {stats['last_error']}")
+
+    async def run_cycle(self) -> None:
+        started = time.monotonic()
+        countries = self.countries()
+        self.last_countries = countries
+        if countries and self.jobs:
+            await asyncio.gather(*(self._run_job(job, countries) for job in self.jobs.values()))
+        self.tracker.decay_counts()
+        self.cycles += 1
+        self.last_run = time.time()
+        self.last_duration = round(time.monotonic() - started, 2)
+        logger.info(f"Prefetch cycle {self.cycles} warmed {len(countries)} countries in {self.last_duration}s")
+
+    async def run(self) -> None:
+        """Background loop started from the app lifespan."""
+        await asyncio.sleep(self.startup_delay)
+        while True:
+            try:
+                await self.run_cycle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Prefetch cycle failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "top_n": self.top_n,
+            "cycles": self.cycles,
+            "last_run_age_seconds": round(time.time() - self.last_run, 1) if self.last_run else None,
+            "last_duration_seconds": self.last_duration,
+            "countries": self.last_countries,
+            "popularity": self.tracker.counts(self.top_n),
+            "jobs": {name: dict(stats) for name, stats in self._job_stats.items()},
+            "rate_limits": self.rate_limiter.stats(),
+            "warm_share": self.cache.warm_share(),
+        }
+
+
+class PopularityMiddleware:
+    """
+    ASGI middleware feeding successful GETs of /countries/{name}/... routes into
+    the prefetcher's request counts. Pure ASGI so streamed responses pass through untouched.
+    """
+
+    def __init__(self, app, record: Callable[[str], None]):
+        self.app = app
+        self.record = record
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        status: Dict[str, int] = {}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_with_status)
+        # The router has filled in path_params by the time the response starts
+        name = scope.get("path_params", {}).get("name")
+        if name and status.get("code", 500) < 400:
+            self.record(name)
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+from app import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Counters outlive their period a little so usage can still be read right after a reset
+_EXPIRY_MARGIN = 86400
+
+
+def period_window(period: str, now: Optional[datetime] = None) -> Tuple[str, float]:
+    """Label of the current UTC day or month and the seconds until it ends."""
+    now = now or datetime.now(timezone.utc)
+    if period == "day":
+        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end, label = start + timedelta(days=1), start.strftime("%Y-%m-%d")
+    elif period == "month":
+        start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (start + timedelta(days=32)).replace(day=1)
+        label = start.strftime("%Y-%m")
+    else:
+        raise ValueError(f"Unknown quota period: {period}")
+    return label, (end - now).total_seconds()
+
+
+class QuotaBackend:
+    """Counters that are checked and incremented together, so no budget is overspent."""
+
+    async def consume(self, keys: List[str], limits: List[int], ttls: List[float], amount: int) -> bool:
+        """Add `amount` to every counter if none would pass its limit; False leaves them untouched."""
+        raise NotImplementedError
+
+    async def refund(self, keys: List[str], amount: int) -> None:
+        raise NotImplementedError
+
+    async def usage(self, keys: List[str]) -> List[int]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryQuotaBackend(QuotaBackend):
+    """Per-process counters; each worker then holds its own budget."""
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+
+    async def consume(self, keys: List[str], limits: List[int], ttls: List[float], amount: int) -> bool:
+        if any(self._counts.get(key, 0) + amount > limit for key, limit in zip(keys, limits)):
+            return False
+        for key in keys:
+            self._counts[key] = self._counts.get(key, 0) + amount
+        return True
+
+    async def refund(self, keys: List[str], amount: int) -> None:
+        for key in keys:
+            self._counts[key] = max(0, self._counts.get(key, 0) - amount)
+
+    async def usage(self, keys: List[str]) -> List[int]:
+        return [self._counts.get(key, 0) for key in keys]
+
+
+class RedisQuotaBackend(QuotaBackend):
+    """Counters in Redis shared by every worker; check-and-increment runs as one script."""
+
+    _CONSUME_SCRIPT = """
+        local amount = tonumber(ARGV[1])
+        for i, key in ipairs(KEYS) do
+            if tonumber(redis.call("get", key) or "0") + amount > tonumber(ARGV[i + 1]) then
+                return 0
+            end
+        end
+        for i, key in ipairs(KEYS) do
+            redis.call("incrby", key, amount)
+            redis.call("pexpire", key, ARGV[i + 1 + #KEYS])
+        end
+        return 1
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+        self.redis = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def consume(self, keys: List[str], limits: List[int], ttls: List[float], amount: int) -> bool:
+        args = [amount, *limits, *(max(1, int(ttl * 1000)) for ttl in ttls)]
+        return bool(await self.redis.eval(self._CONSUME_SCRIPT, len(keys), *keys, *args))
+
+    async def refund(self, keys: List[str], amount: int) -> None:
+        for key in keys:
+            await self.redis.decrby(key, amount)
+
+    async def usage(self, keys: List[str]) -> List[int]:
+        return [int(value or 0) for value in await self.redis.mget(keys)]
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class QuotaManager:
+    """
+    Daily and monthly request budgets per upstream, counted in UTC calendar periods.
+
+    With Redis the budget is global across workers and survives restarts. If Redis
+    cannot be reached, calls fall back to in-process counters rather than failing
+    the request, so the budget is then enforced per worker until Redis is back.
+    """
+
+    def __init__(self, backend: Optional[QuotaBackend] = None,
+                 budgets: Optional[Dict[str, Dict[str, int]]] = None, prefix: str = "country-api:quota"):
+        self.backend = backend or MemoryQuotaBackend()
+        self.fallback = self.backend if isinstance(self.backend, MemoryQuotaBackend) else MemoryQuotaBackend()
+        self.budgets = budgets if budgets is not None else {
+            "x_api": {"day": config.X_DAILY_QUOTA, "month": config.X_MONTHLY_QUOTA}
+        }
+        self.prefix = prefix
+        self.fallbacks = 0
+
+    def _windows(self, upstream: str) -> List[Tuple[str, str, int, float]]:
+        windows = []
+        for period, limit in self.budgets.get(upstream, {}).items():
+            label, remaining = period_window(period)
+            windows.append((period, f"{self.prefix}:{upstream}:{period}:{label}", limit, remaining + _EXPIRY_MARGIN))
+        return windows
+
+    async def _call(self, method: str, *args):
+        try:
+            return await getattr(self.backend, method)(*args)
+        except Exception as e:
+            self.fallbacks += 1
+            logger.warning(f"Quota backend {method} failed, using in-process counters: {str(e)}")
+            return await getattr(self.fallback, method)(*args)
+
+    async def try_acquire(self, upstream: str, amount: int = 1) -> bool:
+        """Spend `amount` from every budget of the upstream, or nothing if any is exhausted."""
+        windows = self._windows(upstream)
+        if not windows:
+            return True
+        return await self._call("consume", [w[1] for w in windows], [w[2] for w in windows],
+                                [w[3] for w in windows], amount)
+
+    async def refund(self, upstream: str, amount: int = 1) -> None:
+        """Give back units spent on a call that never reached the upstream."""
+        windows = self._windows(upstream)
+        if windows:
+            await self._call("refund", [w[1] for w in windows], amount)
+
+    async def usage(self, upstream: str) -> Dict[str, Dict[str, Any]]:
+        windows = self._windows(upstream)
+        used = await self._call("usage", [w[1] for w in windows]) if windows else []
+        return {
+            period: {"used": count, "limit": limit, "resets_in_seconds": round(ttl - _EXPIRY_MARGIN)}
+            for (period, _, limit, ttl), count in zip(windows, used)
+        }
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def create_quota_manager() -> QuotaManager:
+    """Use Redis when REDIS_URL is configured, otherwise in-process counters."""
+    if config.REDIS_URL:
+        try:
+            logger.info("Using Redis quota counters")
+            return QuotaManager(RedisQuotaBackend(config.REDIS_URL))
+        except Exception as e:
+            logger.error(f"Could not initialise Redis quota counters, falling back to memory: {str(e)}")
+    return QuotaManager(MemoryQuotaBackend())
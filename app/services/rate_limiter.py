@@ -0,0 +1,96 @@
+from typing import Dict, Any, Optional
+import asyncio
+import logging
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Requests per second and burst size for upstreams with published usage limits
+DEFAULT_RATES: Dict[str, Dict[str, float]] = {
+    "nominatim": {"rate": 1.0, "capacity": 1.0},
+    "opentripmap": {"rate": 1.0, "capacity": 1.0},
+    "x_api": {"rate": 1.0, "capacity": 1.0},
+}
+
+
+class TokenBucket:
+    """
+    asyncio-native token bucket. Waiters are served in FIFO order and sleep with
+    asyncio.sleep, so a throttled caller never blocks the event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until `tokens` are available and take them. Returns the time spent waiting."""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                if self._tokens < tokens:
+                    self.throttled += 1
+                    await asyncio.sleep((tokens - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= tokens
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "queue_depth": self.waiting,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+class RateLimiterRegistry:
+    """Holds one token bucket per upstream so throttling one API never delays another."""
+
+    def __init__(self, rates: Optional[Dict[str, Dict[str, float]]] = None):
+        self.rates = dict(DEFAULT_RATES if rates is None else rates)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, upstream: str) -> TokenBucket:
+        bucket = self._buckets.get(upstream)
+        if bucket is None:
+            cfg = self.rates.get(upstream, {"rate": 1.0, "capacity": 1.0})
+            bucket = TokenBucket(cfg["rate"], cfg.get("capacity", 1.0))
+            self._buckets[upstream] = bucket
+        return bucket
+
+    async def acquire(self, upstream: str, tokens: float = 1.0) -> float:
+        waited = await self.bucket(upstream).acquire(tokens)
+        if waited > 0.5:
+            logger.info(f"Throttled {upstream} request for {waited:.2f}s")
+        return waited
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {upstream: bucket.stats() for upstream, bucket in self._buckets.items()}
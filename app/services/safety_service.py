@@ -1,45 +1,224 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass, field
+import asyncio
+import io
+import re
+import time
+import xml.etree.ElementTree as ElementTree
 import httpx
+from starlette.concurrency import run_in_threadpool
+from app import config
+from app.services.http_client import HttpClientManager
+from app.services.boundaries import BoundaryStore, fold_name, shared_boundary_store
 from fastapi import HTTPException
 import logging
-import xmltodict
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "Mexico - Level 2: Exercise Increased Caution"
+_TITLE = re.compile(r"^(?P<country>.+?)\s+-\s+Level\s+(?P<level>[1-4])\b", re.IGNORECASE)
+_LEVEL = re.compile(r"Level\s+([1-4])\b", re.IGNORECASE)
+# "Burma (Myanmar)" -> "Burma", "Myanmar"; "Israel, the West Bank and Gaza" -> "Israel"
+_PARENTHETICAL = re.compile(r"\s*\(([^)]*)\)")
+_SHORT_FORM = re.compile(r",| and ")
+
+
+@dataclass
+class AdvisorySnapshot:
+    advisories: Dict[str, Dict[str, Any]]     # folded country name, alias or ISO code -> advisory
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = field(default_factory=time.time)
+
+    @property
+    def size(self) -> int:
+        """Advisories indexed, not counting alias keys."""
+        return len({id(advisory) for advisory in self.advisories.values()})
+
+
+def advisory_aliases(country: str, boundaries: Optional[BoundaryStore] = None) -> List[str]:
+    """
+    Extra keys for a feed name: the name without its parenthetical, the
+    parenthetical itself, the part before a comma or "and", and the ISO codes of
+    the Natural Earth country it resolves to.
+    """
+    inner = _PARENTHETICAL.findall(country)
+    bare = _PARENTHETICAL.sub("", country).strip()
+    names = [bare, *inner, _SHORT_FORM.split(bare)[0]]
+    aliases = [fold_name(name) for name in names if name.strip()]
+    if boundaries is not None:
+        for name in [country, *names]:
+            boundary = boundaries.lookup(name) if name.strip() else None
+            if boundary is not None:
+                aliases.extend(code.lower() for code in (boundary.iso_a2, boundary.iso_a3) if code)
+                break
+    return aliases
+
+
+def parse_advisories(feed: bytes, boundaries: Optional[BoundaryStore] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Stream the TAs.xml RSS feed item by item, keyed by folded country name and
+    then by advisory_aliases, so every lookup is one dict hit. A full name always
+    wins over another country's alias. Elements are cleared as soon as their item is read.
+    """
+    advisories: Dict[str, Dict[str, Any]] = {}
+    item: Optional[Dict[str, Any]] = None
+    for event, elem in ElementTree.iterparse(io.BytesIO(feed), events=("start", "end")):
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            if tag == "item":
+                item = {"categories": []}
+            continue
+        if item is None:
+            continue
+        if tag == "item":
+            advisory = _advisory(item)
+            if advisory:
+                advisories.setdefault(fold_name(advisory["country"]), advisory)
+            item = None
+            elem.clear()
+        elif tag == "category":
+            item["categories"].append((elem.get("domain") or "", (elem.text or "").strip()))
+        elif tag in ("title", "description", "pubDate", "link"):
+            item[tag] = (elem.text or "").strip()
+    for advisory in list(advisories.values()):
+        for alias in advisory_aliases(advisory["country"], boundaries):
+            advisories.setdefault(alias, advisory)
+    return advisories
+
+
+def _advisory(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    title = item.get("title", "")
+    if not title:
+        return None
+    match = _TITLE.match(title)
+    country = match.group("country") if match else title.split(" - ")[0]
+    level = int(match.group("level")) if match else None
+    for domain, text in item["categories"]:
+        if domain.lower() == "threat-level" and _LEVEL.search(text):
+            level = int(_LEVEL.search(text).group(1))
+    return {
+        "country": country.strip(),
+        "title": title,
+        "level": level,
+        "message": item.get("description", ""),
+        "updated": item.get("pubDate", "N/A"),
+        "link": item.get("link"),
+    }
+
+
 class SafetyService:
-    def __init__(self):
+    """
+    Travel advisories answered from an in-memory index of the State Department
+    feed. The feed is refreshed in the background with conditional GETs; if a
+    refresh fails the last good snapshot keeps being served.
+    """
+
+    def __init__(self, http_clients: Optional[HttpClientManager] = None,
+                 refresh_interval: Optional[float] = None,
+                 boundaries: Optional[BoundaryStore] = None):
+        self.http = http_clients or HttpClientManager()
+        self.boundaries = boundaries or shared_boundary_store()
         self.travel_advisory_url = "https://travel.state.gov/_res/rss/TAs.xml"
+        self.refresh_interval = config.SAFETY_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.snapshot: Optional[AdvisorySnapshot] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._stats = {"refreshes": 0, "not_modified": 0, "refresh_errors": 0}
 
-    async def get_safety(self, country: str) -> Dict[str, Any]:
-        normalized_country = country.title()
-        logger.info(f"Fetching safety advisories for {normalized_country}")
-        async with httpx.AsyncClient() as client:
+    async def refresh(self) -> Optional[AdvisorySnapshot]:
+        """Refresh the index, sharing a refresh already in flight."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._refresh())
+        return await asyncio.shield(self._refreshing)
+
+    async def _refresh(self) -> Optional[AdvisorySnapshot]:
+        headers = {}
+        if self.snapshot is not None:
+            if self.snapshot.etag:
+                headers["If-None-Match"] = self.snapshot.etag
+            if self.snapshot.last_modified:
+                headers["If-Modified-Since"] = self.snapshot.last_modified
+        try:
+            response = await self.http.client("travel_advisory").get(self.travel_advisory_url, headers=headers)
+            if response.status_code == 304 and self.snapshot is not None:
+                self.snapshot.fetched_at = time.time()
+                self._stats["not_modified"] += 1
+                return self.snapshot
+            response.raise_for_status()
+            advisories = await run_in_threadpool(parse_advisories, response.content, self.boundaries)
+            if not advisories and self.snapshot is not None:
+                raise ValueError("feed contained no advisories")
+            self.snapshot = AdvisorySnapshot(
+                advisories,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+            )
+            self._stats["refreshes"] += 1
+            logger.info(f"Indexed {self.snapshot.size} travel advisories")
+        except Exception as e:
+            self._stats["refresh_errors"] += 1
+            if self.snapshot is None:
+                raise
+            logger.warning(f"Travel advisory refresh failed, serving last good snapshot: {str(e)}")
+        return self.snapshot
+
+    async def run_refresher(self) -> None:
+        """Background loop started from the app lifespan."""
+        while True:
             try:
-                response = await client.get(self.travel_advisory_url)
-                response.raise_for_status()
-                data = xmltodict.parse(response.text)
-                advisories = data["rss"]["channel"]["item"]
-                for advisory in advisories:
-                    if advisory["title"].lower().startswith(normalized_country.lower()):
-                        result = {
-                            "country": country,
-                            "advisory": {
-                                "message": advisory["description"],
-                                "score": None,  # State Dept uses levels (1-4), not scores
-                                "updated": advisory["pubDate"]
-                            }
-                        }
-                        logger.info(f"Returning safety advisory for {country}")
-                        return result
-                logger.error(f"Country not found: {normalized_country}")
-                raise HTTPException(status_code=404, detail=f"Safety data not found for {normalized_country}")
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Travel-Advisory error: {e.response.status_code} - {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Travel-Advisory error: {e.response.text}")
-            except httpx.HTTPError as e:
-                logger.error(f"Network error: {str(e)}")
-                raise HTTPException(status_code=502, detail=f"Error connecting to Travel-Advisory: {str(e)}")
+                await self.refresh()
             except Exception as e:
-                logger.error(f"Unexpected error: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Error fetching safety advisories: {str(e)}")
\ No newline at end of file
+                logger.error(f"Travel advisory refresh failed: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def _lookup(self, country: str) -> Optional[Dict[str, Any]]:
+        advisories = self.snapshot.advisories
+        advisory = advisories.get(fold_name(country))
+        if advisory is None:
+            # Other Natural Earth names and aliases ("Ivory Coast", "USA") reach the feed through the ISO code
+            boundary = self.boundaries.lookup(country)
+            if boundary is not None and boundary.iso_a3:
+                advisory = advisories.get(boundary.iso_a3.lower())
+        return advisory
+
+    async def get_safety(self, country: str) -> Dict[str, Any]:
+        if not country or not country.strip():
+            raise HTTPException(status_code=400, detail="Country name must not be empty")
+        logger.info(f"Fetching safety advisories for {country}")
+        try:
+            if self.snapshot is None:
+                await self.refresh()
+            advisory = self._lookup(country)
+            if advisory is None:
+                logger.error(f"Country not found: {country}")
+                raise HTTPException(status_code=404, detail=f"Safety data not found for {country.title()}")
+            return {
+                "country": country,
+                "advisory": {
+                    "message": advisory["message"],
+                    "score": None,  # State Dept uses levels (1-4), not scores
+                    "level": advisory["level"],
+                    "updated": advisory["updated"]
+                }
+            }
+        except HTTPException:
+            raise
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Travel-Advisory error: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"Travel-Advisory error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Network error: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Error connecting to Travel-Advisory: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error fetching safety advisories: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "size": snapshot.size if snapshot else 0,
+            "keys": len(snapshot.advisories) if snapshot else 0,
+            "age_seconds": round(time.time() - snapshot.fetched_at, 1) if snapshot else None,
+            **self._stats,
+        }
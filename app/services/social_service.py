@@ -1,5 +1,9 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import httpx
+from app.services.http_client import HttpClientManager
+from app.services.rate_limiter import RateLimiterRegistry
+from app.services.cache import ResponseCache, make_key
+from app.services.quota import QuotaManager
 from fastapi import HTTPException
 import logging
 import os
@@ -10,84 +14,113 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SocialService:
-    def __init__(self):
+    """
+    Recent X posts about a country. The X API budget is tiny, so every call is
+    paid for out of a global daily/monthly quota and each country's posts are
+    cached: fresh for SOCIAL_CACHE_TTL, then served as they are while a refresh
+    is attempted, for up to SOCIAL_STALE_TTL. Only a country with nothing cached
+    gets a 429 once the quota is spent.
+    """
+
+    def __init__(self, http_clients: Optional[HttpClientManager] = None,
+                 rate_limiter: Optional[RateLimiterRegistry] = None,
+                 cache: Optional[ResponseCache] = None,
+                 quota: Optional[QuotaManager] = None):
+        self.http = http_clients or HttpClientManager()
+        self.rate_limiter = rate_limiter or RateLimiterRegistry()
+        self.cache = cache or ResponseCache()
+        self.quota = quota or QuotaManager()
         self.x_api_base_url = "https://api.twitter.com/2"
         self.x_bearer_token = os.getenv("X_BEARER_TOKEN")
         if not self.x_bearer_token or self.x_bearer_token.strip() == "":
             logger.error("X_BEARER_TOKEN not set or empty in environment variables")
             raise HTTPException(status_code=500, detail="X API token not configured")
-        # Request tracking
-        self.request_count = 0
-        self.last_reset = time.time()
-        self.max_requests_per_day = 4  # ~100 requests/month / 30 days
-        self.requests_per_second = 1  # Avoid bursts
+        self._stats = {"upstream_calls": 0, "quota_rejections": 0, "refunds": 0}
 
-    async def get_social_posts(self, country: str) -> Dict[str, Any]:
-        """
-        Fetch recent posts from X about the country, excluding retweets and duplicates.
-        """
-        # Reset request count daily
-        if time.time() - self.last_reset > 24 * 60 * 60:  # 24 hours
-            self.request_count = 0
-            self.last_reset = time.time()
-            logger.info("Reset daily request count")
+    async def _fetch_posts(self, normalized_country: str) -> Dict[str, Any]:
+        if not await self.quota.try_acquire("x_api"):
+            self._stats["quota_rejections"] += 1
+            logger.error("X API quota exhausted")
+            raise HTTPException(status_code=429, detail="X API request quota exhausted. Try again later.")
 
-        # Check rate limit
-        if self.request_count >= self.max_requests_per_day:
-            logger.error("Daily X API request limit reached")
-            raise HTTPException(status_code=429, detail="Daily X API request limit reached. Try again tomorrow.")
-
-        # Use title case for consistency with currency_service
-        normalized_country = country.title()
         query = f"{normalized_country} (travel OR tourism OR weather) -is:retweet"
-        logger.info(f"Fetching X posts for query: {query} (Request {self.request_count + 1}/{self.max_requests_per_day})")
+        logger.info(f"Fetching X posts for query: {query}")
         headers = {"Authorization": f"Bearer {self.x_bearer_token}"}
         params = {
             "query": query,
             "max_results": 10,
             "tweet.fields": "created_at,author_id"
         }
-        async with httpx.AsyncClient() as client:
-            try:
-                # Throttle requests
-                time.sleep(1.0 / self.requests_per_second)
-                response = await client.get(
-                    f"{self.x_api_base_url}/tweets/search/recent",
-                    headers=headers,
-                    params=params
-                )
-                response.raise_for_status()
-                self.request_count += 1
-                data = response.json()
-                if "data" not in data:
-                    logger.error(f"X API error for {country}: {data}")
-                    raise HTTPException(status_code=500, detail=f"X API error: {data.get('detail', 'No data returned')}")
-                
-                # Deduplicate posts by text content
-                seen_texts = set()
-                posts: List[Dict[str, Any]] = []
-                for tweet in data["data"]:
-                    text = tweet["text"]
-                    if text not in seen_texts:
-                        seen_texts.add(text)
-                        posts.append({
-                            "id": tweet["id"],
-                            "text": text,
-                            "created_at": tweet["created_at"],
-                            "author_id": tweet["author_id"]
-                        })
-                
-                logger.info(f"Returning {len(posts)} unique posts for {country}")
-                return {"country": country, "posts": posts}
-            except httpx.HTTPStatusError as e:
-                logger.error(f"X API error: {e.response.status_code} - {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"X API error: {e.response.text}")
-            except httpx.HTTPError as e:
-                logger.error(f"Network error connecting to X API: {str(e)}")
-                raise HTTPException(status_code=502, detail=f"Error connecting to X API: {str(e)}")
-            except ValueError as e:
-                logger.error(f"Invalid header or configuration: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Invalid X API configuration: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error fetching X posts: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Error fetching X posts: {str(e)}")
\ No newline at end of file
+        client = self.http.client("x_api")
+        try:
+            # Throttle requests to avoid bursts
+            await self.rate_limiter.acquire("x_api")
+            response = await client.get(
+                f"{self.x_api_base_url}/tweets/search/recent",
+                headers=headers,
+                params=params
+            )
+        except Exception:
+            # No response came back from X, so the call did not cost any quota
+            self._stats["refunds"] += 1
+            await self.quota.refund("x_api")
+            raise
+        self._stats["upstream_calls"] += 1
+        response.raise_for_status()
+        data = response.json()
+        if "data" not in data and "errors" in data:
+            logger.error(f"X API error for {normalized_country}: {data}")
+            raise HTTPException(status_code=500, detail=f"X API error: {data.get('detail', 'No data returned')}")
+
+        # Deduplicate posts by text content; no matches is a valid answer worth caching too
+        seen_texts = set()
+        posts: List[Dict[str, Any]] = []
+        for tweet in data.get("data", []):
+            text = tweet["text"]
+            if text not in seen_texts:
+                seen_texts.add(text)
+                posts.append({
+                    "id": tweet["id"],
+                    "text": text,
+                    "created_at": tweet["created_at"],
+                    "author_id": tweet["author_id"]
+                })
+        return {"posts": posts, "fetched_at": time.time()}
+
+    async def get_social_posts(self, country: str) -> Dict[str, Any]:
+        """
+        Fetch recent posts from X about the country, excluding retweets and duplicates.
+        """
+        # Use title case for consistency with currency_service
+        normalized_country = country.title()
+        try:
+            cached = await self.cache.get_or_fetch("x_api", make_key(normalized_country),
+                                                   lambda: self._fetch_posts(normalized_country))
+            posts = cached["posts"]
+            logger.info(f"Returning {len(posts)} unique posts for {country}")
+            return {
+                "country": country,
+                "posts": posts,
+                "fetched_at": cached["fetched_at"],
+                "age_seconds": round(time.time() - cached["fetched_at"]),
+            }
+        except HTTPException:
+            raise
+        except httpx.HTTPStatusError as e:
+            logger.error(f"X API error: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"X API error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Network error connecting to X API: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Error connecting to X API: {str(e)}")
+        except ValueError as e:
+            logger.error(f"Invalid header or configuration: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Invalid X API configuration: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error fetching X posts: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error fetching X posts: {str(e)}")
+
+    async def quota_usage(self) -> Dict[str, Any]:
+        return {**await self.quota.usage("x_api"), "backend_fallbacks": self.quota.fallbacks}
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
@@ -0,0 +1,74 @@
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+# WMO weather interpretation codes as reported by Open-Meteo, one label per language
+LANGUAGES = ("en", "fr", "es", "de", "pt")
+_LABELS = {
+    0: ("Clear sky", "Ciel dégagé", "Cielo despejado", "Klarer Himmel", "Céu limpo"),
+    1: ("Mainly clear", "Principalement dégagé", "Mayormente despejado", "Überwiegend klar", "Predominantemente limpo"),
+    2: ("Partly cloudy", "Partiellement nuageux", "Parcialmente nublado", "Teilweise bewölkt", "Parcialmente nublado"),
+    3: ("Overcast", "Couvert", "Cubierto", "Bedeckt", "Encoberto"),
+    45: ("Fog", "Brouillard", "Niebla", "Nebel", "Nevoeiro"),
+    48: ("Depositing rime fog", "Brouillard givrant", "Niebla con escarcha", "Nebel mit Reifbildung", "Nevoeiro com geada"),
+    51: ("Light drizzle", "Bruine légère", "Llovizna ligera", "Leichter Nieselregen", "Chuvisco fraco"),
+    53: ("Moderate drizzle", "Bruine modérée", "Llovizna moderada", "Mäßiger Nieselregen", "Chuvisco moderado"),
+    55: ("Dense drizzle", "Bruine dense", "Llovizna densa", "Starker Nieselregen", "Chuvisco intenso"),
+    56: ("Light freezing drizzle", "Bruine verglaçante légère", "Llovizna helada ligera",
+         "Leichter gefrierender Nieselregen", "Chuvisco congelante fraco"),
+    57: ("Dense freezing drizzle", "Bruine verglaçante dense", "Llovizna helada densa",
+         "Starker gefrierender Nieselregen", "Chuvisco congelante intenso"),
+    61: ("Light rain", "Pluie faible", "Lluvia ligera", "Leichter Regen", "Chuva fraca"),
+    63: ("Moderate rain", "Pluie modérée", "Lluvia moderada", "Mäßiger Regen", "Chuva moderada"),
+    65: ("Heavy rain", "Forte pluie", "Lluvia intensa", "Starker Regen", "Chuva forte"),
+    66: ("Light freezing rain", "Pluie verglaçante faible", "Lluvia helada ligera",
+         "Leichter gefrierender Regen", "Chuva congelante fraca"),
+    67: ("Heavy freezing rain", "Forte pluie verglaçante", "Lluvia helada intensa",
+         "Starker gefrierender Regen", "Chuva congelante forte"),
+    71: ("Slight snow fall", "Faibles chutes de neige", "Nevada ligera", "Leichter Schneefall", "Neve fraca"),
+    73: ("Moderate snow fall", "Chutes de neige modérées", "Nevada moderada", "Mäßiger Schneefall", "Neve moderada"),
+    75: ("Heavy snow fall", "Fortes chutes de neige", "Nevada intensa", "Starker Schneefall", "Neve forte"),
+    77: ("Snow grains", "Neige en grains", "Granos de nieve", "Schneegriesel", "Grãos de neve"),
+    80: ("Showers", "Averses", "Chubascos", "Regenschauer", "Aguaceiros"),
+    81: ("Moderate showers", "Averses modérées", "Chubascos moderados", "Mäßige Regenschauer", "Aguaceiros moderados"),
+    82: ("Violent showers", "Averses violentes", "Chubascos violentos", "Heftige Regenschauer", "Aguaceiros violentos"),
+    85: ("Slight snow showers", "Faibles averses de neige", "Chubascos de nieve ligeros",
+         "Leichte Schneeschauer", "Aguaceiros de neve fracos"),
+    86: ("Heavy snow showers", "Fortes averses de neige", "Chubascos de nieve intensos",
+         "Starke Schneeschauer", "Aguaceiros de neve fortes"),
+    95: ("Thunderstorm", "Orage", "Tormenta", "Gewitter", "Trovoada"),
+    96: ("Thunderstorm with slight hail", "Orage avec grêle faible", "Tormenta con granizo ligero",
+         "Gewitter mit leichtem Hagel", "Trovoada com granizo fraco"),
+    99: ("Thunderstorm with heavy hail", "Orage avec forte grêle", "Tormenta con granizo fuerte",
+         "Gewitter mit starkem Hagel", "Trovoada com granizo forte"),
+}
+_UNKNOWN = ("Unknown code {}", "Code inconnu {}", "Código desconocido {}", "Unbekannter Code {}",
+            "Código desconhecido {}")
+
+# language -> code -> label, built once and read-only
+WEATHER_LABELS: Mapping[str, Mapping[int, str]] = MappingProxyType({
+    lang: MappingProxyType({code: labels[i] for code, labels in _LABELS.items()})
+    for i, lang in enumerate(LANGUAGES)
+})
+_UNKNOWN_LABELS: Mapping[str, str] = MappingProxyType(dict(zip(LANGUAGES, _UNKNOWN)))
+
+
+def _make_labeller(lang: str) -> Callable[[int], str]:
+    table, unknown = WEATHER_LABELS[lang], _UNKNOWN_LABELS[lang]
+
+    def label(code: int) -> str:
+        text = table.get(code)
+        return text if text is not None else unknown.format(code)
+
+    return label
+
+
+_LABELLERS: Mapping[str, Callable[[int], str]] = MappingProxyType({lang: _make_labeller(lang) for lang in LANGUAGES})
+
+
+def labeller(lang: str = "en") -> Callable[[int], str]:
+    """code -> label for one language; raises KeyError for unsupported languages."""
+    return _LABELLERS[lang]
+
+
+def weather_label(code: int, lang: str = "en") -> str:
+    return labeller(lang)(code)
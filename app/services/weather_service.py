@@ -1,138 +1,300 @@
-
-from typing import Dict, Any, Optional
+from itertools import islice
+from typing import Dict, Any, Optional, List, Tuple, Callable
+import asyncio
+import time
 import httpx
 from fastapi import HTTPException
 import logging
+from app import config
+from app.models.country import capital_coordinates
+from app.services.http_client import HttpClientManager
+from app.services.cache import ResponseCache, make_key
+from app.services.geocoder import Geocoder
+from app.services.weather_codes import LANGUAGES, labeller
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DAILY_VARIABLES = ["temperature_2m_max", "temperature_2m_min", "precipitation_probability_max", "weathercode"]
+FORECAST_DAYS = 7
+# Response key -> Open-Meteo daily array; "weather" is added from the weathercode labels
+DAILY_COLUMNS = {
+    "date": "time",
+    "max_temp": "temperature_2m_max",
+    "min_temp": "temperature_2m_min",
+    "precipitation_prob": "precipitation_probability_max",
+}
+DAILY_ROW_KEYS = (*DAILY_COLUMNS, "weather")
+RESPONSE_FORMATS = ("rows", "columnar")
+
+
+def daily_rows(daily: Dict[str, List[Any]], label: Callable[[int], str]) -> List[Dict[str, Any]]:
+    """Open-Meteo's parallel daily arrays as one dict per day, zipped column-wise."""
+    columns = zip(*(daily[source] for source in DAILY_COLUMNS.values()), map(label, daily["weathercode"]))
+    return [dict(zip(DAILY_ROW_KEYS, values)) for values in islice(columns, FORECAST_DAYS)]
+
+
+def daily_columns(daily: Dict[str, List[Any]], label: Callable[[int], str]) -> Dict[str, List[Any]]:
+    """Compact form: Open-Meteo's arrays passed through under the row keys, no per-day dicts."""
+    columns = {key: daily[source][:FORECAST_DAYS] for key, source in DAILY_COLUMNS.items()}
+    columns["weather"] = [label(code) for code in daily["weathercode"][:FORECAST_DAYS]]
+    return columns
+
+
+def grid_cell(lat: float, lon: float, size: float) -> Tuple[float, float]:
+    """Centre of the grid cell containing a point; every point in a cell shares one forecast."""
+    return round(round(lat / size) * size, 4), round(round(lon / size) * size, 4)
+
+
+def seconds_until_update(now: Optional[float] = None, lag: Optional[float] = None) -> float:
+    """Open-Meteo refreshes forecasts hourly; cached ones expire just after the next update."""
+    now = time.time() if now is None else now
+    lag = config.WEATHER_UPDATE_LAG if lag is None else lag
+    return 3600 - now % 3600 + lag
+
+
 class WeatherService:
-    def __init__(self):
+    """
+    Forecasts from Open-Meteo for a country's capital (or its label point when the
+    catalogue has no capital coordinates). Forecasts are cached per grid cell until
+    the next hourly model update, and a batch of countries is fetched with one
+    multi-location request for every cell not already cached.
+    """
+
+    def __init__(self, http_clients: Optional[HttpClientManager] = None,
+                 cache: Optional[ResponseCache] = None,
+                 geocoder: Optional[Geocoder] = None,
+                 country_model=None,
+                 grid_size: Optional[float] = None,
+                 batch_size: Optional[int] = None):
+        self.http = http_clients or HttpClientManager()
+        self.cache = cache or ResponseCache()
+        self.geocoder = geocoder or Geocoder(http_clients=self.http, cache=self.cache)
+        self.country_model = country_model
+        self.grid_size = config.WEATHER_GRID_SIZE if grid_size is None else grid_size
+        self.batch_size = config.WEATHER_BATCH_SIZE if batch_size is None else batch_size
         self.weather_base_url = "https://api.open-meteo.com/v1/forecast"
-        self.geocode_base_url = "https://nominatim.openstreetmap.org/search"
+        self._stats = {"cells_cached": 0, "cells_fetched": 0, "cells_coalesced": 0, "batch_requests": 0}
+        # Cells a batch is fetching right now, so concurrent batches wait instead of refetching
+        self._inflight: Dict[Tuple[float, float], asyncio.Future] = {}
 
-    async def get_weather(self, country: str) -> Dict[str, Any]:
+    async def locate(self, country: str) -> Tuple[Optional[Dict[str, float]], str]:
+        """(point, source): the capital from the catalogue, else the geocoder's label point."""
+        if self.country_model is not None:
+            try:
+                point = capital_coordinates(await self.country_model.find_by_name(country))
+                if point:
+                    return point, "capital"
+            except Exception as e:
+                logger.warning(f"Country lookup failed for {country}: {str(e)}")
+        return await self._get_coordinates(country), "centroid"
+
+    async def get_weather(self, country: str, coordinates: Optional[Dict[str, float]] = None,
+                          response_format: str = "rows", lang: str = "en") -> Dict[str, Any]:
         """
-        Fetch weather data for a country by first retrieving its coordinates from Nominatim.
+        Fetch weather data for a country by first resolving its coordinates.
+        Callers that already know them (the dossier) can pass {"lat", "lon"}.
         """
-        # Step 1: Fetch coordinates from Nominatim
-        logger.info(f"Fetching coordinates for {country}")
-        coordinates = await self._get_coordinates(country)
+        self._check_options(response_format, lang)
+        # Step 1: Resolve coordinates (capital from the catalogue, then the geocoder)
+        source = "given"
+        if coordinates is None:
+            logger.info(f"Fetching coordinates for {country}")
+            coordinates, source = await self.locate(country)
         if not coordinates:
             logger.error(f"No coordinates found for {country}")
             raise HTTPException(status_code=404, detail=f"No coordinates found for {country}")
 
         lat, lon = coordinates["lat"], coordinates["lon"]
-        logger.info(f"Using coordinates for {country}: lat={lat}, lon={lon}")
+        cell = grid_cell(lat, lon, self.grid_size)
+        logger.info(f"Using coordinates for {country}: lat={lat}, lon={lon} (cell {cell})")
+
+        # Step 2: Forecast for the grid cell, from the cache until the next hourly update
+        async def fetch():
+            self._stats["cells_fetched"] += 1
+            return (await self._fetch_cells([cell]))[0]
+
+        try:
+            data = await self.cache.get_or_fetch("weather", make_key(*cell), fetch, ttl=seconds_until_update())
+            return self._format(country, coordinates, source, cell, data, response_format, lang)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Open-Meteo API error for {country}: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"Open-Meteo API error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Network error connecting to Open-Meteo for {country}: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Error connecting to Open-Meteo API: {str(e)}")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error processing weather for {country}: {str(e)} (Type: {type(e).__name__})")
+            raise HTTPException(status_code=500, detail=f"Error processing weather data: {str(e)} (Type: {type(e).__name__})")
+
+    async def get_weather_batch(self, countries: List[str], response_format: str = "rows",
+                                lang: str = "en") -> Dict[str, Any]:
+        """
+        Forecasts for many countries: cached cells are reused and the rest are fetched
+        with one multi-location request per `batch_size` cells.
+        """
+        self._check_options(response_format, lang)
+        countries = list(dict.fromkeys(c.strip() for c in countries if c.strip()))
+        located = await asyncio.gather(*(self.locate(country) for country in countries), return_exceptions=True)
+
+        points: Dict[str, Tuple[Dict[str, float], str, Tuple[float, float]]] = {}
+        forecasts: Dict[str, Dict[str, Any]] = {}
+        for country, result in zip(countries, located):
+            point, source = (None, None) if isinstance(result, Exception) else result
+            if not point:
+                forecasts[country] = {"country": country, "error": f"No coordinates found for {country}"}
+                continue
+            points[country] = (point, source, grid_cell(point["lat"], point["lon"], self.grid_size))
 
-        # Step 2: Fetch weather from Open-Meteo
-        logger.info(f"Fetching weather from Open-Meteo for {country} at lat={lat}, lon={lon}")
+        cells = list(dict.fromkeys(cell for _, _, cell in points.values()))
+        cached = await asyncio.gather(*(self.cache.get_fresh("weather", make_key(*cell)) for cell in cells))
+        data: Dict[Tuple[float, float], Any] = {cell: value for cell, value in zip(cells, cached) if value is not None}
+        missing = [cell for cell in cells if cell not in data]
+        self._stats["cells_cached"] += len(data)
+
+        try:
+            fetched, upstream_calls = await self._fetch_missing(missing)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Open-Meteo API error for batch: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"Open-Meteo API error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Network error connecting to Open-Meteo for batch: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Error connecting to Open-Meteo API: {str(e)}")
+        data.update(fetched)
+
+        for country, (point, source, cell) in points.items():
+            try:
+                forecasts[country] = self._format(country, point, source, cell, data[cell], response_format, lang)
+            except Exception as e:
+                logger.error(f"Unexpected error processing weather for {country}: {str(e)}")
+                forecasts[country] = {"country": country, "error": f"Error processing weather data: {str(e)}"}
+        return {
+            "forecasts": [forecasts[country] for country in countries],
+            "cells": len(cells),
+            "upstream_calls": upstream_calls,
+        }
+
+    async def _fetch_missing(self, cells: List[Tuple[float, float]]) -> Tuple[Dict[Tuple[float, float], Any], int]:
+        """
+        Fetch the cells no other batch is fetching, `batch_size` per request, and wait
+        for the rest. Returns the forecasts and the number of upstream requests made.
+        """
+        loop = asyncio.get_running_loop()
+        joined = {cell: self._inflight[cell] for cell in cells if cell in self._inflight}
+        owned = [cell for cell in cells if cell not in joined]
+        futures = {cell: loop.create_future() for cell in owned}
+        self._inflight.update(futures)
+        data: Dict[Tuple[float, float], Any] = {}
+        upstream_calls = 0
+        try:
+            for i in range(0, len(owned), self.batch_size):
+                chunk = owned[i:i + self.batch_size]
+                results = await self._fetch_cells(chunk)
+                upstream_calls += 1
+                ttl = seconds_until_update()
+                for cell, value in zip(chunk, results):
+                    data[cell] = value
+                    futures[cell].set_result(value)
+                    await self.cache.set("weather", make_key(*cell), value, ttl=ttl)
+        except BaseException as e:
+            error = e if isinstance(e, Exception) else HTTPException(status_code=503, detail="Weather fetch cancelled")
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(error)
+                    # Only batches that joined this cell need the error; don't log it as unretrieved
+                    future.exception()
+            raise
+        finally:
+            for cell in owned:
+                self._inflight.pop(cell, None)
+            self._stats["cells_fetched"] += len(data)
+            self._stats["batch_requests"] += upstream_calls
+
+        for cell, future in joined.items():
+            data[cell] = await asyncio.shield(future)
+        self._stats["cells_coalesced"] += len(joined)
+        return data, upstream_calls
+
+    @staticmethod
+    def _check_options(response_format: str, lang: str) -> None:
+        if response_format not in RESPONSE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format {response_format}. "
+                                                        f"Available: {', '.join(RESPONSE_FORMATS)}")
+        if lang not in LANGUAGES:
+            raise HTTPException(status_code=400, detail=f"Unsupported language {lang}. "
+                                                        f"Available: {', '.join(LANGUAGES)}")
+
+    async def _fetch_cells(self, cells: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+        """One Open-Meteo request for several points; results come back in request order."""
         params = {
-            "latitude": lat,
-            "longitude": lon,
+            "latitude": ",".join(str(lat) for lat, _ in cells),
+            "longitude": ",".join(str(lon) for _, lon in cells),
             "current_weather": True,
-            "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_probability_max", "weathercode"],
+            "daily": DAILY_VARIABLES,
             "timezone": "auto"
         }
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(self.weather_base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                if "current_weather" not in data or "daily" not in data:
-                    logger.error(f"Invalid Open-Meteo response for {country}: {data}")
-                    raise HTTPException(status_code=500, detail="Invalid Open-Meteo response format")
-
-                result = {
-                    "country": country,
-                    "coordinates": {"lat": lat, "lon": lon},
-                    "current": {
-                        "temperature": data["current_weather"].get("temperature", "N/A"),
-                        "weather": self._weather_code_to_text(data["current_weather"].get("weathercode", 0)),
-                        "wind_speed": data["current_weather"].get("windspeed", "N/A")
-                    },
-                    "daily": [
-                        {
-                            "date": data["daily"]["time"][i],
-                            "max_temp": data["daily"]["temperature_2m_max"][i],
-                            "min_temp": data["daily"]["temperature_2m_min"][i],
-                            "precipitation_prob": data["daily"]["precipitation_probability_max"][i],
-                            "weather": self._weather_code_to_text(data["daily"]["weathercode"][i])
-                        }
-                        for i in range(min(7, len(data["daily"]["time"])))
-                    ]
-                }
-                return result
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Open-Meteo API error for {country}: {e.response.status_code} - {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Open-Meteo API error: {e.response.text}")
-            except httpx.HTTPError as e:
-                logger.error(f"Network error connecting to Open-Meteo for {country}: {str(e)}")
-                raise HTTPException(status_code=502, detail=f"Error connecting to Open-Meteo API: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error processing weather for {country}: {str(e)} (Type: {type(e).__name__})")
-                raise HTTPException(status_code=500, detail=f"Error processing weather data: {str(e)} (Type: {type(e).__name__})")
+        logger.info(f"Fetching weather from Open-Meteo for {len(cells)} location(s)")
+        response = await self.http.client("open_meteo").get(self.weather_base_url, params=params)
+        response.raise_for_status()
+        data = response.json()
+        # A single location comes back as an object, several as a list
+        results = data if isinstance(data, list) else [data]
+        if len(results) != len(cells):
+            logger.error(f"Open-Meteo returned {len(results)} forecasts for {len(cells)} locations")
+            raise HTTPException(status_code=502, detail=f"Open-Meteo returned {len(results)} forecasts "
+                                                        f"for {len(cells)} locations")
+        if any("current_weather" not in result or "daily" not in result for result in results):
+            logger.error(f"Invalid Open-Meteo response: {data}")
+            raise HTTPException(status_code=500, detail="Invalid Open-Meteo response format")
+        return results
+
+    def _format(self, country: str, coordinates: Dict[str, float], source: str,
+                cell: Tuple[float, float], data: Dict[str, Any], response_format: str = "rows",
+                lang: str = "en") -> Dict[str, Any]:
+        label = labeller(lang)
+        current = data["current_weather"]
+        daily = data["daily"]
+        return {
+            "country": country,
+            "coordinates": {"lat": coordinates["lat"], "lon": coordinates["lon"]},
+            "location": source,
+            "grid_cell": {"lat": cell[0], "lon": cell[1]},
+            "current": {
+                "temperature": current.get("temperature", "N/A"),
+                "weather": label(current.get("weathercode", 0)),
+                "wind_speed": current.get("windspeed", "N/A")
+            },
+            "daily": daily_columns(daily, label) if response_format == "columnar" else daily_rows(daily, label),
+        }
+
+    def _weather_code_to_text(self, code: int, lang: str = "en") -> str:
+        return labeller(lang)(code)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"grid_size": self.grid_size, **self._stats}
 
     async def _get_coordinates(self, country: str) -> Optional[Dict[str, float]]:
         """
-        Fetch coordinates for a country using Nominatim API.
+        Coordinates for a country from the offline geocoder; only names it does not
+        know cost a (cached, rate-limited) Nominatim search.
         Returns a dictionary with 'lat' and 'lon' or None if not found.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                params = {"q": country, "format": "json"}
-                headers = {"User-Agent": "saneles-country-api/1.0"}
-                response = await client.get(self.geocode_base_url, params=params, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-
-                if not data or "boundingbox" not in data[0]:
-                    logger.warning(f"No valid geocoding data for {country}: {data}")
-                    return None
-
-                # Calculate centroid from boundingbox [south, north, west, east]
-                boundingbox = data[0]["boundingbox"]
-                try:
-                    south, north, west, east = map(float, boundingbox)
-                    lat = (south + north) / 2
-                    lon = (west + east) / 2
-                    return {"lat": lat, "lon": lon}
-                except (ValueError, TypeError) as e:
-                    logger.error(f"Invalid boundingbox format for {country}: {boundingbox}, error: {str(e)}")
-                    return None
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Nominatim API error for {country}: {e.response.status_code} - {e.response.text}")
-                raise HTTPException(status_code=e.response.status_code, detail=f"Nominatim API error: {e.response.text}")
-            except httpx.HTTPError as e:
-                logger.error(f"Network error connecting to Nominatim for {country}: {str(e)}")
-                raise HTTPException(status_code=502, detail=f"Error connecting to Nominatim API: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error fetching coordinates for {country}: {str(e)}")
+        try:
+            located = await self.geocoder.geocode(country)
+            if located is None:
+                logger.warning(f"No valid geocoding data for {country}")
                 return None
+            return located.centroid
 
-    def _weather_code_to_text(self, code: int) -> str:
-        weather_codes = {
-            0: "Clear sky",
-            1: "Mainly clear",
-            2: "Partly cloudy",
-            3: "Overcast",
-            45: "Fog",
-            48: "Depositing rime fog",
-            51: "Light drizzle",
-            53: "Moderate drizzle",
-            55: "Dense drizzle",
-            61: "Light rain",
-            63: "Moderate rain",
-            65: "Heavy rain",
-            80: "Showers",
-            81: "Moderate showers",
-            82: "Violent showers",
-            95: "Thunderstorm",
-            96: "Thunderstorm with slight hail",
-            99: "Thunderstorm with heavy hail"
-        }
-        return weather_codes.get(code, f"Unknown code {code}")
\ No newline at end of file
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Nominatim API error for {country}: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"Nominatim API error: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Network error connecting to Nominatim for {country}: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Error connecting to Nominatim API: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error fetching coordinates for {country}: {str(e)}")
+            return None
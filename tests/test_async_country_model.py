@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from app.models.country import AsyncCountryModel
+
+@pytest.fixture
+def mock_collection():
+    collection = MagicMock()
+    collection.find_one = AsyncMock()
+    collection.find_one_and_update = AsyncMock()
+    return collection
+
+@pytest.fixture
+def country_model(mock_collection):
+    with patch("app.models.country.AsyncIOMotorClient") as mock_client:
+        mock_client.return_value.__getitem__.return_value.__getitem__.return_value = mock_collection
+        yield AsyncCountryModel("mongodb://fake", "db", "col")
+
+@pytest.mark.asyncio
+async def test_find_all(country_model, mock_collection):
+    mock_collection.find.return_value.to_list = AsyncMock(return_value=[{"name": "South Africa"}])
+    result = await country_model.find_all()
+    assert result == [{"name": "South Africa"}]
+
+@pytest.mark.asyncio
+async def test_search_by_name_empty_query(country_model, mock_collection):
+    result = await country_model.search_by_name("   ")
+    assert result == []
+    mock_collection.find.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_find_by_name_found(country_model, mock_collection):
+    mock_collection.find_one.return_value = {"name": "South Africa"}
+    result = await country_model.find_by_name("South Africa")
+    assert result == {"name": "South Africa"}
+
+@pytest.mark.asyncio
+async def test_update_one_not_found(country_model, mock_collection):
+    mock_collection.find_one_and_update.return_value = None
+    result = await country_model.update_one("Neverland", {"population": 1})
+    assert result is None
+    mock_collection.find_one.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_update_one_duplicate_name(country_model, mock_collection):
+    mock_collection.find_one.return_value = {"_id": 2}
+    with pytest.raises(Exception, match="Country name already exists"):
+        await country_model.update_one("South Africa", {"name": "Namibia"})
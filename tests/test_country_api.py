@@ -10,12 +10,38 @@ def test_root():
     assert "Welcome" in resp.json()["message"]
 
 def test_get_all_countries(monkeypatch):
-    monkeypatch.setattr("app.models.country.CountryModel.find_all", lambda self: [{"name": "South Africa"}])
+    async def fake_find_all(self):
+        return [{"name": "South Africa"}]
+    monkeypatch.setattr("app.models.country.AsyncCountryModel.find_all", fake_find_all)
     resp = client.get("/countries/")
     assert resp.status_code == 200
     assert "countries" in resp.json()
     assert resp.json()["countries"][0]["name"] == "South Africa"
 
+def test_get_all_countries_conditional(monkeypatch):
+    async def fake_find_all(self):
+        return [{"name": "South Africa"}]
+    monkeypatch.setattr("app.models.country.AsyncCountryModel.find_all", fake_find_all)
+    first = client.get("/countries/", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip"
+    resp = client.get("/countries/", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+def test_get_all_countries_ndjson(monkeypatch):
+    async def fake_iter_countries(self, fields=None, cursor=None, region=None, subregion=None, limit=None):
+        for name in ("Namibia", "South Africa"):
+            yield {"name": name}
+    monkeypatch.setattr("app.models.country.AsyncCountryModel.iter_countries", fake_iter_countries)
+    resp = client.get("/countries/", params={"format": "ndjson", "fields": "name"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert resp.text.splitlines() == ['{"name":"Namibia"}', '{"name":"South Africa"}']
+
+def test_get_all_countries_bad_cursor():
+    resp = client.get("/countries/", params={"cursor": "%%%"})
+    assert resp.status_code == 400
+
 def test_get_country_by_name_found(monkeypatch):
     async def fake_get_country_details(self, name):
         return {"name": name, "population": 100}
@@ -32,13 +58,17 @@ def test_get_country_by_name_not_found(monkeypatch):
     assert resp.status_code == 404
 
 def test_update_country_success(monkeypatch):
-    monkeypatch.setattr("app.models.country.CountryModel.update_one", lambda self, name, data: {"name": name, **data})
+    async def fake_update_one(self, name, data):
+        return {"name": name, **data}
+    monkeypatch.setattr("app.models.country.AsyncCountryModel.update_one", fake_update_one)
     resp = client.put("/countries/South Africa", json={"population": 60000000})
     assert resp.status_code == 200
     assert resp.json()["population"] == 60000000
 
 def test_update_country_not_found(monkeypatch):
-    monkeypatch.setattr("app.models.country.CountryModel.update_one", lambda self, name, data: None)
+    async def fake_update_one(self, name, data):
+        return None
+    monkeypatch.setattr("app.models.country.AsyncCountryModel.update_one", fake_update_one)
     resp = client.put("/countries/Neverland", json={"population": 1})
     assert resp.status_code == 404
 
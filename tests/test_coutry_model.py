@@ -1,3 +1,4 @@
+import mongomock
 import pytest
 from unittest.mock import MagicMock, patch
 from app.models.country import CountryModel
@@ -27,39 +28,55 @@ def test_find_by_name_not_found(country_model, mock_collection):
     result = country_model.find_by_name("Neverland")
     assert result is None
 
-def test_update_one_success(country_model, mock_collection):
-    def find_one_side_effect(*args, **kwargs):
-        # Print to debug
-        # print("find_one called with:", args, kwargs)
-        # First call: find country (no projection)
-        if args and args[0].get("name"):
-            if not hasattr(find_one_side_effect, "call_count"):
-                find_one_side_effect.call_count = 0
-            find_one_side_effect.call_count += 1
-            if find_one_side_effect.call_count == 1:
-                return {"_id": 1, "name": "South Africa"}
-            elif find_one_side_effect.call_count == 2:
-                return None  # No duplicate name
-        # Third call: find by _id with projection
-        if args and args[0].get("_id") == 1 and kwargs.get("projection") == {"_id": 0}:
-            return {"name": "South Africa", "population": 60_000_000}
-        return None
+def test_find_by_name_uses_normalized_field(country_model, mock_collection):
+    mock_collection.find_one.return_value = {"name": "South Africa"}
+    country_model.find_by_name("  SOUTH   africa ")
+    query = mock_collection.find_one.call_args[0][0]
+    assert query == {"name_norm": "south africa"}
 
-    mock_collection.find_one.side_effect = find_one_side_effect
-    mock_collection.update_one.return_value = None
+def test_update_one_success(country_model, mock_collection):
+    mock_collection.find_one_and_update.return_value = {"name": "South Africa", "population": 60_000_000}
     result = country_model.update_one("South Africa", {"population": 60_000_000})
     assert result == {"name": "South Africa", "population": 60_000_000}
+    query, update = mock_collection.find_one_and_update.call_args[0]
+    assert query["$or"][0] == {"name_norm": "south africa"}
+    assert update == {"$set": {"population": 60_000_000, "name_norm": "south africa"}}
 
-def test_update_one_not_found(country_model, mock_collection):
+def test_update_one_rename_maintains_name_norm(country_model, mock_collection):
     mock_collection.find_one.return_value = None
+    mock_collection.find_one_and_update.return_value = {"name": "Republic of South Africa"}
+    country_model.update_one("South Africa", {"name": "Republic of  South Africa"})
+    update = mock_collection.find_one_and_update.call_args[0][1]
+    assert update["$set"]["name_norm"] == "republic of south africa"
+
+def test_update_one_not_found(country_model, mock_collection):
+    mock_collection.find_one_and_update.return_value = None
     result = country_model.update_one("Neverland", {"population": 1})
     assert result is None
 
-def test_update_one_duplicate_name(country_model, mock_collection):
-    # First find returns the country to update, second find returns a duplicate
-    mock_collection.find_one.side_effect = [
+def test_backfill_name_norm(country_model, mock_collection):
+    mock_collection.find.return_value = [
         {"_id": 1, "name": "South Africa"},
-        {"_id": 2, "name": "Namibia"}
+        {"_id": 2, "name": "Namibia", "name_norm": "namibia"}
     ]
+    mock_collection.bulk_write.return_value.modified_count = 1
+    assert country_model.backfill_name_norm(force=False) == 1
+    ops = mock_collection.bulk_write.call_args[0][0]
+    assert len(ops) == 1
+
+def test_update_one_duplicate_name(country_model, mock_collection):
+    # The new name already belongs to another country
+    mock_collection.find_one.return_value = {"_id": 2}
     with pytest.raises(Exception, match="Country name already exists"):
-        country_model.update_one("South Africa", {"name": "Namibia"})
\ No newline at end of file
+        country_model.update_one("South Africa", {"name": "Namibia"})
+
+def test_documents_without_name_norm_are_still_found_and_migrated_on_write():
+    with patch("app.models.country.MongoClient", mongomock.MongoClient):
+        model = CountryModel("mongodb://fake", "db", "col")
+    model.collection.insert_many([{"name": "South Africa", "population": 1}, {"name": "South Sudan"}])
+
+    assert model.find_by_name("south africa")["name"] == "South Africa"
+    assert [c["name"] for c in model.search_by_name("south")] == ["South Africa", "South Sudan"]
+    assert model.update_one("SOUTH AFRICA", {"population": 2})["population"] == 2
+    assert model.collection.find_one({"name": "South Africa"})["name_norm"] == "south africa"
+    assert [c["name"] for c in model.search_by_name("south")] == ["South Africa", "South Sudan"]
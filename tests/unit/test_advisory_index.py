@@ -0,0 +1,97 @@
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.services.http_client import HttpClientManager
+from app.services.safety_service import SafetyService, parse_advisories
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+  <title>travel.state.gov: Travel Advisories</title>
+  <item>
+    <title>South Africa - Level 2: Exercise Increased Caution</title>
+    <category domain="Threat-Level">Level 2: Exercise Increased Caution</category>
+    <description>Exercise increased caution in South Africa due to crime.</description>
+    <pubDate>Mon, 01 May 2025 12:00:00 -0400</pubDate>
+  </item>
+  <item>
+    <title>Burma (Myanmar) - Level 4: Do Not Travel</title>
+    <description>Do not travel to Burma.</description>
+    <pubDate>Tue, 02 May 2025 12:00:00 -0400</pubDate>
+  </item>
+  <item>
+    <title>Cote d'Ivoire - Level 1: Exercise Normal Precautions</title>
+    <description>Exercise normal precautions in Cote d'Ivoire.</description>
+    <pubDate>Wed, 03 May 2025 12:00:00 -0400</pubDate>
+  </item>
+</channel></rss>"""
+
+
+def make_service(responses):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    clients = HttpClientManager(transport=httpx.MockTransport(handler))
+    return SafetyService(http_clients=clients), requests
+
+
+def test_parse_extracts_country_and_level():
+    advisories = parse_advisories(FEED)
+    assert advisories["south africa"]["level"] == 2
+    assert advisories["burma (myanmar)"]["level"] == 4
+
+
+@pytest.mark.asyncio
+async def test_answers_from_index_and_revalidates_with_etag():
+    service, requests = make_service([
+        httpx.Response(200, content=FEED, headers={"ETag": '"v1"'}),
+        httpx.Response(304),
+    ])
+
+    first = await service.get_safety("South Africa")
+    again = await service.get_safety("burma")
+    await service.refresh()
+
+    assert first["advisory"]["level"] == 2
+    assert again["advisory"]["message"] == "Do not travel to Burma."
+    assert len(requests) == 2
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert service.stats()["not_modified"] == 1
+
+
+@pytest.mark.asyncio
+async def test_keeps_last_good_snapshot_when_feed_is_down():
+    service, _ = make_service([
+        httpx.Response(200, content=FEED),
+        httpx.ConnectError("feed down"),
+    ])
+    await service.refresh()
+    await service.refresh()
+
+    result = await service.get_safety("South Africa")
+    assert result["advisory"]["level"] == 2
+    assert service.stats()["refresh_errors"] == 1
+    with pytest.raises(HTTPException) as exc:
+        await service.get_safety("Atlantis")
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_aliases_and_iso_codes_are_direct_hits_and_empty_names_rejected():
+    service, _ = make_service([httpx.Response(200, content=FEED)])
+    await service.refresh()
+    advisories = service.snapshot.advisories
+
+    assert advisories["myanmar"] is advisories["burma"] is advisories["burma (myanmar)"]
+    assert advisories["za"] is advisories["zaf"] is advisories["south africa"]
+    assert (await service.get_safety("Ivory Coast"))["advisory"]["level"] == 1
+    assert service.stats()["size"] == 3
+    for name in ("", "   "):
+        with pytest.raises(HTTPException) as exc:
+            await service.get_safety(name)
+        assert exc.value.status_code == 400
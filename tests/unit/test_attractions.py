@@ -0,0 +1,139 @@
+import json
+import httpx
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock
+from app.services.attractions_service import AttractionsService, rate_score, split_antimeridian, tile_bbox
+from app.services.boundaries import BoundaryStore
+from app.services.cache import ResponseCache
+from app.services.http_client import HttpClientManager
+from app.services.rate_limiter import RateLimiterRegistry
+
+
+def place(xid, name, rate, lon, lat):
+    return {"properties": {"xid": xid, "name": name, "kinds": "cultural", "rate": rate},
+            "geometry": {"coordinates": [lon, lat]}}
+
+
+def country(name, iso_a3, *parts):
+    return {"type": "Feature", "properties": {"NAME": name, "ISO_A3": iso_a3},
+            "geometry": {"type": "MultiPolygon", "coordinates": [[ring] for ring in parts]}}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("OPENTRIPMAP_API_KEY", "fake-key")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if "/xid/" in request.url.path:
+            return httpx.Response(200, json={"wikipedia_extracts": {"text": "A fortress."},
+                                             "preview": {"source": "https://img/x.jpg"}})
+        west = float(request.url.params["lon_min"])
+        # Every tile sees the shared landmark; each also has one place of its own
+        return httpx.Response(200, json={"features": [
+            place("shared", "Border Fort", "3h", 10.0, 10.0),
+            place(f"w{west}", f"Museum {west}", "2", west, 10.0),
+            {"properties": {"name": "", "kinds": "natural"}, "geometry": {"coordinates": [0, 0]}},
+        ]})
+
+    geocoder = MagicMock()
+    geocoder.geocode = AsyncMock(return_value=MagicMock(bbox=(8.0, 12.0, 6.0, 14.0), boundary=None))
+    service = AttractionsService(
+        http_clients=HttpClientManager(transport=httpx.MockTransport(handler)),
+        rate_limiter=RateLimiterRegistry(rates={"opentripmap": {"rate": 1000.0, "capacity": 100.0}}),
+        cache=ResponseCache(), geocoder=geocoder, tile_size=4.0, max_tiles=9,
+    )
+    service.requests = requests
+    return service
+
+
+def test_tile_bbox_respects_max_tiles():
+    assert len(tile_bbox((0.0, 4.0, 0.0, 8.0), 2.0, 16)) == 8
+    tiles = tile_bbox((-35.0, -22.0, 16.0, 33.0), 2.0, 9)
+    assert len(tiles) <= 9
+    assert min(t[0] for t in tiles) == -35.0 and max(t[3] for t in tiles) == 33.0
+    assert rate_score("3h") > rate_score("3") > rate_score("2") > rate_score(None)
+    assert split_antimeridian((-20.0, -16.0, 177.0, -179.0)) == [(-20.0, -16.0, 177.0, 180.0),
+                                                                  (-20.0, -16.0, -180.0, -179.0)]
+
+
+@pytest.mark.asyncio
+async def test_tiles_are_merged_ranked_and_cached(service):
+    result = await service.get_attractions("Chad", limit=2, offset=0)
+
+    assert result["tiles"] == {"total": 2, "fetched": 2, "failed": 0}
+    assert result["total"] == 3                      # the shared landmark is counted once
+    assert [a["name"] for a in result["attractions"]] == ["Border Fort", "Museum 10.0"]
+    assert service.requests[0].url.params["kinds"] == "cultural,natural"
+
+    page = await service.get_attractions("Chad", limit=2, offset=2)
+    assert [a["name"] for a in page["attractions"]] == ["Museum 6.0"]
+    assert page["tiles"]["fetched"] == 0
+    assert len(service.requests) == 2
+    service.geocoder.geocode.assert_awaited_with("Chad")
+
+
+@pytest.mark.asyncio
+async def test_details_enrich_only_the_requested_page(service):
+    result = await service.get_attractions("Chad", limit=1, kinds="Cultural", details=True)
+
+    assert result["kinds"] == "cultural"
+    assert result["attractions"][0]["description"] == "A fortress."
+    assert result["attractions"][0]["image"] == "https://img/x.jpg"
+    assert sum("/xid/" in r.url.path for r in service.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_kinds_and_unknown_country(service):
+    with pytest.raises(HTTPException) as invalid:
+        await service.get_attractions("Chad", kinds="museums;drop")
+    assert invalid.value.status_code == 400
+
+    service.geocoder.geocode = AsyncMock(return_value=None)
+    with pytest.raises(HTTPException) as missing:
+        await service.get_attractions("Atlantis")
+    assert missing.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_country_straddling_the_antimeridian_is_tiled_per_part_and_filtered(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENTRIPMAP_API_KEY", "fake-key")
+    path = tmp_path / "boundaries.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": [
+        country("Fiji", "FJI",
+                [[177, -19], [180, -19], [180, -16.2], [177, -16.2], [177, -19]],
+                [[-180, -17], [-179, -17], [-179, -16.2], [-180, -16.2], [-180, -17]]),
+        country("Tonga", "TON", [[-179, -17], [-178, -17], [-178, -16.2], [-179, -16.2], [-179, -17]]),
+    ]}), encoding="utf-8")
+    store = BoundaryStore(str(path))
+    fiji = store.lookup("Fiji")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"features": [
+            place("viti", "Viti Levu", "3", 178.0, -17.5),
+            place("taveuni", "Taveuni", "2", -179.5, -16.5),
+            place("reef", "Offshore Reef", "1", 176.8, -17.5),      # just off the coarse outline
+            place("tonga", "Tongan Islet", "3h", -178.9, -16.5),    # near Fiji, but inside Tonga
+            place("sea", "Open Sea", "3", 175.0, -17.5),
+        ]})
+
+    geocoder = MagicMock(boundaries=store)
+    geocoder.geocode = AsyncMock(return_value=MagicMock(bbox=fiji.bbox, boundary=fiji))
+    service = AttractionsService(
+        http_clients=HttpClientManager(transport=httpx.MockTransport(handler)),
+        rate_limiter=RateLimiterRegistry(rates={"opentripmap": {"rate": 1000.0, "capacity": 100.0}}),
+        cache=ResponseCache(), geocoder=geocoder, tile_size=2.0, max_tiles=9,
+    )
+
+    result = await service.get_attractions("Fiji", limit=10)
+
+    # Only grid cells the islands touch, none spanning the whole -180..180 bounding box
+    spans = {(float(r.url.params["lon_min"]), float(r.url.params["lon_max"])) for r in requests}
+    assert spans == {(176.0, 178.0), (178.0, 180.0), (-180.0, -178.0)}
+    assert len(requests) == result["tiles"]["total"] == 5
+    assert [a["name"] for a in result["attractions"]] == ["Viti Levu", "Taveuni", "Offshore Reef"]
+    assert result["total"] == 3 and result["outside_country"] == 2
@@ -0,0 +1,63 @@
+import json
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from app.services.boundaries import BoundaryStore
+from app.services.country_service import CountryService
+from app.services.weather_service import WeatherService
+from app.services.geocoder import Geocoder
+
+FEATURES = [
+    {
+        "type": "Feature",
+        "properties": {"NAME": "Côte d'Ivoire", "NAME_LONG": "Côte d'Ivoire", "ADMIN": "Ivory Coast",
+                       "ISO_A2": "CI", "ISO_A3": "CIV", "LABEL_X": -5.5, "LABEL_Y": 7.5},
+        "geometry": {"type": "Polygon", "coordinates": [[[-8.6, 4.3], [-2.5, 4.3], [-2.5, 10.5], [-8.6, 4.3]]]},
+    },
+    {
+        "type": "Feature",
+        "properties": {"NAME": "France", "ADMIN": "France", "ISO_A2": "-99", "ISO_A3": "-99",
+                       "ISO_A2_EH": "FR", "ISO_A3_EH": "FRA"},
+        "geometry": {"type": "MultiPolygon", "coordinates": [[[[-5.0, 42.0], [8.0, 42.0], [8.0, 51.0], [-5.0, 42.0]]]]},
+    },
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "countries.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": FEATURES}), encoding="utf-8")
+    return BoundaryStore(str(path))
+
+
+def test_lookup_by_name_alias_and_code(store):
+    assert store.lookup("Ivory Coast").name == "Côte d'Ivoire"
+    assert store.lookup("cote d'ivoire").iso_a3 == "CIV"
+    assert store.lookup("civ").name == "Côte d'Ivoire"
+    assert store.lookup("FR").name == "France"
+    assert store.lookup("Atlantis") is None
+
+
+def test_bbox_centroid_and_serialized_feature(store):
+    france = store.lookup("france")
+    assert france.bbox == (42.0, 51.0, -5.0, 8.0)
+    # No label point: centre of the bounding box
+    assert france.centroid == {"lat": 46.5, "lon": 1.5}
+    assert store.lookup("Côte d'Ivoire").centroid == {"lat": 7.5, "lon": -5.5}
+    assert json.loads(france.feature_json) == FEATURES[1]
+
+
+@pytest.mark.asyncio
+async def test_known_countries_skip_nominatim(store):
+    geocoder = Geocoder(store, countries_path="missing.json")
+    geocoder.cache.get_or_fetch = AsyncMock()
+    service = CountryService(MagicMock(), geocoder=geocoder)
+    service._nominatim_search = AsyncMock()
+    weather = WeatherService(geocoder=geocoder)
+
+    geo = await service._map_geocode("France")
+    coordinates = await weather._get_coordinates("France")
+
+    assert geo["coordinates"]["boundingbox"] == [42.0, 51.0, -5.0, 8.0]
+    assert coordinates == {"lat": 46.5, "lon": 1.5}
+    service._nominatim_search.assert_not_called()
+    geocoder.cache.get_or_fetch.assert_not_called()
@@ -0,0 +1,79 @@
+import io
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from pymongo.errors import BulkWriteError
+from app.manage import iter_json_records, validate_records
+from app.models.catalogue import CountryCatalogue
+from app.models.country import AsyncCountryModel
+
+@pytest.fixture
+def mock_collection():
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock()
+    collection.find.return_value.to_list = AsyncMock(return_value=[])
+    return collection
+
+@pytest.fixture
+def model(mock_collection):
+    with patch("app.models.country.AsyncIOMotorClient") as mock_client:
+        mock_client.return_value.__getitem__.return_value.__getitem__.return_value = mock_collection
+        yield AsyncCountryModel("mongodb://fake", "db", "col", catalogue=CountryCatalogue())
+
+@pytest.mark.asyncio
+async def test_bulk_update_is_one_bulk_write(model, mock_collection):
+    mock_collection.bulk_write.return_value = MagicMock(upserted_ids={1: "id"}, matched_count=1, modified_count=1)
+    mock_collection.find.return_value.to_list.side_effect = [
+        [{"_id": 1, "name_norm": "namibia"}],
+        [{"_id": 1, "name": "Namibia", "population": 1},
+         {"_id": "id", "name": "Atlantis", "capital": "Poseidonia"}],
+    ]
+
+    result = await model.bulk_update([
+        {"name": "namibia", "update": {"population": 1}},
+        {"name": "Atlantis", "update": {"capital": "Poseidonia"}, "upsert": True},
+        {"name": "Neverland", "update": {"population": 2}},
+    ])
+
+    ops = mock_collection.bulk_write.call_args.args[0]
+    assert len(ops) == 3 and mock_collection.bulk_write.await_count == 1
+    assert ops[1]._doc == {"$set": {"capital": "Poseidonia"}, "$setOnInsert": {"name": "Atlantis"}}
+    assert [r["status"] for r in result["results"]] == ["updated", "inserted", "not_found"]
+    assert model.catalogue.get("atlantis")["capital"] == "Poseidonia"
+
+@pytest.mark.asyncio
+async def test_ordered_bulk_update_skips_after_error(model, mock_collection):
+    mock_collection.bulk_write.side_effect = BulkWriteError({
+        "writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key error"}],
+        "nMatched": 0, "nModified": 0, "upserted": [],
+    })
+
+    result = await model.bulk_update([
+        {"name": "Namibia", "update": {"name": "South Africa"}},
+        {"name": "Namibia", "update": {"population": 1}},
+    ])
+
+    assert result["results"][0] == {"index": 0, "name": "Namibia", "status": "error",
+                                    "detail": "Country name already exists"}
+    assert result["results"][1]["status"] == "skipped"
+
+    with pytest.raises(ValueError):
+        await model.bulk_update([{"name": "Namibia", "update": {}}])
+
+@pytest.mark.asyncio
+async def test_rename_onto_existing_name_without_source_is_not_found(model, mock_collection):
+    model.catalogue.put({"name": "France", "capital": "Paris"})
+    mock_collection.bulk_write.return_value = MagicMock(upserted_ids={}, matched_count=0, modified_count=0)
+
+    result = await model.bulk_update([{"name": "Foo", "update": {"name": "France"}}])
+
+    assert result["results"][0]["status"] == "not_found"
+    assert mock_collection.find.call_count == 1          # nothing written, nothing re-read
+    assert model.catalogue.get("france")["capital"] == "Paris"
+
+def test_import_reader_streams_and_validates():
+    handle = io.StringIO('[{"name": "Namibia", "population": 2540905},\n {"population": -1}, {"name": "Chad"}]')
+    results = list(validate_records(iter_json_records(handle, chunk_size=8)))
+
+    assert results[0] == (0, {"name": "Namibia", "population": 2540905}, "")
+    assert "name" in results[1][2] and "population" in results[1][2]
+    assert results[2] == (2, {"name": "Chad"}, "")
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from app.services.cache import ResponseCache, MemoryCacheBackend, CachePolicy, make_key
+
+
+def make_cache(ttl=60.0, stale_ttl=60.0):
+    return ResponseCache(MemoryCacheBackend(max_entries=2), policies={"test": CachePolicy(ttl=ttl, stale_ttl=stale_ttl)})
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_is_served_from_cache():
+    cache = make_cache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    assert await cache.get_or_fetch("test", "a", fetch) == {"value": 1}
+    assert await cache.get_or_fetch("test", "a", fetch) == {"value": 1}
+    assert len(calls) == 1
+    assert cache.stats()["sources"]["test"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    cache = make_cache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*[cache.get_or_fetch("test", "a", fetch) for _ in range(5)])
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["sources"]["test"]["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshing():
+    cache = make_cache(ttl=0.0, stale_ttl=60.0)
+    values = iter(["old", "new"])
+
+    async def fetch():
+        return next(values)
+
+    assert await cache.get_or_fetch("test", "a", fetch) == "old"
+    # Entry is already stale: served immediately, refreshed in the background
+    assert await cache.get_or_fetch("test", "a", fetch) == "old"
+    await asyncio.sleep(0.01)
+    assert await cache.get("test", "a") == "new"
+    assert cache.stats()["sources"]["test"]["stale_hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached():
+    cache = make_cache()
+
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("test", "a", failing)
+
+    async def working():
+        return "ok"
+
+    assert await cache.get_or_fetch("test", "a", working) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    await backend.set("a", "1", 60)
+    await backend.set("b", "2", 60)
+    await backend.get("a")
+    await backend.set("c", "3", 60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == "1"
+
+
+def test_make_key_normalizes_parts():
+    assert make_key("  South   Africa ", "search") == make_key("south africa", "SEARCH")
+
+
+class UnreachableBackend(MemoryCacheBackend):
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def set(self, key, value, ttl):
+        raise ConnectionError("redis down")
+
+    async def acquire_lock(self, key, ttl):
+        raise ConnectionError("redis down")
+
+
+@pytest.mark.asyncio
+async def test_backend_errors_fetch_directly_without_waiting_for_a_lock():
+    cache = ResponseCache(UnreachableBackend(), policies={"test": CachePolicy(ttl=60, stale_ttl=60)}, lock_wait=2.0)
+
+    async def fetch():
+        return "direct"
+
+    started = asyncio.get_running_loop().time()
+    assert await cache.get_or_fetch("test", "a", fetch) == "direct"
+    assert asyncio.get_running_loop().time() - started < 0.5
@@ -0,0 +1,121 @@
+import gzip
+import json
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from app.models.catalogue import CountryCatalogue
+from app.models.country import AsyncCountryModel
+
+DOCUMENTS = [
+    {"_id": 1, "name": "South Africa", "name_norm": "south africa", "capital": "Pretoria"},
+    {"_id": 2, "name": "Namibia", "name_norm": "namibia", "capital": "Windhoek"},
+]
+
+@pytest.fixture
+def catalogue():
+    catalogue = CountryCatalogue()
+    catalogue.load(DOCUMENTS)
+    return catalogue
+
+def test_get_returns_public_copy(catalogue):
+    country = catalogue.get("south africa")
+    assert country == {"name": "South Africa", "capital": "Pretoria"}
+
+    country["coordinates"] = {"lat": 0}
+    assert "coordinates" not in catalogue.get("south africa")
+
+def test_list_json_is_rebuilt_after_change(catalogue):
+    first = catalogue.list_json()
+    assert catalogue.list_json() is first
+
+    catalogue.put({"_id": 2, "name": "Namibia", "capital": "Windhoek", "population": 2540905})
+
+    body = json.loads(catalogue.list_json())
+    assert body["countries"][1]["population"] == 2540905
+
+def test_put_handles_rename(catalogue):
+    catalogue.put({"_id": 1, "name": "Republic of South Africa", "capital": "Pretoria"})
+
+    assert catalogue.get("south africa") is None
+    assert catalogue.get("republic of south africa")["capital"] == "Pretoria"
+    assert catalogue.stats()["size"] == 2
+
+def test_search_prefix(catalogue):
+    assert [c["name"] for c in catalogue.search("nam")] == ["Namibia"]
+
+def test_search_follows_updates(catalogue):
+    catalogue.put({"_id": 2, "name": "Namibia", "capital": "Windhoek", "population": 2540905})
+    catalogue.put({"_id": 1, "name": "Republic of South Africa", "capital": "Pretoria"})
+
+    assert [c["name"] for c in catalogue.search("windhoek")] == ["Namibia"]
+    assert [c["name"] for c in catalogue.search("south")] == ["Republic of South Africa"]
+    catalogue.remove(2)
+    assert catalogue.search("windh") == []
+
+@pytest.fixture
+def mock_collection():
+    collection = MagicMock()
+    collection.find_one = AsyncMock()
+    collection.find_one_and_update = AsyncMock()
+    return collection
+
+@pytest.fixture
+def cached_model(mock_collection, catalogue):
+    with patch("app.models.country.AsyncIOMotorClient") as mock_client:
+        mock_client.return_value.__getitem__.return_value.__getitem__.return_value = mock_collection
+        yield AsyncCountryModel("mongodb://fake", "db", "col", catalogue=catalogue)
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_catalogue(cached_model, mock_collection):
+    assert (await cached_model.find_by_name("NAMIBIA"))["capital"] == "Windhoek"
+    assert len(await cached_model.find_all()) == 2
+    mock_collection.find_one.assert_not_called()
+    mock_collection.find.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_update_one_refreshes_catalogue(cached_model, mock_collection, catalogue):
+    mock_collection.find_one_and_update.return_value = {"_id": 2, "name": "Namibia", "capital": "Windhoek", "population": 1}
+
+    result = await cached_model.update_one("Namibia", {"population": 1})
+
+    assert result == {"name": "Namibia", "capital": "Windhoek", "population": 1}
+    assert catalogue.get("namibia")["population"] == 1
+
+def test_list_payload_variants_and_etag(catalogue):
+    payload = catalogue.list_payload()
+    coding, body = payload.negotiate("gzip, deflate")
+
+    assert coding == "gzip" and gzip.decompress(body) == payload.body
+    assert payload.negotiate("identity")[0] == "identity"
+    assert payload.matches(payload.etag_for("gzip"))
+
+    catalogue.put({"_id": 2, "name": "Namibia", "capital": "Windhoek", "population": 1})
+    assert catalogue.list_payload().etag != payload.etag
+    assert not catalogue.list_payload().matches(payload.etag)
+
+@pytest.mark.asyncio
+async def test_list_countries_pages_with_cursor(cached_model, mock_collection):
+    first = await cached_model.list_countries(fields=["name"], limit=1)
+    assert first["countries"] == [{"name": "Namibia"}]
+
+    second = await cached_model.list_countries(fields=["name"], limit=1, cursor=first["next_cursor"])
+    assert second == {"countries": [{"name": "South Africa"}], "next_cursor": None}
+    mock_collection.find.assert_not_called()
+
+    with pytest.raises(ValueError):
+        await cached_model.list_countries(fields=["$where"])
+
+@pytest.mark.asyncio
+async def test_list_countries_pushes_filters_to_mongo(mock_collection):
+    cursor = MagicMock()
+    cursor.sort.return_value.limit.return_value.to_list = AsyncMock(
+        return_value=[{"name": "Namibia", "name_norm": "namibia"}])
+    mock_collection.find.return_value = cursor
+    with patch("app.models.country.AsyncIOMotorClient") as mock_client:
+        mock_client.return_value.__getitem__.return_value.__getitem__.return_value = mock_collection
+        model = AsyncCountryModel("mongodb://fake", "db", "col")
+
+        page = await model.list_countries(fields=["name"], limit=10, region="Africa")
+
+    assert page == {"countries": [{"name": "Namibia"}], "next_cursor": None}
+    mock_collection.find.assert_called_once_with({"region": "Africa"}, {"_id": 0, "name_norm": 1, "name": 1})
+    cursor.sort.assert_called_once_with("name_norm", 1)
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from app.services.cache import ResponseCache
+from app.services.chat_cache import ChatAnswerCache, MinHasher
+
+
+def answer(text):
+    return {"choices": [{"message": {"content": text}}]}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("similarity", [False, True])
+async def test_identical_concurrent_prompts_share_one_generation(similarity):
+    chat = ChatAnswerCache(ResponseCache(), similarity=similarity)
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return answer("Diverse and vibrant.")
+
+    results = await asyncio.gather(*[
+        chat.get_or_generate("South Africa", "What is the culture like in South Africa?", generate)
+        for _ in range(5)
+    ])
+    again = await chat.get_or_generate(" south  africa", "what is the culture like in south africa", generate)
+
+    assert calls == 1
+    assert all(r == answer("Diverse and vibrant.") for r in results + [again])
+    stats = chat.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 1)
+    assert stats["hit_rate"] == pytest.approx(1 / 6, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_similar_prompts_reuse_a_cached_answer():
+    chat = ChatAnswerCache(ResponseCache(), similarity=True, threshold=0.7)
+    await chat.store("Kenya", "What is the best time to visit Kenya for a safari?", answer("July to October."))
+
+    similar = await chat.lookup("Kenya", "what's the best time to visit kenya for safari")
+    different = await chat.lookup("Kenya", "What currency is used in Kenya?")
+    other_country = await chat.lookup("Tanzania", "What is the best time to visit Kenya for a safari?")
+
+    assert similar == answer("July to October.")
+    assert different is None and other_country is None
+    assert chat.stats()["similar_hits"] == 1
+
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher(num_perm=128)
+    same = hasher.signature("culture of south africa")
+    assert hasher.similarity(same, hasher.signature("South Africa culture")) == 1.0
+    assert hasher.similarity(same, hasher.signature("visa rules for japan")) < 0.2
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import httpx
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from app import main
+from app.services.country_service import CountryService
+from app.services.http_client import HttpClientManager
+
+TOKENS = ["Kenya", " is", " in", " East", " Africa", "."]
+
+
+class StubInferenceStream(httpx.AsyncByteStream):
+    """Local stand-in for the inference API's SSE stream, recording how far it got."""
+
+    def __init__(self, tokens, delay=0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for token in self.tokens:
+            await asyncio.sleep(self.delay)
+            self.sent += 1
+            event = {"token": {"id": self.sent, "text": token, "special": False}, "generated_text": None}
+            yield f"data:{json.dumps(event)}\n\n".encode()
+        end = {"token": {"id": 0, "text": "</s>", "special": True}, "generated_text": "".join(self.tokens)}
+        yield f"data:{json.dumps(end)}\n\n".encode()
+
+    async def aclose(self):
+        self.closed = True
+
+
+def stub_service(stream):
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, stream=stream, headers={"content-type": "text/event-stream"})
+
+    service = CountryService(MagicMock(), http_clients=HttpClientManager(transport=httpx.MockTransport(handler)))
+    return service, requests
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_relayed_in_order():
+    service, requests = stub_service(StubInferenceStream(TOKENS))
+
+    received = [token async for token in service.stream_custom_request("key", "Where is it?", "Kenya")]
+
+    assert received == TOKENS
+    assert requests[0]["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_closing_the_generator_closes_the_upstream_stream():
+    stream = StubInferenceStream(TOKENS, delay=0.01)
+    service, _ = stub_service(stream)
+
+    tokens = service.stream_custom_request("key", "Where is it?", "Kenya")
+    assert await tokens.__anext__() == "Kenya"
+    await tokens.aclose()
+
+    assert stream.closed
+    assert stream.sent < len(TOKENS)
+
+
+def test_stream_endpoint_emits_sse_events(monkeypatch):
+    service, _ = stub_service(StubInferenceStream(TOKENS))
+    monkeypatch.setattr(main, "country_service", service)
+    monkeypatch.setenv("HUGGINGFACE_API_KEY", "key")
+
+    with TestClient(main.app).stream("POST", "/countries/Kenya/chat/stream", json={"message": "Where is it?"}) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line for line in response.iter_lines() if line.startswith("data:") or line.startswith("event:")]
+
+    texts = [json.loads(line[5:])["text"] for line in events if line.startswith("data:") and "text" in line]
+    assert texts == TOKENS
+    assert events[-2] == "event: done"
@@ -0,0 +1,43 @@
+import pytest
+from app.services.boundaries import Boundary
+from app import config
+from app.services.currency_registry import CURRENCY_REGISTRY, _read_json, build_registry
+
+CURRENCIES = {"Ivory Coast": "XOF", "Congo (Congo-Brazzaville)": "XAF", "South Africa": "ZAR", "Senegal": "xof"}
+
+
+def boundary(**props):
+    return Boundary(props["NAME"], None, None, (0, 0, 0, 0), {"lat": 0, "lon": 0},
+                    {"properties": props}, "{}")
+
+
+@pytest.fixture
+def registry():
+    countries = [{"name": "South Africa", "flag": "https://flagcdn.com/w320/za.png"}]
+    boundaries = [boundary(NAME="Côte d'Ivoire", ADMIN="Ivory Coast", ISO_A2="CI", ISO_A3="CIV")]
+    return build_registry(CURRENCIES, countries, boundaries)
+
+
+def test_lookups_by_name_code_and_alternative_spelling(registry):
+    assert registry.currency_for("Côte d'Ivoire") == "XOF"
+    assert registry.currency_for("cote d'ivoire") == "XOF"
+    assert registry.currency_for("CIV") == "XOF"
+    assert registry.currency_for("za") == "ZAR"
+    assert registry.currency_for("  south   AFRICA ") == "ZAR"
+    assert registry.currency_for("Congo") == "XAF"
+    assert registry.currency_for("Atlantis") is None
+
+
+def test_reverse_index_and_immutability(registry):
+    assert registry.countries_for("xof") == ("Ivory Coast", "Senegal")
+    assert registry.canonical_name("Côte d'Ivoire") == "Ivory Coast"
+    with pytest.raises(TypeError):
+        registry._by_key["atlantis"] = "USD"
+    with pytest.raises(AttributeError):
+        registry.extra = {}
+
+
+def test_every_catalogue_country_has_a_currency():
+    countries = _read_json(config.COUNTRIES_JSON, required=True)
+    missing = [c["name"] for c in countries if CURRENCY_REGISTRY.currency_for(c["name"]) is None]
+    assert missing == ["Antarctica"]
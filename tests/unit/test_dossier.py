@@ -0,0 +1,64 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+from app.services.dossier_service import DossierService
+from app.services.geocoder import GeocodeResult
+
+KENYA = GeocodeResult("Kenya", 0.5, 37.9, (-4.7, 5.0, 33.9, 41.9), "offline")
+
+
+def slow(value, delay):
+    async def fetch(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return value
+    return AsyncMock(side_effect=fetch)
+
+
+@pytest.fixture
+def services():
+    country_service = MagicMock()
+    country_service.find_country = AsyncMock(return_value={"name": "Kenya", "capital": "Nairobi"})
+    country_service.get_wikipedia_summary = slow("Kenya is a country in East Africa.", 0.2)
+    country_service.get_country_images = AsyncMock(side_effect=HTTPException(status_code=500, detail="No keys"))
+    geocoder = MagicMock()
+    geocoder.geocode = AsyncMock(return_value=KENYA)
+    weather = MagicMock()
+    weather.get_weather = slow({"current": {"temperature": 24}}, 0.2)
+    safety = MagicMock()
+    safety.get_safety = slow({"advisory": {"level": 2}}, 5.0)
+    return country_service, geocoder, weather, safety
+
+
+@pytest.mark.asyncio
+async def test_sections_run_concurrently_with_partial_results(services):
+    country_service, geocoder, weather, safety = services
+    dossier = DossierService(country_service, geocoder, weather_service=weather, safety_service=safety,
+                             section_timeout=0.5, deadline=1.0)
+
+    started = time.monotonic()
+    result = await dossier.get_dossier("kenya")
+
+    assert time.monotonic() - started < 0.8
+    sections = result["sections"]
+    assert sections["summary"]["status"] == "ok" and sections["weather"]["status"] == "ok"
+    assert sections["safety"]["status"] == "timeout"
+    assert sections["images"] == {"status": "error", "code": 500, "detail": "No keys",
+                                  "elapsed_ms": sections["images"]["elapsed_ms"]}
+    # Coordinates were resolved once and handed to the weather section
+    geocoder.geocode.assert_awaited_once()
+    weather.get_weather.assert_awaited_once_with("Kenya", coordinates={"lat": 0.5, "lon": 37.9})
+
+
+@pytest.mark.asyncio
+async def test_include_selects_sections_and_rejects_unknown(services):
+    country_service, geocoder, weather, safety = services
+    dossier = DossierService(country_service, geocoder, weather_service=weather, safety_service=safety)
+
+    result = await dossier.get_dossier("Kenya", include=["weather"])
+    assert list(result["sections"]) == ["weather"]
+
+    with pytest.raises(HTTPException) as exc:
+        await dossier.get_dossier("Kenya", include=["weather", "horoscope"])
+    assert exc.value.status_code == 400
@@ -0,0 +1,61 @@
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.services.currency_service import CurrencyService
+from app.services.exchange_rates import RateTable
+from app.services.http_client import HttpClientManager
+
+LATEST = {
+    "result": "success",
+    "base_code": "USD",
+    "time_next_update_unix": 1746230401,
+    "conversion_rates": {"USD": 1, "EUR": 0.9, "ZAR": 18.0, "JPY": 150.0},
+}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("EXCHANGERATE_API_KEY", "test-key")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=LATEST)
+
+    service = CurrencyService(http_clients=HttpClientManager(transport=httpx.MockTransport(handler)))
+    service.requests = requests
+    return service
+
+
+def test_cross_rates_are_triangulated_through_the_base():
+    table = RateTable.from_response(LATEST)
+    assert table.rate("USD", "ZAR") == 18.0
+    assert table.rate("EUR", "ZAR") == pytest.approx(20.0)
+    assert table.rate("zar", "jpy") == pytest.approx(150.0 / 18.0)
+
+
+@pytest.mark.asyncio
+async def test_conversions_share_one_upstream_call(service):
+    single = await service.convert_currency("South Africa", 10, "eur")
+    batch = await service.convert_batch(["Japan", "South Africa", "Atlantis"], 100, "USD")
+
+    assert single["to"] == "200.00 ZAR"
+    assert [c.get("to") for c in batch["conversions"]] == ["15000.00 JPY", "1800.00 ZAR", None]
+    assert batch["conversions"][2]["error"] == "Unknown currency"
+    assert len(service.requests) == 1
+    assert service.requests[0].url.path.endswith("/latest/USD")
+
+
+@pytest.mark.asyncio
+async def test_unknown_source_currency_is_rejected(service):
+    with pytest.raises(HTTPException) as exc:
+        await service.convert_currency("Japan", 1, "XXX")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_country_without_a_known_currency_is_not_priced_in_usd(service):
+    with pytest.raises(HTTPException) as exc:
+        await service.convert_currency("Atlantis", 1, "USD")
+    assert exc.value.status_code == 404
+    assert len(service.requests) == 0
@@ -0,0 +1,75 @@
+import json
+import pytest
+from unittest.mock import AsyncMock
+from app.services.boundaries import BoundaryStore
+from app.services.geocoder import Geocoder, _FLAG_CODE
+
+FEATURES = [
+    {
+        "type": "Feature",
+        "properties": {"NAME": "Switzerland", "ISO_A2": "CH", "ISO_A3": "CHE", "LABEL_X": 8.0, "LABEL_Y": 46.8},
+        "geometry": {"type": "Polygon", "coordinates": [[[6.0, 45.8], [10.5, 45.8], [10.5, 47.8], [6.0, 45.8]]]},
+    },
+    {
+        "type": "Feature",
+        "properties": {"NAME": "Falkland Is.", "ISO_A2": "FK", "ISO_A3": "FLK", "LABEL_X": -59.0, "LABEL_Y": -51.7},
+        "geometry": {"type": "Polygon", "coordinates": [[[-61.0, -52.3], [-57.7, -52.3], [-57.7, -51.2], [-61.0, -52.3]]]},
+    },
+]
+COUNTRIES = [
+    {"name": "Swiss Confederation", "flag": "https://flagcdn.com/w320/ch.png"},
+    {"name": "Åland Islands", "flag": "https://flagcdn.com/w320/ax.png"},
+]
+
+
+@pytest.fixture
+def geocoder(tmp_path):
+    boundaries = tmp_path / "boundaries.geojson"
+    boundaries.write_text(json.dumps({"features": FEATURES}), encoding="utf-8")
+    countries = tmp_path / "countries.json"
+    countries.write_text(json.dumps(COUNTRIES), encoding="utf-8")
+    return Geocoder(BoundaryStore(str(boundaries)), countries_path=str(countries))
+
+
+def test_offline_exact_seeded_and_fuzzy(geocoder):
+    assert geocoder.lookup("switzerland").source == "offline"
+    # Linked through the flag URL's ISO code
+    assert geocoder.lookup("Swiss Confederation").name == "Switzerland"
+    fuzzy = geocoder.lookup("Switzerlnd")
+    assert fuzzy.source == "fuzzy" and fuzzy.centroid == {"lat": 46.8, "lon": 8.0}
+    assert geocoder.lookup("Atlantis") is None
+
+
+def test_fuzzy_matching_never_moves_a_catalogue_country(geocoder):
+    # In countries.json but not in Natural Earth: left to Nominatim, not sent to the Falklands
+    assert geocoder.lookup("Åland Islands") is None
+    assert geocoder.lookup("Aland Island") is None
+    # Close in difflib's ratio but too many edits to be a typo
+    assert geocoder.lookup("Switzerlandia Republic") is None
+
+
+def test_real_catalogue_names_resolve_to_their_own_country():
+    geocoder = Geocoder()
+    for country in geocoder._read_countries():
+        located = geocoder.lookup(country["name"])
+        flag = _FLAG_CODE.search(country.get("flag") or "")
+        if located is None:
+            continue
+        assert located.source != "fuzzy", country["name"]
+        if flag and located.boundary.iso_a2 and len(located.boundary.iso_a2) == 2:
+            assert located.boundary.iso_a2 == flag.group(1).upper(), country["name"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_names_fall_back_to_cached_nominatim(geocoder):
+    geocoder.cache.get_or_fetch = AsyncMock(return_value=[
+        {"display_name": "Andorra", "lat": "42.5", "lon": "1.57", "boundingbox": ["42.4", "42.7", "1.4", "1.8"]}
+    ])
+
+    located = await geocoder.geocode("Andorra")
+    known = await geocoder.geocode("Switzerland")
+
+    assert located.source == "nominatim"
+    assert located.coordinates == {"lat": 42.5, "lon": 1.57, "boundingbox": [42.4, 42.7, 1.4, 1.8]}
+    assert known.source == "offline"
+    geocoder.cache.get_or_fetch.assert_awaited_once()
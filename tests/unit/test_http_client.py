@@ -0,0 +1,59 @@
+import pytest
+import httpx
+from app.services.http_client import HttpClientManager, UpstreamConfig
+
+
+def make_manager(handler):
+    return HttpClientManager(
+        upstreams={"example": UpstreamConfig(max_connections=3, max_keepalive=2)},
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_client_is_shared_per_upstream():
+    manager = make_manager(lambda request: httpx.Response(200))
+
+    assert manager.client("example") is manager.client("example")
+    assert manager.client("example") is not manager.client("other")
+
+
+@pytest.mark.asyncio
+async def test_stats_count_requests_and_pool_usage():
+    manager = make_manager(lambda request: httpx.Response(200, json={"ok": True}))
+    client = manager.client("example")
+
+    # Act
+    for _ in range(3):
+        response = await client.get("https://example.org/")
+        assert response.json() == {"ok": True}
+
+    # Assert: the mock transport never opens TCP connections, so every request is a pool hit
+    stats = manager.stats()["example"]
+    assert stats["requests"] == 3
+    assert stats["pool_hits"] == 3
+    assert stats["pool_misses"] == 0
+    assert stats["hit_ratio"] == 1.0
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aclose_recreates_client_on_next_use():
+    manager = make_manager(lambda request: httpx.Response(200))
+    first = manager.client("example")
+
+    await manager.aclose()
+
+    assert first.is_closed
+    assert manager.client("example") is not first
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_open_creates_every_configured_client():
+    manager = make_manager(lambda request: httpx.Response(200))
+    assert manager.stats() == {}
+
+    manager.open()
+
+    assert list(manager.stats()) == ["example"]
+    await manager.aclose()
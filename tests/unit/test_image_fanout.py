@@ -0,0 +1,96 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import MagicMock
+from app.services.country_service import CountryService
+from app.services.image_providers import ImageProvider, normalize_image_url, merge_photos
+
+
+def photo(url, source, photographer="someone", description="No description available"):
+    return {"url": url, "thumbnail": url, "description": description,
+            "photographer": photographer, "source_url": f"https://{source}.example/{url[-3:]}", "source": source}
+
+
+def provider(name, photos, delay=0.0, timeout=1.0, error=None):
+    async def search(country, api_key):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return {"photos": photos, "total_results": len(photos)}
+    return ImageProvider(name, f"{name.upper()}_KEY", search, timeout)
+
+
+@pytest.fixture
+def service():
+    service = CountryService(MagicMock())
+    service.image_providers = []
+    return service
+
+
+@pytest.mark.asyncio
+async def test_providers_are_queried_concurrently(service):
+    service.register_image_provider(provider("a", [photo("https://a.example/1.jpg", "a")], delay=0.2))
+    service.register_image_provider(provider("b", [photo("https://b.example/2.jpg", "b")], delay=0.2))
+    service.register_image_provider(provider("c", [photo("https://c.example/3.jpg", "c")], delay=0.2))
+
+    started = time.monotonic()
+    result = await service.get_country_images("Kenya", api_keys={"a": "k", "b": "k", "c": "k"})
+
+    assert time.monotonic() - started < 0.4
+    assert [p["source"] for p in result["photos"]] == ["a", "b", "c"]
+    assert all(status["status"] == "ok" for status in result["providers"].values())
+
+
+@pytest.mark.asyncio
+async def test_slow_and_failing_providers_return_partial_results(service):
+    service.register_image_provider(provider("fast", [photo("https://a.example/1.jpg", "fast")]))
+    service.register_image_provider(provider("slow", [photo("https://b.example/2.jpg", "slow")], delay=1.0, timeout=0.05))
+    service.register_image_provider(provider("broken", [], error=RuntimeError("boom")))
+    service.register_image_provider(provider("unconfigured", []))
+
+    result = await service.get_country_images("Kenya", api_keys={"fast": "k", "slow": "k", "broken": "k"})
+
+    assert [p["source"] for p in result["photos"]] == ["fast"]
+    assert result["providers"]["slow"]["status"] == "timeout"
+    assert result["providers"]["broken"]["status"] == "error"
+    assert result["providers"]["unconfigured"]["status"] == "not_configured"
+
+
+@pytest.mark.asyncio
+async def test_overall_deadline_cancels_stragglers(service):
+    service.register_image_provider(provider("fast", [photo("https://a.example/1.jpg", "fast")]))
+    service.register_image_provider(provider("slow", [photo("https://b.example/2.jpg", "slow")], delay=5.0, timeout=10.0))
+
+    started = time.monotonic()
+    result = await service.get_country_images("Kenya", api_keys={"fast": "k", "slow": "k"}, deadline=0.1)
+
+    assert time.monotonic() - started < 0.5
+    assert result["total_results"] == 1
+    assert result["providers"]["slow"]["status"] == "timeout"
+
+
+def test_image_providers_configured_needs_a_key(service, monkeypatch):
+    service.register_image_provider(provider("a", []))
+    monkeypatch.delenv("A_KEY", raising=False)
+    assert not service.image_providers_configured()
+    monkeypatch.setenv("A_KEY", "k")
+    assert service.image_providers_configured()
+
+
+def test_normalize_image_url_ignores_query_and_size():
+    assert normalize_image_url("https://www.Pixabay.com/get/abc_640.jpg?x=1") == \
+        normalize_image_url("http://pixabay.com/get/abc_1280.jpg")
+
+
+def test_merge_photos_drops_duplicates_by_url():
+    tags = "table mountain, cape town, sunset"
+    merged = merge_photos([
+        [photo("https://images.unsplash.com/photo-1?w=1080", "unsplash")],
+        [photo("https://images.unsplash.com/photo-1?w=400", "unsplash")],
+        # Same uploader and tags, different photos: both are kept
+        [photo("https://pixabay.com/get/640_abc", "pixabay", "jane", tags),
+         photo("https://pixabay.com/get/640_xyz", "pixabay", "jane", tags)],
+    ])
+    assert [p["url"] for p in merged] == ["https://images.unsplash.com/photo-1?w=1080",
+                                          "https://pixabay.com/get/640_abc",
+                                          "https://pixabay.com/get/640_xyz"]
@@ -0,0 +1,76 @@
+import asyncio
+import time
+import httpx
+import pytest
+from unittest.mock import MagicMock
+from app.services.country_service import CountryService
+from app.services.http_client import HttpClientManager
+from app.services.rate_limiter import RateLimiterRegistry
+
+GEO = {"coordinates": {"lat": -1.0, "lon": 37.0, "boundingbox": [-4.7, 5.0, 33.9, 41.9]},
+       "geojson": {"type": "Feature"}}
+
+
+@pytest.fixture
+def service():
+    service = CountryService(MagicMock())
+
+    async def geocode(name):
+        await asyncio.sleep(0.1)
+        return GEO
+
+    async def capital(name):
+        await asyncio.sleep(0.1)
+        return "Nairobi"
+
+    async def mapillary(bbox):
+        await asyncio.sleep(0.2)
+        return [{"id": "1", "lat": 0, "lon": 0, "thumb_url": ""}]
+
+    async def pois(bbox):
+        await asyncio.sleep(0.2)
+        return [{"name": "Lake Nakuru", "lat": 0, "lon": 0, "type": "attraction"}]
+
+    service._map_geocode = geocode
+    service._map_capital = capital
+    service._fetch_mapillary_images = MagicMock(side_effect=mapillary)
+    service._fetch_overpass_pois = MagicMock(side_effect=pois)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_map_data_runs_independent_calls_concurrently(service):
+    started = time.monotonic()
+    result = await service.get_country_map_data("Kenya")
+
+    # geocode || capital (0.1s), then mapillary || overpass (0.2s)
+    assert time.monotonic() - started < 0.45
+    assert result["capital"] == "Nairobi"
+    assert len(result["mapillary_images"]) == 1
+    assert result["pois"][0]["name"] == "Lake Nakuru"
+
+
+@pytest.mark.asyncio
+async def test_map_shell_skips_layers(service):
+    result = await service.get_country_map_data("Kenya", include_layers=False)
+
+    assert result["mapillary_images"] == [] and result["pois"] == []
+    service._fetch_mapillary_images.assert_not_called()
+    service._fetch_overpass_pois.assert_not_called()
+
+    layers = await service.get_country_map_layers("Kenya")
+    assert set(layers) == {"mapillary_images", "pois"}
+
+
+@pytest.mark.asyncio
+async def test_nominatim_fallback_shares_the_nominatim_rate_limit():
+    limiter = RateLimiterRegistry(rates={"nominatim": {"rate": 1.0, "capacity": 1.0}})
+    clients = HttpClientManager(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[])))
+    service = CountryService(MagicMock(), http_clients=clients, rate_limiter=limiter)
+
+    started = time.monotonic()
+    await service._nominatim_search("Kenya")
+    await service._nominatim_search("Uganda", polygon=True)
+
+    assert time.monotonic() - started >= 0.9
+    assert service.geocoder.rate_limiter is limiter
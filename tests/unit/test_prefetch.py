@@ -0,0 +1,82 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.services.cache import ResponseCache, MemoryCacheBackend, CachePolicy, refreshing
+from app.services.prefetch_service import PrefetchService, PrefetchJob, PopularityMiddleware
+
+
+def make_cache(ttl=60.0):
+    return ResponseCache(MemoryCacheBackend(), policies={"test": CachePolicy(ttl=ttl, stale_ttl=60.0)})
+
+
+@pytest.mark.asyncio
+async def test_refreshing_refetches_entries_expiring_within_horizon():
+    cache = make_cache(ttl=60.0)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert await cache.get_or_fetch("test", "a", fetch) == 1
+    with refreshing(30.0):
+        assert await cache.get_or_fetch("test", "a", fetch) == 1     # still fresh past the horizon
+    with refreshing(120.0):
+        assert await cache.get_or_fetch("test", "a", fetch) == 2     # would expire before the next cycle
+    assert await cache.get_or_fetch("test", "a", fetch) == 2
+
+    stats = cache.stats()["sources"]["test"]
+    assert (stats["misses"], stats["hits"], stats["prefetched"]) == (1, 1, 1)
+    assert cache.warm_share() == 0.5
+
+
+@pytest.mark.asyncio
+async def test_cycle_warms_top_countries_then_seed():
+    cache = make_cache()
+    warmed, failed = [], []
+
+    async def warm(name):
+        warmed.append(name)
+        return await cache.get_or_fetch("test", name, lambda: _value(name))
+
+    async def broken(name):
+        failed.append(name)
+        raise RuntimeError("upstream down")
+
+    service = PrefetchService(cache, jobs=[PrefetchJob("test", "test", warm), PrefetchJob("broken", "other", broken)],
+                              seed=lambda n: ["China", "India", "Namibia"], top_n=3, rate=1000.0, interval=60.0)
+    for name in ("Namibia", "namibia", "Chad"):
+        service.record(name)
+
+    await service.run_cycle()
+
+    assert warmed == ["Namibia", "Chad", "China"]
+    stats = service.stats()
+    assert stats["jobs"]["test"]["warmed"] == 3
+    assert stats["jobs"]["broken"] == {"warmed": 0, "failed": 3, "last_error": "China: upstream down"}
+    assert stats["popularity"] == {"Namibia": 1.0, "Chad": 0.5}
+
+
+async def _value(name):
+    return name.upper()
+
+
+def test_middleware_records_country_routes():
+    recorded = []
+    app = FastAPI()
+    app.add_middleware(PopularityMiddleware, record=recorded.append)
+
+    @app.get("/countries/{name}/weather")
+    def weather(name: str):
+        return {"name": name}
+
+    @app.get("/countries/search")
+    def search():
+        return {}
+
+    client = TestClient(app)
+    client.get("/countries/Namibia/weather")
+    client.get("/countries/search")
+    client.post("/countries/Chad/weather")
+
+    assert recorded == ["Namibia"]
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import pytest
+import httpx
+from app.services.rate_limiter import TokenBucket, RateLimiterRegistry
+from app.services.http_client import HttpClientManager
+from app.services.attractions_service import AttractionsService
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_out_requests():
+    bucket = TokenBucket(rate=20.0, capacity=1.0)
+
+    # Act
+    started = time.monotonic()
+    waits = [await bucket.acquire() for _ in range(3)]
+    elapsed = time.monotonic() - started
+
+    # Assert: first token is free, the next two wait ~50ms each
+    assert waits[0] < 0.01
+    assert elapsed >= 0.09
+    stats = bucket.stats()
+    assert stats["acquired"] == 3
+    assert stats["throttled"] == 2
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_reports_waiters():
+    bucket = TokenBucket(rate=10.0, capacity=1.0)
+    await bucket.acquire()
+
+    waiters = [asyncio.create_task(bucket.acquire()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert bucket.stats()["queue_depth"] == 3
+
+    await asyncio.gather(*waiters)
+    assert bucket.stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_throttled_upstream_does_not_delay_other_upstreams():
+    registry = RateLimiterRegistry(rates={"slow": {"rate": 2.0, "capacity": 1.0}})
+    await registry.acquire("slow")
+
+    throttled = asyncio.create_task(registry.acquire("slow"))
+    started = time.monotonic()
+    await registry.acquire("fast")
+    assert time.monotonic() - started < 0.05
+    assert not throttled.done()
+
+    assert await throttled >= 0.4
+
+
+@pytest.mark.asyncio
+async def test_attractions_throttling_does_not_block_event_loop(monkeypatch):
+    monkeypatch.setenv("OPENTRIPMAP_API_KEY", "fake-key")
+
+    def handler(request):
+        return httpx.Response(200, json={"features": [
+            {"properties": {"name": "Table Mountain", "kinds": "natural"},
+             "geometry": {"coordinates": [18.4, -33.9]}}
+        ]})
+
+    service = AttractionsService(
+        http_clients=HttpClientManager(transport=httpx.MockTransport(handler)),
+        rate_limiter=RateLimiterRegistry(rates={"opentripmap": {"rate": 2.0, "capacity": 1.0}}),
+        max_tiles=2,
+    )
+
+    async def unrelated_request():
+        started = time.monotonic()
+        await asyncio.sleep(0.01)
+        return time.monotonic() - started
+
+    # Act: the attractions call waits ~0.5s between its two tile requests
+    result, unrelated_latency = await asyncio.gather(
+        service.get_attractions("South Africa"),
+        unrelated_request(),
+    )
+
+    # Assert
+    assert result["attractions"][0]["name"] == "Table Mountain"
+    assert unrelated_latency < 0.1
@@ -0,0 +1,49 @@
+from app.models.search_index import SearchIndex, edit_distance
+
+COUNTRIES = {
+    "cameroon": {"name": "Cameroon", "capital": "Yaoundé", "population": 26545864, "languages": "English, French"},
+    "germany": {"name": "Germany", "capital": "Berlin", "population": 83240525, "languages": "German"},
+    "georgia": {"name": "Georgia", "capital": "Tbilisi", "population": 3714000, "languages": "Georgian"},
+    "south africa": {"name": "South Africa", "capital": "Pretoria", "population": 59308690},
+}
+
+def make_index():
+    index = SearchIndex()
+    index.rebuild(COUNTRIES.items())
+    return index
+
+def test_prefix_ranks_names_then_population():
+    index = make_index()
+    assert index.search("ge") == ["germany", "georgia"]
+    assert index.search("afr") == ["south africa"]
+    assert index.search("french") == ["cameroon"]
+
+def test_accents_are_folded_both_ways():
+    index = make_index()
+    assert index.search("yaounde") == ["cameroon"]
+    assert index.search("YAOUNDÉ") == ["cameroon"]
+
+def test_typos_fall_back_to_fuzzy_matching():
+    index = make_index()
+    assert index.search("germny") == ["germany"]
+    assert index.search("pretria") == ["south africa"]
+    assert index.search("xyz") == []
+    assert edit_distance("kitten", "sitting", 5) == 3
+    assert edit_distance("kitten", "sitting", 1) == 2
+
+def test_fuzzy_matches_need_a_similar_whole_term():
+    index = SearchIndex()
+    index.rebuild([
+        ("dr congo", {"name": "DR Congo", "population": 108407721}),
+        ("mongolia", {"name": "Mongolia", "population": 3278290}),
+        ("kenya", {"name": "Kenya", "population": 53771300}),
+    ])
+    assert index.search("congo") == ["dr congo"]
+    assert index.search("kenia") == ["kenya"]
+
+def test_remove_prunes_terms():
+    index = make_index()
+    index.remove("georgia")
+    index.remove("germany")
+    assert index.search("ge") == []
+    assert index.stats()["documents"] == 2
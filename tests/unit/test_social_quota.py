@@ -0,0 +1,95 @@
+import asyncio
+import httpx
+import pytest
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from app.services.cache import ResponseCache, CachePolicy
+from app.services.http_client import HttpClientManager
+from app.services.quota import MemoryQuotaBackend, QuotaBackend, QuotaManager, period_window
+from app.services.social_service import SocialService
+
+
+class BrokenBackend(QuotaBackend):
+    async def consume(self, keys, limits, ttls, amount):
+        raise ConnectionError("redis down")
+
+    async def usage(self, keys):
+        raise ConnectionError("redis down")
+
+
+def tweets(request):
+    return httpx.Response(200, json={"data": [
+        {"id": "1", "text": "Great trip", "created_at": "2024-01-01T00:00:00Z", "author_id": "a"},
+        {"id": "2", "text": "Great trip", "created_at": "2024-01-01T00:00:00Z", "author_id": "b"},
+    ]})
+
+
+def make_service(monkeypatch, handler, quota, cache=None):
+    monkeypatch.setenv("X_BEARER_TOKEN", "token")
+    return SocialService(http_clients=HttpClientManager(transport=httpx.MockTransport(handler)),
+                         cache=cache or ResponseCache(), quota=quota)
+
+
+def test_period_window_labels_and_resets():
+    now = datetime(2024, 2, 28, 12, 0, tzinfo=timezone.utc)
+    assert period_window("day", now) == ("2024-02-28", 12 * 3600)
+    assert period_window("month", now) == ("2024-02", 36 * 3600)
+
+
+@pytest.mark.asyncio
+async def test_quota_spans_instances_and_falls_back_when_backend_fails():
+    shared = MemoryQuotaBackend()
+    first = QuotaManager(shared, budgets={"x_api": {"day": 2, "month": 3}})
+    second = QuotaManager(shared, budgets={"x_api": {"day": 2, "month": 3}})
+
+    assert await first.try_acquire("x_api") and await second.try_acquire("x_api")
+    assert not await first.try_acquire("x_api")
+    await second.refund("x_api")
+    assert (await first.usage("x_api"))["day"]["used"] == 1
+
+    broken = QuotaManager(BrokenBackend(), budgets={"x_api": {"day": 1}})
+    assert await broken.try_acquire("x_api")
+    assert not await broken.try_acquire("x_api")
+    assert broken.fallbacks == 2
+
+
+@pytest.mark.asyncio
+async def test_posts_are_cached_and_served_stale_once_quota_is_spent(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return tweets(request)
+
+    cache = ResponseCache(policies={"x_api": CachePolicy(ttl=0.05, stale_ttl=3600)})
+    service = make_service(monkeypatch, handler, QuotaManager(budgets={"x_api": {"day": 1}}), cache)
+
+    first = await service.get_social_posts("kenya")
+    assert [p["id"] for p in first["posts"]] == ["1"]
+    assert (await service.get_social_posts("Kenya"))["posts"] == first["posts"]
+    assert len(calls) == 1
+
+    await asyncio.sleep(0.1)
+    # Stale, and the refresh attempted behind it is refused by the quota
+    stale = await service.get_social_posts("kenya")
+    await asyncio.sleep(0.01)
+    assert stale["posts"] == first["posts"]
+    assert len(calls) == 1 and service.stats()["quota_rejections"] == 1
+
+    with pytest.raises(HTTPException) as exhausted:
+        await service.get_social_posts("Peru")
+    assert exhausted.value.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_network_errors_do_not_spend_quota(monkeypatch):
+    def handler(request):
+        raise httpx.ConnectError("unreachable")
+
+    quota = QuotaManager(budgets={"x_api": {"day": 1}})
+    service = make_service(monkeypatch, handler, quota)
+
+    with pytest.raises(HTTPException) as failed:
+        await service.get_social_posts("Chile")
+    assert failed.value.status_code == 502
+    assert (await quota.usage("x_api"))["day"]["used"] == 0
@@ -0,0 +1,125 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock
+from app.services.cache import ResponseCache
+from app.services.http_client import HttpClientManager
+from app.services.weather_codes import WEATHER_LABELS, weather_label
+from app.services.weather_service import WeatherService, grid_cell, seconds_until_update
+
+COUNTRIES = {
+    "chile": {"name": "Chile", "capital": "Santiago", "capital_coordinates": {"lat": -33.45, "lon": -70.66}},
+    "russia": {"name": "Russia", "capital": "Moscow", "capital_coordinates": {"lat": 55.75, "lon": 37.62}},
+    "argentina": {"name": "Argentina", "capital": "Buenos Aires"},
+}
+
+
+def forecast(lat, lon):
+    return {"latitude": lat, "longitude": lon, "current_weather": {"temperature": 20, "weathercode": 0, "windspeed": 5},
+            "daily": {"time": ["2024-01-01"], "temperature_2m_max": [25], "temperature_2m_min": [15],
+                      "precipitation_probability_max": [10], "weathercode": [1]}}
+
+
+@pytest.fixture
+def service():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        lats = request.url.params["latitude"].split(",")
+        lons = request.url.params["longitude"].split(",")
+        body = [forecast(float(lat), float(lon)) for lat, lon in zip(lats, lons)]
+        return httpx.Response(200, json=body[0] if len(body) == 1 else body)
+
+    model = MagicMock()
+    model.find_by_name = AsyncMock(side_effect=lambda name: COUNTRIES.get(name.lower()))
+    geocoder = MagicMock()
+    geocoder.geocode = AsyncMock(side_effect=lambda name: MagicMock(centroid={"lat": -34.0, "lon": -64.0})
+                                 if name == "Argentina" else None)
+    service = WeatherService(http_clients=HttpClientManager(transport=httpx.MockTransport(handler)),
+                             cache=ResponseCache(), geocoder=geocoder, country_model=model)
+    service.requests = requests
+    return service
+
+
+def test_grid_cell_and_hourly_expiry():
+    assert grid_cell(-33.45, -70.66, 0.25) == (-33.5, -70.75)
+    assert grid_cell(-33.40, -70.70, 0.25) == (-33.5, -70.75)
+    assert seconds_until_update(now=7200 + 600, lag=300) == 3300
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_one_request_and_the_cache(service):
+    result = await service.get_weather_batch(["Chile", "Russia", "Argentina", "Atlantis"])
+
+    assert len(service.requests) == 1 and result["upstream_calls"] == 1
+    assert service.requests[0].url.params["latitude"] == "-33.5,55.75,-34.0"
+    chile, russia, argentina, atlantis = result["forecasts"]
+    assert chile["location"] == "capital" and chile["grid_cell"] == {"lat": -33.5, "lon": -70.75}
+    assert argentina["location"] == "centroid"
+    assert atlantis == {"country": "Atlantis", "error": "No coordinates found for Atlantis"}
+
+    single = await service.get_weather("Russia")
+    again = await service.get_weather_batch(["Chile", "Russia"])
+    assert len(service.requests) == 1 and again["upstream_calls"] == 0
+    assert single["current"]["temperature"] == 20 and single["coordinates"] == {"lat": 55.75, "lon": 37.62}
+
+
+def test_labels_cover_wmo_codes_in_every_language():
+    assert set(WEATHER_LABELS) == {"en", "fr", "es", "de", "pt"}
+    assert all(set(labels) == set(WEATHER_LABELS["en"]) for labels in WEATHER_LABELS.values())
+    assert weather_label(71, "de") == "Leichter Schneefall"
+    assert weather_label(42) == "Unknown code 42"
+    with pytest.raises(TypeError):
+        WEATHER_LABELS["en"][0] = "Sunny"
+
+
+@pytest.mark.asyncio
+async def test_columnar_format_and_language(service):
+    rows = await service.get_weather("Chile", lang="fr")
+    columnar = await service.get_weather("Chile", response_format="columnar")
+
+    assert rows["daily"] == [{"date": "2024-01-01", "max_temp": 25, "min_temp": 15, "precipitation_prob": 10,
+                              "weather": "Principalement dégagé"}]
+    assert columnar["daily"] == {"date": ["2024-01-01"], "max_temp": [25], "min_temp": [15],
+                                 "precipitation_prob": [10], "weather": ["Mainly clear"]}
+    with pytest.raises(HTTPException) as error:
+        await service.get_weather("Chile", lang="xx")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_share_missing_cells():
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        lats, lons = request.url.params["latitude"].split(","), request.url.params["longitude"].split(",")
+        body = [forecast(float(lat), float(lon)) for lat, lon in zip(lats, lons)]
+        return httpx.Response(200, json=body[0] if len(body) == 1 else body)
+
+    model = MagicMock()
+    model.find_by_name = AsyncMock(side_effect=lambda name: COUNTRIES.get(name.lower()))
+    service = WeatherService(http_clients=HttpClientManager(transport=httpx.MockTransport(handler)),
+                             cache=ResponseCache(), geocoder=MagicMock(), country_model=model)
+
+    first, second = await asyncio.gather(service.get_weather_batch(["Chile", "Russia"]),
+                                         service.get_weather_batch(["Russia", "Chile"]))
+
+    assert len(requests) == 1
+    assert first["upstream_calls"] == 1 and second["upstream_calls"] == 0
+    assert second["forecasts"][0]["coordinates"] == {"lat": 55.75, "lon": 37.62}
+    assert service.stats()["cells_coalesced"] == 2 and not service._inflight
+
+
+@pytest.mark.asyncio
+async def test_forecast_count_mismatch_is_an_upstream_error(service):
+    service.http = HttpClientManager(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json=[forecast(-33.5, -70.75)])))
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_weather_batch(["Chile", "Russia"])
+    assert exc.value.status_code == 502
+    assert not service._inflight